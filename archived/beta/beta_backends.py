@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inference backends for the beta detector.
+FireDetector talks to a backend through one call:
+``backend(frame_bgr, conf, imgsz=None)`` returns a list of result objects
+exposing ``boxes`` (an (N, 6) array or an ultralytics Boxes: x1, y1, x2,
+y2, conf, cls) and ``plot()`` (always BGR). Backends with ``accepts_rgb``
+also take ``rgb=True`` and read RGB frames without a conversion; backends
+with ``dynamic_imgsz`` honour ``imgsz`` (the exported ONNX graphs have a
+fixed input, so the detector's ROI pass is skipped for them). The ONNX
+backends avoid importing ultralytics/torch at runtime; convert the weights
+once with ``python beta_backends.py export``.
+"""
+import argparse
+import ast
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import beta_config as C
+from beta_imports import lazy_import
+
+BACKENDS = ("ultralytics", "onnxruntime", "opencv")
+
+
+# ---------------------------------------------------------------------- #
+# Pre/post processing shared by the ONNX backends
+# ---------------------------------------------------------------------- #
+def letterbox(
+    frame_bgr: np.ndarray, size: int, pad_value: int = 114
+) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize keeping aspect ratio and pad to a ``size`` x ``size`` square
+    (same rounding as ultralytics). Returns (image, scale, (pad_x, pad_y)).
+    """
+    height, width = frame_bgr.shape[:2]
+    scale = min(size / float(height), size / float(width))
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_w, pad_h = (size - new_w) / 2.0, (size - new_h) / 2.0
+    if (new_w, new_h) != (width, height):
+        resized = cv2.resize(frame_bgr, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    else:
+        resized = frame_bgr
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    padded = cv2.copyMakeBorder(
+        resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(pad_value, pad_value, pad_value)
+    )
+    return padded, scale, (float(left), float(top))
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_thres: float) -> np.ndarray:
+    """Greedy non-maximum suppression on xyxy boxes; returns kept indices by score."""
+    if boxes.shape[0] == 0:
+        return np.zeros((0,), dtype=np.int64)
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(-scores, kind="stable")
+    keep = []  # type: List[int]
+    while order.size > 0:
+        i = int(order[0])
+        keep.append(i)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        xx1 = np.maximum(x1[i], x1[rest])
+        yy1 = np.maximum(y1[i], y1[rest])
+        xx2 = np.minimum(x2[i], x2[rest])
+        yy2 = np.minimum(y2[i], y2[rest])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_thres]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def decode_yolo_output(
+    output: np.ndarray,
+    conf_thres: float,
+    iou_thres: float,
+    scale: float,
+    pad: Tuple[float, float],
+    frame_shape: Tuple[int, ...],
+    max_det: int = 300,
+) -> np.ndarray:
+    """
+    Turn a raw YOLOv8 head output (1, 4 + nc, anchors) into an (N, 6) array
+    of x1, y1, x2, y2, conf, cls in original frame pixels.
+    """
+    pred = np.asarray(output)
+    if pred.ndim == 3:
+        pred = pred[0]
+    if pred.shape[0] < pred.shape[1]:
+        pred = pred.T  # -> (anchors, 4 + nc)
+    scores_all = pred[:, 4:]
+    cls_ids = np.argmax(scores_all, axis=1)
+    scores = scores_all[np.arange(scores_all.shape[0]), cls_ids]
+    mask = scores >= conf_thres
+    if not mask.any():
+        return np.zeros((0, 6), dtype=np.float32)
+    cxcywh = pred[mask, :4]
+    scores = scores[mask]
+    cls_ids = cls_ids[mask]
+    boxes = np.empty_like(cxcywh)
+    boxes[:, 0] = cxcywh[:, 0] - cxcywh[:, 2] / 2.0
+    boxes[:, 1] = cxcywh[:, 1] - cxcywh[:, 3] / 2.0
+    boxes[:, 2] = cxcywh[:, 0] + cxcywh[:, 2] / 2.0
+    boxes[:, 3] = cxcywh[:, 1] + cxcywh[:, 3] / 2.0
+
+    # Class-aware NMS in one pass: shift each class into its own coordinate band.
+    offsets = cls_ids[:, None].astype(np.float32) * 7680.0
+    keep = nms(boxes + offsets, scores, iou_thres)[:max_det]
+    boxes, scores, cls_ids = boxes[keep], scores[keep], cls_ids[keep]
+
+    height, width = frame_shape[:2]
+    boxes[:, [0, 2]] = np.clip((boxes[:, [0, 2]] - pad[0]) / scale, 0, width)
+    boxes[:, [1, 3]] = np.clip((boxes[:, [1, 3]] - pad[1]) / scale, 0, height)
+    return np.hstack([boxes, scores[:, None], cls_ids[:, None]]).astype(np.float32)
+
+
+class BackendResult:
+    """Minimal stand-in for an ultralytics Results object (boxes + plot)."""
+
+    def __init__(self, orig_img: np.ndarray, boxes: np.ndarray, names: Dict[int, str], rgb: bool = False) -> None:
+        self.orig_img = orig_img
+        self.boxes = boxes
+        self.names = names
+        self.rgb = bool(rgb)
+
+    def plot(self) -> np.ndarray:
+        # Converting RGB input allocates the output anyway, so it replaces the copy.
+        annotated = cv2.cvtColor(self.orig_img, cv2.COLOR_RGB2BGR) if self.rgb else self.orig_img.copy()
+        for x1, y1, x2, y2, conf, cls_id in self.boxes:
+            p1, p2 = (int(x1), int(y1)), (int(x2), int(y2))
+            cv2.rectangle(annotated, p1, p2, (0, 0, 255), 2)
+            text = "{} {:.2f}".format(self.names.get(int(cls_id), str(int(cls_id))), conf)
+            cv2.putText(annotated, text, (p1[0], max(12, p1[1] - 6)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+        return annotated
+
+
+def _names_sidecar(onnx_path: Path) -> Path:
+    return onnx_path.with_suffix(".names.json")
+
+
+def _onnx_metadata(onnx_path: Path) -> Optional[Dict[str, str]]:
+    """The graph's metadata_props via the optional ``onnx`` package (cv2.dnn does not expose them)."""
+    try:
+        onnx = lazy_import("onnx")
+    except ImportError:
+        return None
+    model = onnx.load(str(onnx_path), load_external_data=False)
+    return {prop.key: prop.value for prop in model.metadata_props}
+
+
+def _load_names(onnx_path: Path, metadata: Optional[Dict[str, str]] = None) -> Dict[int, str]:
+    """
+    Class names from the .names.json sidecar, else the ultralytics ONNX
+    metadata. Raises FileNotFoundError when neither is available: without
+    names the DETECT_CLASSES mask would reject every box.
+    """
+    sidecar = _names_sidecar(onnx_path)
+    if sidecar.exists():
+        with sidecar.open("r", encoding="utf-8") as f:
+            return {int(k): str(v) for k, v in json.load(f).items()}
+    if metadata and "names" in metadata:
+        # ultralytics stores names as a Python dict literal in the ONNX metadata
+        return {int(k): str(v) for k, v in ast.literal_eval(metadata["names"]).items()}
+    raise FileNotFoundError(
+        "No class names for {}: {} is missing and the model has no names metadata "
+        "(run: python beta_backends.py export --force)".format(onnx_path, sidecar.name)
+    )
+
+
+# ---------------------------------------------------------------------- #
+# Backends
+# ---------------------------------------------------------------------- #
+class UltralyticsBackend:
+    """Original path: ultralytics YOLO on the .pt weights (imports torch)."""
+
+    accepts_rgb = False  # ultralytics treats numpy input as BGR
+    dynamic_imgsz = True
+
+    def __init__(self, model_path: str) -> None:
+        YOLO = lazy_import("ultralytics").YOLO  # pulls in torch; timed in the startup log
+
+        self.model = YOLO(str(model_path), task="detect")
+        self.names = self.model.names
+
+    def __call__(self, frame_bgr: np.ndarray, conf: float, imgsz: Optional[int] = None) -> List[Any]:
+        if imgsz:
+            return self.model(frame_bgr, conf=conf, imgsz=int(imgsz), verbose=False)
+        return self.model(frame_bgr, conf=conf, verbose=False)
+
+
+class _OnnxBackend(ABC):
+    """Shared letterbox -> forward -> decode flow for the ONNX backends; subclasses provide _forward()."""
+
+    accepts_rgb = True  # the network wants RGB; BGR input is swapped while building the blob
+    dynamic_imgsz = False  # exported with dynamic=False: every input is letterboxed to self.imgsz
+
+    def __init__(self, onnx_path: str, imgsz: Optional[int] = None, iou: Optional[float] = None) -> None:
+        self.onnx_path = Path(onnx_path)
+        if not self.onnx_path.exists():
+            raise FileNotFoundError(
+                "ONNX model not found at {} (run: python beta_backends.py export)".format(self.onnx_path)
+            )
+        self.imgsz = int(imgsz or getattr(C, "DETECT_IMGSZ", 640))
+        self.iou = float(iou if iou is not None else getattr(C, "DETECT_IOU", 0.7))
+        self.names = {}  # type: Dict[int, str]
+
+    @abstractmethod
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        """Raw network output for a preprocessed (1, 3, imgsz, imgsz) blob."""
+
+    def __call__(
+        self, frame_bgr: np.ndarray, conf: float, imgsz: Optional[int] = None, rgb: bool = False
+    ) -> List[BackendResult]:
+        # The exported graph has a fixed input size, so ``imgsz`` is ignored here.
+        padded, scale, pad = letterbox(frame_bgr, self.imgsz)
+        blob = cv2.dnn.blobFromImage(padded, scalefactor=1.0 / 255.0, swapRB=not rgb)
+        output = self._forward(blob)
+        boxes = decode_yolo_output(output, conf, self.iou, scale, pad, frame_bgr.shape)
+        return [BackendResult(frame_bgr, boxes, self.names, rgb=rgb)]
+
+
+class OnnxRuntimeBackend(_OnnxBackend):
+    """ONNX Runtime on CPU; no torch import."""
+
+    def __init__(self, onnx_path: str, imgsz: Optional[int] = None, iou: Optional[float] = None) -> None:
+        super().__init__(onnx_path, imgsz, iou)
+        ort = lazy_import("onnxruntime")
+
+        self.session = ort.InferenceSession(str(self.onnx_path), providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        shape = self.session.get_inputs()[0].shape
+        if len(shape) == 4 and isinstance(shape[2], int):
+            self.imgsz = int(shape[2])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = _load_names(self.onnx_path, meta)
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenCVDnnBackend(_OnnxBackend):
+    """OpenCV DNN module; reuses the cv2 already loaded for video."""
+
+    def __init__(self, onnx_path: str, imgsz: Optional[int] = None, iou: Optional[float] = None) -> None:
+        super().__init__(onnx_path, imgsz, iou)
+        self.net = cv2.dnn.readNetFromONNX(str(self.onnx_path))
+        sidecar = _names_sidecar(self.onnx_path).exists()
+        self.names = _load_names(self.onnx_path, None if sidecar else _onnx_metadata(self.onnx_path))
+
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        self.net.setInput(blob)
+        return self.net.forward()
+
+
+def model_path_for(choice: str) -> str:
+    """Weights file a backend loads."""
+    return C.YOLO_MODEL_PATH if choice == "ultralytics" else C.ONNX_MODEL_PATH
+
+
+def create_backend(name: Optional[str] = None, use_daemon: Optional[bool] = None) -> Any:
+    """
+    Build the backend selected by ``name`` or beta_config.DETECT_BACKEND.
+    With DETECT_DAEMON (or ``use_daemon``) a running beta_daemon serving the
+    same model is used instead of loading it here.
+    """
+    choice = str(name or getattr(C, "DETECT_BACKEND", "ultralytics")).lower()
+    if choice not in BACKENDS:
+        raise ValueError("Unknown DETECT_BACKEND '{}' (expected one of {})".format(choice, ", ".join(BACKENDS)))
+    if getattr(C, "DETECT_DAEMON", False) if use_daemon is None else use_daemon:
+        client = lazy_import("beta_daemon").connect(choice)
+        if client is not None:
+            return client
+    if choice == "ultralytics":
+        model_path = Path(C.YOLO_MODEL_PATH)
+        if not model_path.exists():
+            raise FileNotFoundError("YOLO model not found at {}".format(model_path))
+        return UltralyticsBackend(str(model_path))
+    if choice == "onnxruntime":
+        return OnnxRuntimeBackend(C.ONNX_MODEL_PATH)
+    return OpenCVDnnBackend(C.ONNX_MODEL_PATH)
+
+
+def export_onnx(pt_path: Optional[str] = None, onnx_path: Optional[str] = None, imgsz: Optional[int] = None,
+                force: bool = False) -> Path:
+    """
+    Convert the ultralytics weights to ONNX once (skipped when the .onnx is
+    newer than the .pt) and write a class-name sidecar for the DNN backend.
+    """
+    src = Path(pt_path or C.YOLO_MODEL_PATH)
+    dst = Path(onnx_path or C.ONNX_MODEL_PATH)
+    size = int(imgsz or getattr(C, "DETECT_IMGSZ", 640))
+    if not src.exists():
+        raise FileNotFoundError("YOLO model not found at {}".format(src))
+    if not force and dst.exists() and dst.stat().st_mtime >= src.stat().st_mtime and _names_sidecar(dst).exists():
+        return dst
+
+    from ultralytics import YOLO
+
+    model = YOLO(str(src), task="detect")
+    exported = Path(model.export(format="onnx", imgsz=size, opset=12, dynamic=False, simplify=False))
+    if exported.resolve() != dst.resolve():
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        exported.replace(dst)
+    with _names_sidecar(dst).open("w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in dict(model.names).items()}, f, indent=2)
+    return dst
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Detector backend utilities.")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+    p_export = sub.add_parser("export", help="convert YOLO_MODEL_PATH to ONNX_MODEL_PATH")
+    p_export.add_argument("--weights", default=None, help="source .pt (default YOLO_MODEL_PATH)")
+    p_export.add_argument("--output", default=None, help="target .onnx (default ONNX_MODEL_PATH)")
+    p_export.add_argument("--imgsz", type=int, default=None, help="network input size (default DETECT_IMGSZ)")
+    p_export.add_argument("--force", action="store_true", help="re-export even if the .onnx is up to date")
+    args = parser.parse_args()
+
+    try:
+        path = export_onnx(args.weights, args.output, args.imgsz, force=args.force)
+    except FileNotFoundError as e:
+        print(f"[X] {e}")
+        return 2
+    print(f"[*] ONNX model ready: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,810 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline micro-benchmarks for the beta detector.
+Nothing here talks to the drone; each sub-command times or checks one
+piece of the detection path on synthetic or recorded data so changes
+can be compared on the Jetson and on a laptop alike.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+import beta_config as C
+import beta_detect as D
+from beta_backends import BackendResult, create_backend
+from beta_record import ClipRecorder, ReplayFrameSource, iter_frames
+
+def _time_call(fn: Callable[[], Any], repeat: int) -> float:
+    """Return mean seconds per call over ``repeat`` runs (after one warmup)."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / max(1, repeat)
+
+
+# ---------------------------------------------------------------------- #
+# Best-box selection
+# ---------------------------------------------------------------------- #
+class _FakeBox:
+    """Single box shaped like an ultralytics Boxes row (cls/conf/xyxy with a batch dim)."""
+
+    def __init__(self, row: Any) -> None:
+        self.cls = row[5:6]
+        self.conf = row[4:5]
+        self.xyxy = row[None, :4]
+
+
+class _FakeBoxes:
+    def __init__(self, data: Any) -> None:
+        self.data = data
+
+    def __iter__(self):
+        for i in range(len(self.data)):
+            yield _FakeBox(self.data[i])
+
+
+def _make_boxes(count: int, num_classes: int, device: Optional[str]) -> _FakeBoxes:
+    rng = np.random.default_rng(count)
+    xy = rng.uniform(0, 700, size=(count, 2)).astype(np.float32)
+    wh = rng.uniform(10, 200, size=(count, 2)).astype(np.float32)
+    conf = rng.uniform(0.4, 1.0, size=(count, 1)).astype(np.float32)
+    cls = rng.integers(0, num_classes, size=(count, 1)).astype(np.float32)
+    data = np.hstack([xy, xy + wh, conf, cls])
+    if device:
+        import torch  # only needed to reproduce the device-to-host sync per box
+
+        data = torch.from_numpy(data).to(device)
+    return _FakeBoxes(data)
+
+
+def _select_loop(boxes: _FakeBoxes, names: Dict[int, str], classes: Optional[set]):
+    """Per-box selection as FireDetector.infer did before vectorization."""
+    best = None
+    for box in boxes:
+        cls_id = int(box.cls[0]) if box.cls is not None else -1
+        name_norm = str(names.get(cls_id, str(cls_id))).lower()
+        if classes and name_norm not in classes:
+            continue
+        conf = float(box.conf[0]) if box.conf is not None else 0.0
+        coords = box.xyxy[0].tolist()
+        if best is None or conf > best[2]:
+            best = (coords, name_norm, conf)
+    return best
+
+
+def _select_vectorized(boxes: _FakeBoxes, class_mask: Optional[np.ndarray]):
+    data = D.boxes_to_array(boxes)
+    idx = D.select_best_box(data, class_mask)
+    return None if idx is None else data[idx]
+
+
+def bench_select(args: argparse.Namespace) -> int:
+    names = {i: "class{}".format(i) for i in range(args.classes)}
+    names[0] = "fire"
+    classes = {"fire", "smoke"}
+    class_mask = D.build_class_mask(names, classes)
+    device = args.device or None
+
+    print("[*] Best-box selection ({} classes, device {}, {} runs)".format(args.classes, device or "numpy", args.repeat))
+    print("    {:>6}  {:>12}  {:>12}  {:>8}".format("boxes", "loop (us)", "vector (us)", "speedup"))
+    for count in args.boxes:
+        boxes = _make_boxes(count, args.classes, device)
+        loop_best = _select_loop(boxes, names, classes)
+        vec_best = _select_vectorized(boxes, class_mask)
+        if (loop_best is None) != (vec_best is None) or (
+            loop_best is not None and abs(loop_best[2] - float(vec_best[4])) > 1e-6
+        ):
+            print("[X] Selection mismatch at {} boxes".format(count))
+            return 1
+        t_loop = _time_call(lambda: _select_loop(boxes, names, classes), args.repeat)
+        t_vec = _time_call(lambda: _select_vectorized(boxes, class_mask), args.repeat)
+        print("    {:>6}  {:>12.1f}  {:>12.1f}  {:>7.1f}x".format(count, t_loop * 1e6, t_vec * 1e6, t_loop / max(t_vec, 1e-12)))
+    return 0
+
+
+# ---------------------------------------------------------------------- #
+# Backend parity on recorded frames
+# ---------------------------------------------------------------------- #
+def _bbox_iou(a, b) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / float(union) if union > 0 else 0.0
+
+
+def _detections_agree(ref: "D.FireDetection", other: "D.FireDetection", iou_min: float, conf_tol: float) -> bool:
+    if ref.has_fire != other.has_fire:
+        return False
+    if not ref.has_fire:
+        return True
+    if ref.label != other.label or ref.bbox is None or other.bbox is None:
+        return False
+    return _bbox_iou(ref.bbox, other.bbox) >= iou_min and abs(ref.conf - other.conf) <= conf_tol
+
+
+def _synthetic_frames(count: int, seed: int = 0):
+    """Deterministic BGR test frames: textured background plus a few flame-coloured blobs."""
+    rng = np.random.RandomState(seed)
+    height, width = int(C.FRAME_H), int(C.FRAME_W)
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    for _ in range(count):
+        frame = np.empty((height, width, 3), dtype=np.float32)
+        frame[...] = rng.uniform(40, 160, 3)
+        frame += (xx / width * 60.0)[..., None] + rng.normal(0, 8, (height, width, 1))
+        for _ in range(rng.randint(1, 4)):
+            cx, cy = rng.uniform(0.1, 0.9) * width, rng.uniform(0.1, 0.9) * height
+            radius = rng.uniform(20, 120)
+            blob = np.exp(-((xx - cx) ** 2 + (yy - cy) ** 2) / (2.0 * radius * radius))[..., None]
+            frame = frame * (1.0 - blob) + np.array([30.0, 120.0, 250.0]) * blob
+        yield np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def _load_parity_detectors(names: List[str], skip_missing: bool) -> List[tuple]:
+    detectors = []
+    for name in names:
+        try:
+            detectors.append((name, D.FireDetector(enable_model=True, show_video=False, backend=name)))
+        except (ImportError, FileNotFoundError) as e:
+            if not skip_missing:
+                raise
+            print("[!] {:<12} skipped: {}".format(name, e))
+    return detectors
+
+
+def _names_agree(detectors: List[tuple]) -> bool:
+    """Every backend must map DETECT_CLASSES to at least one class id, and to the reference's ids."""
+    def class_ids(det):
+        return None if det._class_mask is None else np.flatnonzero(det._class_mask).tolist()
+
+    ok = True
+    ref_name, ref_det = detectors[0]
+    for name, det in detectors:
+        ids = class_ids(det)
+        if ids == []:
+            print("[X] {:<12} accepts none of DETECT_CLASSES {} (class names: {})".format(
+                name, C.DETECT_CLASSES, dict(det.model.names) or "none"))
+            ok = False
+        elif ids != class_ids(ref_det):
+            print("[X] {:<12} class ids {} differ from {} {}".format(name, ids, ref_name, class_ids(ref_det)))
+            ok = False
+    return ok
+
+
+def bench_parity(args: argparse.Namespace) -> int:
+    C.VIDEO_SAVE_PATH = None
+    if args.synthetic:
+        source = "{} synthetic frames".format(args.synthetic)
+        frames = _synthetic_frames(args.synthetic)
+    else:
+        if not args.source:
+            print("[X] Give a recording or --synthetic N")
+            return 2
+        source = Path(args.source)
+        if not source.exists():
+            print("[X] Source not found: {}".format(source))
+            return 2
+        frames = iter_frames(source, args.limit, args.stride)
+    detectors = _load_parity_detectors(args.backends, skip_missing=bool(args.synthetic))
+    if not detectors:
+        print("[X] No backend could be loaded")
+        return 2
+    if not _names_agree(detectors):
+        for _, det in detectors:
+            det.close()
+        return 1
+    ref_name, ref_det = detectors[0]
+    agree = {name: 0 for name, _ in detectors[1:]}
+    hits = {name: 0 for name, _ in detectors}
+    total = 0
+    try:
+        for frame in frames:
+            ref = ref_det.infer(frame)
+            hits[ref_name] += int(ref.has_fire)
+            for name, det in detectors[1:]:
+                other = det.infer(frame)
+                hits[name] += int(other.has_fire)
+                if _detections_agree(ref, other, args.iou, args.conf_tol):
+                    agree[name] += 1
+            total += 1
+    finally:
+        for _, det in detectors:
+            det.close()
+
+    if total == 0:
+        print("[X] No frames read from {}".format(source))
+        return 2
+    print("[*] Parity on {} frames from {} (reference {})".format(total, source, ref_name))
+    print("    {:<12} hits {:4d}".format(ref_name, hits[ref_name]))
+    ok = True
+    for name, _ in detectors[1:]:
+        rate = agree[name] / float(total)
+        ok = ok and rate >= args.min_agree
+        print("    {:<12} hits {:4d}  agreement {:6.1%}".format(name, hits[name], rate))
+    if not ok:
+        print("[X] Agreement below {:.0%}".format(args.min_agree))
+        return 1
+    return 0
+
+
+# ---------------------------------------------------------------------- #
+# Replay throughput / latency
+# ---------------------------------------------------------------------- #
+class _DetectionTally:
+    """Stands in for a DetectionSidecar and counts every published detection."""
+
+    def __init__(self) -> None:
+        self.published = 0
+        self.fire = 0
+        self.tracked = 0
+
+    def write(self, det: "D.FireDetection", capture_ts: float, seq: int) -> None:
+        self.published += 1
+        self.fire += int(det.has_fire)
+        self.tracked += int(det.tracked)
+
+
+class _FullFrameImgsz:
+    """Give full-frame passes an explicit imgsz (ultralytics otherwise uses the model default)."""
+
+    def __init__(self, backend: Any, imgsz: int) -> None:
+        self.backend = backend
+        self.names = backend.names
+        self.accepts_rgb = getattr(backend, "accepts_rgb", False)
+        self.dynamic_imgsz = getattr(backend, "dynamic_imgsz", False)
+        self.imgsz = int(imgsz)
+
+    def __call__(self, frame_bgr: np.ndarray, conf: float, imgsz: Optional[int] = None, **kwargs: Any) -> Any:
+        return self.backend(frame_bgr, conf, imgsz=imgsz or self.imgsz, **kwargs)
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    except Exception:
+        return 0.0
+
+
+def _gpu_peak_mb(reset: bool = False) -> Optional[float]:
+    """Peak CUDA memory if torch is already loaded (never imports it)."""
+    torch = sys.modules.get("torch")
+    try:
+        if torch is None or not torch.cuda.is_available():
+            return None
+        if reset:
+            torch.cuda.reset_peak_memory_stats()
+        return torch.cuda.max_memory_allocated() / (1024.0 * 1024.0)
+    except Exception:
+        return None
+
+
+def _replay_once(source: Path, backend: str, imgsz: Optional[int], roi: bool, gate: bool, track: bool,
+                 args: argparse.Namespace) -> Dict[str, Any]:
+    C.ROI_ENABLE = roi
+    C.GATE_ENABLE = gate
+    C.TRACK_ENABLE = track
+    if imgsz:
+        C.DETECT_IMGSZ = imgsz
+    model = create_backend(backend, use_daemon=False)
+    if imgsz and backend == "ultralytics":
+        model = _FullFrameImgsz(model, imgsz)
+    detector = D.FireDetector(enable_model=True, show_video=False, backend=model)
+    detector.set_roi_mode(roi)
+    tally = _DetectionTally()
+    detector.attach_sidecar(tally)  # type: ignore[arg-type]
+    replay = ReplayFrameSource(source, pace=args.pace, limit=args.limit)
+    _gpu_peak_mb(reset=True)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        replay.start()
+        detector.start_async(replay, 1.0 / args.hz if args.hz > 0 else 0.0)
+        replay.wait()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        time.sleep(0.2)  # let the last frame through inference
+    finally:
+        replay.stop()
+        detector.stop_async()
+        stats = detector.get_async_stats()
+        timings = detector.timings.summary()
+        detector.close(report=False)
+    forward = timings.get("forward", {})
+    publish = timings.get("glass_to_publish", {})
+    return {
+        "frames": replay.frames_read,
+        "inferred": stats["frames_inferred"],
+        "saved": stats["inferences_saved"],
+        "fps": stats["frames_inferred"] / wall if wall > 0 else 0.0,
+        "published": tally.published,
+        "fire": tally.fire,
+        "tracked": tally.tracked,
+        "forward_p50": forward.get("p50_ms", 0.0),
+        "p50": publish.get("p50_ms", 0.0),
+        "p95": publish.get("p95_ms", 0.0),
+        "p99": publish.get("p99_ms", 0.0),
+        "cpu_pct": 100.0 * cpu / wall if wall > 0 else 0.0,
+        "rss_mb": _rss_mb(),
+        "gpu_mb": _gpu_peak_mb(),
+    }
+
+
+def bench_replay(args: argparse.Namespace) -> int:
+    C.VIDEO_SAVE_PATH = None
+    source = Path(args.source)
+    if not source.exists():
+        print("[X] Source not found: {}".format(source))
+        return 2
+    if args.model:
+        if Path(args.model).suffix.lower() == ".onnx":
+            C.ONNX_MODEL_PATH = args.model
+        else:
+            C.YOLO_MODEL_PATH = args.model
+    on_off = {"on": True, "off": False}
+    configs = [
+        (backend, imgsz, on_off[roi], on_off[gate], on_off[track])
+        for backend in args.backends
+        for imgsz in (args.imgsz or [None])
+        for roi in args.roi
+        for gate in args.gate
+        for track in args.track
+    ]
+    rows = []
+    for backend, imgsz, roi, gate, track in configs:
+        label = "{} {}{}{}{}".format(backend, imgsz or "def", " roi" if roi else "", " gate" if gate else "",
+                                     " track" if track else "")
+        try:
+            rows.append((label, _replay_once(source, backend, imgsz, roi, gate, track, args)))
+        except Exception as exc:
+            rows.append((label, exc))
+
+    pace = "as fast as possible" if args.pace <= 0 else "{:g}x real time".format(args.pace)
+    print("[*] Replayed {} ({}, {} configs)".format(source, pace, len(configs)))
+    print("    {:<28} {:>6} {:>6} {:>6} {:>7} {:>5} {:>8} {:>7} {:>7} {:>7} {:>5} {:>7} {:>7}".format(
+        "config", "frames", "infer", "saved", "fps", "fire", "fwd p50", "p50", "p95", "p99", "cpu%", "rss MB", "gpu MB"))
+    for label, r in rows:
+        if isinstance(r, Exception):
+            print("    {:<28} [X] {}".format(label, r))
+            continue
+        print("    {:<28} {:>6d} {:>6d} {:>6d} {:>7.1f} {:>5d} {:>8.1f} {:>7.1f} {:>7.1f} {:>7.1f} {:>5.0f} {:>7.0f} {:>7}".format(
+            label, r["frames"], r["inferred"], r["saved"], r["fps"], r["fire"], r["forward_p50"],
+            r["p50"], r["p95"], r["p99"], r["cpu_pct"], r["rss_mb"],
+            "-" if r["gpu_mb"] is None else "{:.0f}".format(r["gpu_mb"])))
+    print("    fps = YOLO passes per second; p50/p95/p99 = capture-to-publish ms (incl. tracked/gated frames)")
+    return 0 if all(not isinstance(r, Exception) for _, r in rows) else 1
+
+
+# ---------------------------------------------------------------------- #
+# Frame buffer allocations around the model
+# ---------------------------------------------------------------------- #
+class _NullBackend:
+    """Backend with a free forward pass, so only FireDetector's own frame handling is measured."""
+
+    names = {0: "fire"}
+
+    def __init__(self, accepts_rgb: bool) -> None:
+        self.accepts_rgb = accepts_rgb
+
+    def __call__(self, frame: np.ndarray, conf: float, imgsz: Optional[int] = None, rgb: bool = False) -> List[Any]:
+        return [BackendResult(frame, np.zeros((0, 6), dtype=np.float32), self.names, rgb=rgb)]
+
+
+def _minor_faults() -> int:
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    except Exception:
+        return 0
+
+
+def _alloc_run(frames: List[np.ndarray], count: int, fps: float, pool_size: int, accepts_rgb: bool,
+               render: bool, trace: bool) -> Dict[str, float]:
+    C.FRAME_POOL_SIZE = pool_size
+    detector = D.FireDetector(enable_model=True, show_video=False, backend=_NullBackend(accepts_rgb))
+    if render:
+        detector.attach_clip_recorder(ClipRecorder(preroll_secs=0.0, budget_mb=16))  # a small ring: cost per frame only
+    if trace:
+        tracemalloc.start()
+    period = 1.0 / fps if fps > 0 else 0.0
+    infer_secs = 0.0
+    faults = _minor_faults()
+    start = time.perf_counter()
+    try:
+        for i in range(count):
+            t_call = time.perf_counter()
+            detector.infer(frames[i % len(frames)])
+            infer_secs += time.perf_counter() - t_call
+            # Pace like a camera so the render stage sees (nearly) every frame.
+            delay = start + (i + 1) * period - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        faults = _minor_faults() - faults
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    finally:
+        if trace:
+            tracemalloc.stop()
+        pool = detector._buffers
+        rendered = detector.timings.summary().get("record", {}).get("count", 0)
+        detector.close(report=False)
+    return {
+        "us": infer_secs / count * 1e6,
+        "faults": faults / float(count),
+        "rendered": rendered,
+        "allocs": pool.allocations,
+        "mb": pool.allocated_bytes / (1024.0 * 1024.0),
+        "peak_mb": peak / (1024.0 * 1024.0),
+    }
+
+
+def bench_alloc(args: argparse.Namespace) -> int:
+    C.VIDEO_SAVE_PATH = None
+    C.GATE_ENABLE = False
+    C.TELLO_FRAME_RGB = True  # the drone's format, i.e. the case that needs a conversion
+    rng = np.random.default_rng(0)
+    # A few distinct frames, like a decoder handing out a new array each time.
+    frames = [rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+    modes = [
+        ("allocate per frame", 0, False),
+        ("pooled BGR buffer", int(args.pool), False),
+        ("RGB to model", int(args.pool), True),
+    ]
+    print("[*] Frame handling in infer() ({}x{} RGB, {} frames at {:g} fps, render {})".format(
+        args.width, args.height, args.frames, args.fps, "on" if args.render else "off"))
+    print("    {:<20} {:>10} {:>12} {:>9} {:>9} {:>11} {:>9}".format(
+        "mode", "infer us", "faults/frm", "rendered", "buffers", "buffer MB", "peak MB"))
+    for label, pool_size, accepts_rgb in modes:
+        timed = _alloc_run(frames, args.frames, args.fps, pool_size, accepts_rgb, args.render, trace=False)
+        traced = _alloc_run(frames, max(10, args.frames // 5), args.fps, pool_size, accepts_rgb, args.render, trace=True)
+        print("    {:<20} {:>10.0f} {:>12.1f} {:>9d} {:>9d} {:>11.1f} {:>9.1f}".format(
+            label, timed["us"], timed["faults"], int(timed["rendered"]), int(timed["allocs"]), timed["mb"],
+            traced["peak_mb"]))
+    print("    infer us = time inside infer(); faults = minor page faults (all threads);")
+    print("    buffers/buffer MB = frame-sized arrays allocated by the detector; peak MB = tracemalloc peak")
+    return 0
+
+
+# ---------------------------------------------------------------------- #
+# Clip pre-roll at the detector's real inference rate
+# ---------------------------------------------------------------------- #
+def bench_preroll(args: argparse.Namespace) -> int:
+    """
+    Run the async loop on a synthetic camera with a ClipRecorder attached,
+    so the ring fills at the rate the render stage actually sees, and check
+    that it keeps CLIP_PREROLL_SECS of frames.
+    """
+    C.VIDEO_SAVE_PATH = None
+    C.GATE_ENABLE = False
+    C.TRACK_ENABLE = False
+    hz = float(args.hz if args.hz is not None else C.ASYNC_FRAME_HZ)
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+    start = time.time()
+
+    def camera() -> np.ndarray:
+        # A new array object per camera frame, as djitellopy's decoder hands out.
+        return frames[int((time.time() - start) * args.camera_fps) % len(frames)]
+
+    detector = D.FireDetector(enable_model=True, show_video=False, backend=_NullBackend(False))
+    recorder = ClipRecorder(budget_mb=args.budget_mb)
+    detector.attach_clip_recorder(recorder)
+    try:
+        detector.start_async(camera, poll_interval=1.0 / hz)
+        time.sleep(recorder.preroll_secs + args.settle)
+        held = recorder.buffered_secs
+        inferred = detector.frames_inferred
+        elapsed = time.time() - start
+    finally:
+        detector.close(report=False)
+    print("[*] Clip pre-roll: {:g} Hz requested, {:.1f} Hz inferred from a {:g} fps camera".format(
+        hz, inferred / elapsed, args.camera_fps))
+    print("    ring {} frames sized for {:.1f} Hz; holds {:.2f}s of pre-roll (want {:.2f}s)".format(
+        recorder.capacity, recorder.fps, held, recorder.preroll_secs))
+    # One inference period of slack: the oldest frame sits up to one period after the pre-roll start.
+    if held + 1.0 / recorder.fps < recorder.preroll_secs:
+        print("[X] The ring keeps less than CLIP_PREROLL_SECS at the detector's rate")
+        return 1
+    return 0
+
+
+# ---------------------------------------------------------------------- #
+# Detection debouncing on recorded sequences
+# ---------------------------------------------------------------------- #
+def _load_sidecar(path: Path) -> List[D.FireDetection]:
+    """FireDetections from a DetectionSidecar JSONL, stamped with the recording's pts."""
+    dets = []
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            e = json.loads(line)
+            dets.append(D.FireDetection(
+                bool(e.get("has_fire")), 0, 0, 0.0, float(e.get("conf") or 0.0),
+                tuple(e["bbox"]) if e.get("bbox") else None,
+                timestamp=float(e.get("pts_ms", 0)) / 1000.0,
+                label=e.get("label"),
+                tracked=bool(e.get("tracked")),
+                reused=bool(e.get("reused")),
+            ))
+    return dets
+
+
+def _debounce_run(dets: List[D.FireDetection], debouncer: D.DetectionDebouncer) -> Dict[str, Any]:
+    naive = 0
+    was_hit = False
+    episode_start = last_hit = None  # type: Optional[float]
+    latencies = []  # type: List[float]
+    events = []  # type: List[List[Any]]
+    was_confirmed = False
+    for det in dets:
+        # The old loop engaged on every detection that showed a target after one that did not.
+        if det.has_fire and not was_hit:
+            naive += 1
+        if det.has_fire and not det.tracked and not det.reused:
+            if last_hit is None or det.ts - last_hit > debouncer.lost_s:
+                episode_start = det.ts
+            last_hit = det.ts
+        was_hit = det.has_fire
+        confirmed = debouncer.update(det)
+        if confirmed != was_confirmed:
+            events.append(["confirm" if confirmed else "lost", int(round(det.ts * 1000.0))])
+        if confirmed and not was_confirmed and episode_start is not None:
+            latencies.append(det.ts - episode_start)
+        was_confirmed = confirmed
+    return {
+        "frames": len(dets),
+        "hits": sum(1 for d in dets if d.has_fire and not d.tracked and not d.reused),
+        "naive": naive,
+        "confirmed": debouncer.confirmations,
+        "latency_ms": 1000.0 * float(np.median(latencies)) if latencies else 0.0,
+        "events": events,
+    }
+
+
+DEBOUNCE_CASES = Path(__file__).resolve().parent / "bench_data" / "debounce"
+
+
+def _debounce_check(case_dir: Path) -> int:
+    """
+    Replay the committed synthetic sequences (spurious hit, flicker, sustained
+    target, loss and reacquisition, one hit plus gate replays, targets just
+    above the confidence floor) and compare the confirm/lost transitions
+    with expected.json. The debouncer settings
+    come from the manifest, so edits to beta_config do not move the goalposts.
+    """
+    manifest_path = case_dir / "expected.json"
+    if not manifest_path.exists():
+        print("[X] No expected.json in {}".format(case_dir))
+        return 2
+    with manifest_path.open("r", encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    params = manifest.get("params", {})
+    failed = 0
+    print("[*] Debounce check: {} sequences from {} ({})".format(
+        len(manifest["sequences"]), case_dir, manifest.get("source", "unknown source")))
+    for name, expected in sorted(manifest["sequences"].items()):
+        row = _debounce_run(_load_sidecar(case_dir / name), D.DetectionDebouncer(**params))
+        ok = row["events"] == expected
+        failed += int(not ok)
+        print("    {:<24} {}".format(name, "ok" if ok else "FAIL"))
+        if not ok:
+            print("      expected {}".format(expected))
+            print("      got      {}".format(row["events"]))
+    if failed:
+        print("[X] {} sequence(s) changed their confirm/lost transitions".format(failed))
+        return 1
+    return 0
+
+
+def bench_debounce(args: argparse.Namespace) -> int:
+    if args.check:
+        return _debounce_check(Path(args.sources[0]) if args.sources else DEBOUNCE_CASES)
+    paths = []  # type: List[Path]
+    for src in args.sources:
+        p = Path(src)
+        paths.extend(sorted(p.glob("*.jsonl")) if p.is_dir() else [p])
+    if not paths:
+        print("[X] No detection sidecars (*.jsonl) found")
+        return 1
+    kwargs = dict(window=args.window, hits=args.hits, persist_ms=args.persist_ms, lost_ms=args.lost_ms,
+                  min_conf=args.min_conf)
+    probe = D.DetectionDebouncer(**kwargs)
+    print("[*] Debounce: {}-of-{} hits, persist {:.0f} ms, lost {:.0f} ms, conf EMA >= {:.2f}".format(
+        probe.hits_needed, probe.window, probe.persist_s * 1000.0, probe.lost_s * 1000.0, probe.min_conf))
+    print("    {:<32} {:>7} {:>7} {:>9} {:>10} {:>11}".format(
+        "sequence", "frames", "hits", "naive", "confirmed", "latency ms"))
+    total = 0
+    for path in paths:
+        row = _debounce_run(_load_sidecar(path), D.DetectionDebouncer(**kwargs))
+        total += int(row["confirmed"])
+        print("    {:<32} {:>7d} {:>7d} {:>9d} {:>10d} {:>11.0f}".format(
+            path.name[-32:], row["frames"], row["hits"], row["naive"], row["confirmed"], row["latency_ms"]))
+    print("    naive = engagements the undebounced loop would start; latency = median first hit -> confirmed")
+    if args.expect is not None and total != args.expect:
+        print("[X] Expected {} confirmed target(s), got {}".format(args.expect, total))
+        return 1
+    return 0
+
+
+# ---------------------------------------------------------------------- #
+# Entry-point startup time
+# ---------------------------------------------------------------------- #
+STARTUP_COMMANDS = {
+    "dry_main": ["dry_main.py", "--help"],
+    "runner_dry": ["runner.py", "dry"],
+    "beta_main": ["beta_main.py", "--help"],
+    "beta_detect": ["beta_detect.py", "--help"],
+}
+
+
+def _parse_importtime(stderr: str) -> List[tuple]:
+    """(module, cumulative us) for the top-level imports in ``python -X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        name = parts[2]
+        if len(name) - len(name.lstrip()) > 1:
+            continue  # nested import, already counted in its parent
+        rows.append((name.strip(), int(parts[1])))
+    return rows
+
+
+def bench_startup(args: argparse.Namespace) -> int:
+    here = Path(__file__).resolve().parent
+    out_dir = Path(args.out) if args.out else None
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    names = args.commands or list(STARTUP_COMMANDS)
+    unknown = [n for n in names if n not in STARTUP_COMMANDS]
+    if unknown:
+        print("[X] Unknown entry {}; choose from {}".format(", ".join(unknown), ", ".join(STARTUP_COMMANDS)))
+        return 2
+    print("[*] Startup time ({} runs each, median wall time; top imports by cumulative time)".format(args.repeat))
+    print("    {:<12} {:>9} {:>11}  {}".format("entry", "wall ms", "imports ms", "heaviest imports"))
+    slow = []
+    for name in names:
+        cmd = [sys.executable, "-X", "importtime"] + STARTUP_COMMANDS[name]
+        walls = []
+        stderr = ""
+        for _ in range(max(1, args.repeat)):
+            start = time.perf_counter()
+            proc = subprocess.run(cmd, cwd=str(here), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                  universal_newlines=True)
+            walls.append(time.perf_counter() - start)
+            stderr = proc.stderr
+        rows = _parse_importtime(stderr)
+        wall_ms = 1000.0 * float(np.median(walls))
+        top = sorted(rows, key=lambda r: -r[1])[:args.top]
+        print("    {:<12} {:>9.0f} {:>11.0f}  {}".format(
+            name, wall_ms, sum(r[1] for r in rows) / 1000.0,
+            ", ".join("{} {:.0f}".format(mod, us / 1000.0) for mod, us in top)))
+        if out_dir is not None:
+            (out_dir / "importtime_{}.txt".format(name)).write_text(stderr, encoding="utf-8")
+        if args.budget_ms > 0 and wall_ms > args.budget_ms:
+            slow.append(name)
+    if out_dir is not None:
+        print("    raw -X importtime output saved to {}".format(out_dir))
+    if slow:
+        print("[X] Over the {:.0f} ms budget: {}".format(args.budget_ms, ", ".join(slow)))
+        return 1
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline detector micro-benchmarks (no drone required).")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    p_select = sub.add_parser("select", help="per-box loop vs vectorized best-box selection")
+    p_select.add_argument("--boxes", type=int, nargs="+", default=[1, 10, 100], help="box counts to time")
+    p_select.add_argument("--classes", type=int, default=80, help="number of model classes")
+    p_select.add_argument("--repeat", type=int, default=2000, help="timed runs per box count")
+    p_select.add_argument("--device", default="", help="torch device for boxes (e.g. cuda); empty uses numpy")
+    p_select.set_defaults(func=bench_select)
+
+    p_parity = sub.add_parser("parity", help="compare backends' FireDetection on recorded frames")
+    p_parity.add_argument("source", nargs="?", default=None,
+                          help="recorded video (e.g. videos/capture_*.mp4) or directory of frames")
+    p_parity.add_argument("--synthetic", type=int, default=0, metavar="N",
+                          help="use N generated frames instead (backends that cannot load are skipped)")
+    p_parity.add_argument("--backends", nargs="+", default=["ultralytics", "onnxruntime", "opencv"],
+                          help="backends to compare; the first is the reference")
+    p_parity.add_argument("--limit", type=int, default=300, help="max frames (0 = all)")
+    p_parity.add_argument("--stride", type=int, default=1, help="use every Nth frame")
+    p_parity.add_argument("--iou", type=float, default=0.5, help="min bbox IoU to count as the same target")
+    p_parity.add_argument("--conf-tol", type=float, default=0.10, help="max confidence difference")
+    p_parity.add_argument("--min-agree", type=float, default=0.95, help="fail below this agreement rate")
+    p_parity.set_defaults(func=bench_parity)
+
+    p_replay = sub.add_parser("replay", help="detector throughput/latency on a recording, per config")
+    p_replay.add_argument("source", help="recorded video (e.g. videos/capture_*.mp4) or directory of frames")
+    p_replay.add_argument("--backends", nargs="+", default=[getattr(C, "DETECT_BACKEND", "ultralytics")],
+                          help="backends to run (ultralytics, onnxruntime, opencv)")
+    p_replay.add_argument("--model", default=None, help="weights to use instead of YOLO_MODEL_PATH / ONNX_MODEL_PATH")
+    p_replay.add_argument("--imgsz", type=int, nargs="+", default=None,
+                          help="network input sizes (ONNX graphs keep their exported size)")
+    p_replay.add_argument("--roi", nargs="+", choices=["off", "on"], default=["off"], help="ROI mode settings to run")
+    p_replay.add_argument("--gate", nargs="+", choices=["off", "on"], default=["off"], help="scene gating settings")
+    p_replay.add_argument("--track", nargs="+", choices=["off", "on"], default=["off"], help="tracker settings")
+    p_replay.add_argument("--pace", type=float, default=0.0, help="replay speed (1 = real time, 0 = as fast as possible)")
+    p_replay.add_argument("--hz", type=float, default=0.0, help="cap YOLO passes per second (0 = detector minimum interval, 50/s)")
+    p_replay.add_argument("--limit", type=int, default=300, help="max frames (0 = all)")
+    p_replay.set_defaults(func=bench_replay)
+
+    p_alloc = sub.add_parser("alloc", help="frame buffer allocations in infer(): per-frame vs pooled vs RGB input")
+    p_alloc.add_argument("--frames", type=int, default=150, help="frames per mode")
+    p_alloc.add_argument("--fps", type=float, default=30.0, help="input frame rate (0 = back to back)")
+    p_alloc.add_argument("--width", type=int, default=960, help="frame width")
+    p_alloc.add_argument("--height", type=int, default=720, help="frame height")
+    p_alloc.add_argument("--pool", type=int, default=4, help="FRAME_POOL_SIZE for the pooled modes")
+    p_alloc.add_argument("--no-render", dest="render", action="store_false",
+                         help="skip the render stage (plot + clip pre-roll)")
+    p_alloc.set_defaults(func=bench_alloc)
+
+    p_preroll = sub.add_parser("preroll", help="seconds of clip pre-roll the ring keeps at the detector's real rate")
+    p_preroll.add_argument("--hz", type=float, default=None, help="detector inference rate (default ASYNC_FRAME_HZ)")
+    p_preroll.add_argument("--camera-fps", type=float, default=30.0, help="synthetic camera frame rate")
+    p_preroll.add_argument("--width", type=int, default=320, help="frame width")
+    p_preroll.add_argument("--height", type=int, default=240, help="frame height")
+    p_preroll.add_argument("--budget-mb", type=float, default=None, help="CLIP_BUFFER_MB override")
+    p_preroll.add_argument("--settle", type=float, default=1.0, help="extra seconds to run beyond the pre-roll")
+    p_preroll.set_defaults(func=bench_preroll)
+
+    p_debounce = sub.add_parser("debounce", help="confirmed targets vs raw hits on recorded detection sequences")
+    p_debounce.add_argument("sources", nargs="*", help="detection sidecars (videos/stream_*.jsonl) or directories")
+    p_debounce.add_argument("--check", action="store_true",
+                            help="verify confirm/lost transitions on the sequences in bench_data/debounce "
+                                 "(or the given directory) against its expected.json")
+    p_debounce.add_argument("--window", type=int, default=None, help="CONFIRM_WINDOW override")
+    p_debounce.add_argument("--hits", type=int, default=None, help="CONFIRM_HITS override")
+    p_debounce.add_argument("--persist-ms", type=float, default=None, help="FIRE_PERSIST_MS override")
+    p_debounce.add_argument("--lost-ms", type=float, default=None, help="FIRE_LOST_MS override")
+    p_debounce.add_argument("--min-conf", type=float, default=None, help="CONFIRM_MIN_CONF override")
+    p_debounce.add_argument("--expect", type=int, default=None,
+                            help="fail unless this many targets are confirmed in total")
+    p_debounce.set_defaults(func=bench_debounce)
+
+    p_startup = sub.add_parser("startup", help="entry-point start time with python -X importtime")
+    p_startup.add_argument("commands", nargs="*", metavar="entry",
+                           help="entries to time: {} (default: all)".format(", ".join(STARTUP_COMMANDS)))
+    p_startup.add_argument("--repeat", type=int, default=5, help="runs per entry (median reported)")
+    p_startup.add_argument("--top", type=int, default=4, help="heaviest top-level imports to list")
+    p_startup.add_argument("--out", default=None, help="directory for the raw -X importtime logs")
+    p_startup.add_argument("--budget-ms", type=float, default=0.0,
+                           help="fail if an entry's median wall time exceeds this (0 = report only)")
+    p_startup.set_defaults(func=bench_startup)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mission compiler: turns load_plan() segments into the SDK command program
+the segment loop executes. Forward legs are split into the fewest legal
+moves a step policy allows, instead of fixed FORWARD_STEP_CM chunks, and
+never into a remainder below MIN_MOVE_CM. The "go" flight mode instead
+flies the plan's polyline as body-frame go (and optionally curve) vectors
+with the heading held, so no rotations are needed at all; the "rc" mode
+follows the same body-frame path continuously (beta_rc.py).
+Shared by beta_main.py and dry_main.py, so it only depends on beta_config.
+"""
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import beta_config as C
+
+# "fixed" reproduces the legacy FORWARD_STEP_CM loop (kept for comparison).
+POLICIES = ("max", "cadence", "speed", "fixed")
+FLIGHT_MODES = ("waypoint", "go", "rc")
+
+# SDK limits for go/curve: each coordinate within +-MAX_MOVE_CM, not all within +-MIN_MOVE_CM.
+GO_SPEED_RANGE = (10, 100)
+CURVE_SPEED_RANGE = (10, 60)
+CURVE_RADIUS_RANGE = (50.0, 1000.0)
+
+
+class Command(NamedTuple):
+    seg: int      # index into the plan's segments
+    op: str       # "rotate" (+ = counter-clockwise, as in the plan), "forward", "go" or "curve"
+    value: int    # degrees or cm (path length for go/curve)
+    args: Tuple[int, ...] = ()  # go: x y z, curve: x1 y1 z1 x2 y2 z2 (body frame, +x forward, +y left)
+
+
+def policy_step_cm(policy: str, speed_cm_s: float) -> int:
+    """Longest forward move the policy allows, clamped to the SDK range."""
+    if policy == "max":
+        step = C.MAX_MOVE_CM
+    elif policy == "cadence":
+        step = getattr(C, "FORWARD_CHECK_CM", C.FORWARD_STEP_CM)
+    elif policy == "speed":
+        step = speed_cm_s * float(getattr(C, "FORWARD_CHECK_S", 2.0))
+    elif policy == "fixed":
+        step = C.FORWARD_STEP_CM
+    else:
+        raise ValueError("unknown forward policy {!r} (expected one of {})".format(policy, ", ".join(POLICIES)))
+    return int(max(C.MIN_MOVE_CM, min(C.MAX_MOVE_CM, step)))
+
+
+def split_forward(dist_cm: float, max_step_cm: int) -> Tuple[List[int], int]:
+    """
+    (steps, dropped_cm): ``dist_cm`` as the fewest moves of at most
+    ``max_step_cm``, sized evenly so none falls below MIN_MOVE_CM. Only a
+    whole leg shorter than MIN_MOVE_CM is dropped.
+    """
+    dist = int(round(dist_cm))
+    if dist < C.MIN_MOVE_CM:
+        return [], max(0, dist)
+    # Fewest moves that respect the step; fewer if that would make them illegally short.
+    count = max(1, min(math.ceil(dist / float(max_step_cm)), dist // C.MIN_MOVE_CM))
+    base, extra = divmod(dist, count)
+    return [base + 1] * extra + [base] * (count - extra), 0
+
+
+def _split_fixed(dist_cm: float) -> Tuple[List[int], int]:
+    """The legacy loop: FORWARD_STEP_CM chunks, a short tail is flown or dropped as it falls."""
+    remaining = int(round(dist_cm))
+    steps = []  # type: List[int]
+    while remaining >= C.MIN_MOVE_CM:
+        step = min(C.FORWARD_STEP_CM, remaining, C.MAX_MOVE_CM)
+        steps.append(step)
+        remaining -= step
+    return steps, max(0, remaining)
+
+
+def compile_plan(
+    segs: Sequence[Tuple[int, int]],
+    policy: Optional[str] = None,
+    speed_cm_s: Optional[float] = None,
+    detection_active: bool = True,
+) -> Tuple[List[Command], int]:
+    """
+    (program, dropped_cm) for the plan's (turn_deg, dist_cm) segments.
+    Detection is polled after every forward move, so while it runs the
+    step comes from ``policy`` (default FORWARD_POLICY); without it, legs
+    fly as maximum legal moves.
+    """
+    speed = float(speed_cm_s if speed_cm_s is not None else C.SPEED_CM_S)
+    if policy is None:
+        policy = getattr(C, "FORWARD_POLICY", "cadence")
+    max_step = _resolve_step(policy, speed, detection_active)
+    program = []  # type: List[Command]
+    dropped = 0
+    for idx, (turn_deg, dist_cm) in enumerate(segs):
+        if turn_deg:
+            program.append(Command(idx, "rotate", int(turn_deg)))
+        steps, lost = _split_fixed(dist_cm) if policy == "fixed" else split_forward(dist_cm, max_step)
+        program.extend(Command(idx, "forward", step) for step in steps)
+        dropped += lost
+    return program, dropped
+
+
+def _resolve_step(policy: Optional[str], speed_cm_s: float, detection_active: bool) -> int:
+    if policy is None:
+        policy = getattr(C, "FORWARD_POLICY", "cadence")
+    if not detection_active and policy != "fixed":
+        policy = "max"
+    return policy_step_cm(policy, speed_cm_s)
+
+
+Vec = Tuple[float, float]
+
+
+def _add(a: Vec, b: Vec, scale: float = 1.0) -> Vec:
+    return (a[0] + b[0] * scale, a[1] + b[1] * scale)
+
+
+def _sub(a: Vec, b: Vec) -> Vec:
+    return (a[0] - b[0], a[1] - b[1])
+
+
+def _reach(vec: Vec) -> float:
+    return max(abs(vec[0]), abs(vec[1]))
+
+
+def _rounded(vec: Vec) -> Tuple[int, int]:
+    return (int(round(vec[0])), int(round(vec[1])))
+
+
+def _fillet(prev_pt: Vec, corner: Vec, next_pt: Vec, cut_cm: float):
+    """
+    (start, mid, end, arc_len) of the arc rounding ``corner``, tangent to both
+    legs ``cut_cm`` before and after it; None if the turn is too slight or the
+    radius falls outside what curve accepts.
+    """
+    leg_in, leg_out = _sub(corner, prev_pt), _sub(next_pt, corner)
+    len_in, len_out = math.hypot(*leg_in), math.hypot(*leg_out)
+    if len_in <= 0 or len_out <= 0:
+        return None
+    u_in = (leg_in[0] / len_in, leg_in[1] / len_in)
+    u_out = (leg_out[0] / len_out, leg_out[1] / len_out)
+    turn = math.acos(max(-1.0, min(1.0, u_in[0] * u_out[0] + u_in[1] * u_out[1])))
+    if turn < math.radians(max(1, getattr(C, "MIN_TURN_DEG", 0))) or turn > math.pi - 1e-3:
+        return None
+    cut = min(cut_cm, 0.5 * len_in, 0.5 * len_out)
+    radius = cut / math.tan(turn / 2.0)
+    if not CURVE_RADIUS_RANGE[0] - 1e-6 <= radius <= CURVE_RADIUS_RANGE[1] + 1e-6:
+        return None
+    inward = _sub(u_out, u_in)  # bisector, pointing into the turn
+    inward_len = math.hypot(*inward)
+    mid = _add(corner, inward, (radius / math.cos(turn / 2.0) - radius) / inward_len)
+    return _add(corner, u_in, -cut), mid, _add(corner, u_out, cut), radius * turn
+
+
+def _go_to(program: List[Command], seg: int, cur: Vec, target: Vec, max_step: int) -> Vec:
+    """Append go commands from ``cur`` to ``target`` (chunked to ``max_step``); returns the new position."""
+    vec = _sub(target, cur)
+    reach = _reach(vec)
+    if reach < C.MIN_MOVE_CM:
+        return cur  # too short for the SDK; carried into the next command
+    count = max(math.ceil(math.hypot(*vec) / max_step), math.ceil(reach / C.MAX_MOVE_CM))
+    count = max(1, min(count, int(reach // C.MIN_MOVE_CM)))
+    start = cur
+    for k in range(1, count + 1):
+        dx, dy = _rounded(_sub(_add(start, vec, k / float(count)), cur))
+        program.append(Command(seg, "go", int(round(math.hypot(dx, dy))), (dx, dy, 0)))
+        cur = (cur[0] + dx, cur[1] + dy)
+    return cur
+
+
+def body_path(points: Sequence[Tuple[float, float]], segs: Sequence[Tuple[int, int]]) -> List[Vec]:
+    """
+    The plan's polyline ``points`` (cm) in the takeoff body frame (+x
+    forward, +y left), starting at the origin. The nose at takeoff is the
+    first leg's direction minus the plan's first turn, as in waypoint mode.
+    """
+    legs = [_sub(points[i + 1], points[i]) for i in range(len(points) - 1)]
+    first = next((leg for leg in legs if math.hypot(*leg) > 0), None)
+    if first is None:
+        return [(0.0, 0.0)]
+    turn0 = segs[0][0] if segs else 0
+    heading = math.atan2(first[1], first[0]) - math.radians(turn0)
+    # Plan canvas -> body frame at takeoff; +y is the side the plan's positive turns go to.
+    cos_h, sin_h = math.cos(heading), math.sin(heading)
+    body = []  # type: List[Vec]
+    for pt in points:
+        wx, wy = _sub(pt, points[0])
+        body.append((wx * cos_h + wy * sin_h, -wx * sin_h + wy * cos_h))
+    return body
+
+
+def path_length(path: Sequence[Vec]) -> float:
+    return sum(math.hypot(*_sub(b, a)) for a, b in zip(path, path[1:]))
+
+
+def compile_go_plan(
+    points: Sequence[Tuple[float, float]],
+    segs: Sequence[Tuple[int, int]],
+    policy: Optional[str] = None,
+    speed_cm_s: Optional[float] = None,
+    detection_active: bool = True,
+    curves: Optional[bool] = None,
+) -> Tuple[List[Command], int]:
+    """
+    (program, dropped_cm) flying the plan's polyline ``points`` (cm) as go
+    vectors in the takeoff body frame (see body_path()), so the nose stays
+    where it was at takeoff. Legs are chunked like compile_plan(); with ``curves`` (default GO_CURVES)
+    each corner is rounded by one curve command, cutting CURVE_CUT_CM from
+    the legs on either side. Rounding residue is carried into the next
+    command, so the commanded path closes on the plan's end point.
+    """
+    speed = float(speed_cm_s if speed_cm_s is not None else C.SPEED_CM_S)
+    max_step = _resolve_step(policy, speed, detection_active)
+    if curves is None:
+        curves = bool(getattr(C, "GO_CURVES", False))
+    body = body_path(points, segs)
+    if len(body) < 2:
+        return [], 0
+
+    cut_cm = float(getattr(C, "CURVE_CUT_CM", 60))
+    fillets = [None] * len(body)
+    if curves:
+        for i in range(1, len(body) - 1):
+            fillets[i] = _fillet(body[i - 1], body[i], body[i + 1], cut_cm)
+
+    program = []  # type: List[Command]
+    cur = (0.0, 0.0)  # commanded position (whole cm)
+    for seg in range(len(body) - 1):
+        fillet = fillets[seg + 1]
+        cur = _go_to(program, seg, cur, body[seg + 1] if fillet is None else fillet[0], max_step)
+        if fillet is None:
+            continue
+        _, mid, end, arc_len = fillet
+        p1, p2 = _rounded(_sub(mid, cur)), _rounded(_sub(end, cur))
+        if all(C.MIN_MOVE_CM <= _reach(p) <= C.MAX_MOVE_CM for p in (p1, p2)):
+            program.append(Command(seg, "curve", int(round(arc_len)), (p1[0], p1[1], 0, p2[0], p2[1], 0)))
+            cur = (cur[0] + p2[0], cur[1] + p2[1])
+        else:
+            cur = _go_to(program, seg, cur, body[seg + 1], max_step)  # fall back to a sharp corner
+    dropped = int(round(math.hypot(*_sub(body[-1], cur))))
+    return program, dropped
+
+
+def forward_steps_by_segment(program: Sequence[Command]) -> Dict[int, List[int]]:
+    steps = {}  # type: Dict[int, List[int]]
+    for cmd in program:
+        if cmd.op == "forward":
+            steps.setdefault(cmd.seg, []).append(cmd.value)
+    return steps
+
+
+def go_speed(speed_cm_s: float, curve: bool = False) -> int:
+    """The plan speed clamped to what go (or curve) accepts."""
+    low, high = CURVE_SPEED_RANGE if curve else GO_SPEED_RANGE
+    return int(max(low, min(high, round(speed_cm_s))))
+
+
+def _rotate_chunks(deg: int) -> int:
+    """SDK commands rotate_signed_deg() sends for a turn (0 below MIN_TURN_DEG)."""
+    if abs(deg) < max(1, getattr(C, "MIN_TURN_DEG", 0)):
+        return 0
+    chunk = abs(int(getattr(C, "TURN_CHUNK_DEG", 0) or 0))
+    return math.ceil(abs(deg) / float(chunk)) if chunk else 1
+
+
+def command_count(program: Sequence[Command]) -> int:
+    return sum(_rotate_chunks(cmd.value) if cmd.op == "rotate" else 1 for cmd in program)
+
+
+def estimate_seconds(program: Sequence[Command], speed_cm_s: float) -> float:
+    """
+    Rough flight time: travel or rotation time, plus CMD_OVERHEAD_S and the
+    settle bound for every SDK command sent.
+    """
+    overhead = float(getattr(C, "CMD_OVERHEAD_S", 2.0))
+    yaw_rate = float(getattr(C, "ROTATE_DEG_PER_SEC", 90.0))
+    total = 0.0
+    for cmd in program:
+        if cmd.op in ("forward", "go", "curve"):
+            speed = go_speed(speed_cm_s, cmd.op == "curve") if cmd.op != "forward" else speed_cm_s
+            total += (cmd.value / speed if speed > 0 else 0.0) + overhead + C.MOVE_SLEEP
+        else:
+            chunks = _rotate_chunks(cmd.value)
+            if chunks:
+                total += abs(cmd.value) / yaw_rate + chunks * (overhead + C.TURN_SLEEP)
+    return total
+
+
+__all__ = [
+    "POLICIES", "FLIGHT_MODES", "Command", "policy_step_cm", "split_forward", "compile_plan",
+    "body_path", "path_length", "compile_go_plan", "forward_steps_by_segment", "go_speed", "command_count", "estimate_seconds",
+]
@@ -14,9 +14,9 @@ LOW_BATT_RTH       = 10      # % battery threshold (abort at/under this)
 PAUSE_PER_SEG      = 0.0     # pause after each segment (s)
 MIN_MOVE_CM        = 20      # Tello min distance per move (SDK)
 MAX_MOVE_CM        = 500     # Tello max distance per move (SDK)
-FORWARD_STEP_CM    = 60      # per sub-step while flying a segment
-TURN_SLEEP         = 0.2     # delay after rotate (s)
-MOVE_SLEEP         = 0.2     # delay after move (s)
+FORWARD_STEP_CM    = 60      # per sub-step of the legacy "fixed" forward policy
+TURN_SLEEP         = 0.2     # max settle wait after rotate (s); ends early once telemetry shows the yaw steady
+MOVE_SLEEP         = 0.2     # max settle wait after move (s); ends early once telemetry shows zero velocity
 RETRIES            = 2       # per-command retries
 RETRY_SLEEP        = 0.2     # delay between retries
 TURN_CHUNK_DEG     = 45      # split large turns into <= this many degrees per command (0 disables chunking)
@@ -29,6 +29,30 @@ RC_YAW_SPEED       = 60      # fallback rc yaw speed when imu rejects turn comma
 RC_YAW_DEG_PER_SEC = 90      # approximate yaw rate produced by RC_YAW_SPEED (deg/s)
 RC_YAW_RECOVER_PAUSE = 0.3   # pause after RC yaw fallback before next command (s)
 
+# Mission compiler (see beta_compile.py)
+FORWARD_POLICY     = "cadence" # forward step sizes while detection runs: "max", "cadence", "speed" or "fixed" (FORWARD_STEP_CM chunks)
+FORWARD_CHECK_CM   = 120     # "cadence": check detections at least every this many cm
+FORWARD_CHECK_S    = 2.0     # "speed": check detections at least every this many seconds of travel
+CMD_OVERHEAD_S     = 2.0     # estimates only: accel/brake + response round trip per SDK command (s)
+ROTATE_DEG_PER_SEC = 90      # estimates only: yaw rate of a rotate command (deg/s)
+
+# Flight mode
+FLIGHT_MODE        = "waypoint"  # "waypoint": rotate then forward per segment; "go": body-frame go x y z with the heading held (no turns); "rc": continuous RC velocity flight
+GO_CURVES          = False   # "go": round corners with curve commands (radius 0.5-10 m, max 60 cm/s)
+CURVE_CUT_CM       = 60      # "go": each curve starts/ends this far before/after the corner (cm)
+
+# Continuous RC flight (FLIGHT_MODE = "rc", see beta_rc.py)
+RC_RATE_HZ         = 20      # control loop rate; a confirmed detection is acted on within one tick
+RC_FULL_SCALE_CM_S = 100     # ground speed produced by a full (100) stick (cm/s)
+RC_LOOKAHEAD_CM    = 40      # pure-pursuit carrot distance ahead along the path
+RC_ARRIVE_CM       = 15      # path end (and each corner) counts as reached within this distance
+RC_BRAKE_GAIN      = 1.0     # speed limit near the end: this many cm/s per cm left (min 10 cm/s)
+RC_YAW_GAIN        = 2.0     # rc yaw per degree of heading error (capped at RC_YAW_SPEED)
+RC_WATCHDOG_S      = 0.3     # zero the sticks if the loop has not ticked for this long (s)
+RC_TELEMETRY_STALE_S = 0.5   # hover while the newest state sample is older than this (s)
+RC_STALL_ABORT_S   = 3.0     # land the mission after hovering this long without telemetry (s)
+RC_TIMEOUT_FACTOR  = 3.0     # land the mission if the path takes this many times its expected time
+
 # Connectivity
 CONNECT_RETRIES    = 4       # connect attempts
 CONNECT_BACKOFF    = 1.0     # seconds between connect attempts
@@ -44,6 +68,8 @@ COMMAND_TIMEOUT_PAD = {      # extra grace before timeout, optional per-distance
     "move_back": {"base": 0.8, "per_cm": 0.03},
     "move_left": {"base": 0.8, "per_cm": 0.03},
     "move_right": {"base": 0.8, "per_cm": 0.03},
+    "go": {"base": 1.0, "per_cm": 0.03},
+    "curve": {"base": 1.5, "per_cm": 0.04},
 }
 COMMAND_SUCCESS_TOL_CM = 10   # tolerance when checking state-based completion
 TAKEOFF_SUCCESS_HEIGHT_CM = 30  # height considered successful takeoff
@@ -58,8 +84,18 @@ ENABLE_AI          = True
 # Model
 _MODEL_DIR         = Path(__file__).resolve().parent
 YOLO_MODEL_PATH    = str((_MODEL_DIR / "best.pt").resolve())  # change to your weights if needed
+DETECT_BACKEND     = "ultralytics"     # "ultralytics", "onnxruntime" (CPU) or "opencv" (cv2.dnn)
+ONNX_MODEL_PATH    = str((_MODEL_DIR / "best.onnx").resolve())  # create with: python beta_backends.py export
+DETECT_IMGSZ       = 640               # ONNX network input size (letterboxed square)
+DETECT_IOU         = 0.70              # NMS IoU threshold for the ONNX backends (ultralytics default)
 DETECT_CLASSES     = ['fire']              # None = any class; or ['fire','smoke']
 DETECT_CONF        = 0.40              # confidence threshold (0..1)
+WARMUP_RUNS        = 2                 # dummy FRAME_W x FRAME_H inferences before takeoff (CUDA/cuDNN setup)
+MODEL_READY_TIMEOUT_S = 120.0          # takeoff waits this long for the model; then flies without detection
+DETECT_DAEMON      = True              # use a running `beta_daemon.py serve` (warm model) if there is one
+DETECT_DAEMON_SOCKET = "/tmp/beta_detector.sock"  # Unix socket of the detector daemon
+DETECT_DAEMON_TIMEOUT_S = 5.0          # per-request timeout; a failed request yields no detections
+DETECT_DAEMON_RETRY_S = 1.0            # reconnect interval after the daemon drops mid-flight (no in-air model load)
 
 # Video / geometry
 FRAME_W            = 960
@@ -71,9 +107,32 @@ V_FOV_DEG          = 52.0
 # Live preview window (works even if AI off)
 SHOW_VIDEO         = True              # show an OpenCV window with stream/overlay
 
+# Region-of-interest inference while engaging a locked target
+ROI_ENABLE         = True              # crop around the last bbox during engage_target (ultralytics; ONNX inputs are fixed)
+ROI_EXPAND         = 2.5               # crop side = this x the larger bbox side
+ROI_MIN_PX         = 320               # minimum crop side (pixels)
+ROI_FULL_EVERY     = 8                 # force a full-frame pass after this many ROI passes (0 = never)
+
+# Optical-flow tracking between YOLO passes (async loop only)
+TRACK_ENABLE       = True              # publish tracked detections on frames YOLO skips
+TRACK_SCALE        = 0.5               # downscale factor for the optical-flow images
+TRACK_MIN_POINTS   = 6                 # stop tracking below this many good feature points
+TRACK_MAX_SECS     = 1.0               # stop interpolating this long after the last YOLO hit
+
+# Scene-change gating: reuse the last result while the view is static (hover / hold)
+GATE_ENABLE        = False             # skip YOLO when consecutive frames barely differ (off until validated on replays)
+GATE_THUMB_W       = 64                # width of the grayscale thumbnail that is compared
+GATE_PIXEL_DELTA   = 12                # thumbnail pixel counts as changed above this abs difference (0-255)
+GATE_CHANGED_FRAC  = 0.001             # scene is "unchanged" while at most this fraction of pixels changed
+GATE_REFRESH_SECS  = 1.0               # always run a real inference at least this often
+
 # Debounce / decision
 FIRE_PERSIST_MS    = 200               # require detection persist this long to count as 'real'
 FIRE_LOST_MS       = 2000               # consider 'lost' after no detection for this long
+CONFIRM_WINDOW     = 5                 # YOLO results kept in the confirmation ring
+CONFIRM_HITS       = 3                 # hits within the ring needed to confirm a target (N of M)
+CONFIRM_CONF_EMA   = 0.5               # smoothing of the hit-confidence EMA (1.0 = last hit only)
+CONFIRM_MIN_CONF   = 0.40              # hit-confidence EMA needed to confirm (keep <= DETECT_CONF)
 
 # =========================
 # Fire Handling Behavior
@@ -93,6 +152,24 @@ APPROACH_DISTANCE_TOL_CM = 5   # acceptable +/- distance band
 APPROACH_TIMEOUT_S       = 60  # give up approaching after this many seconds
 APPROACH_LOST_MS         = 3000  # grace period without detection during approach
 
+# Telemetry (Tello state stream, ~10 Hz) kept in a ring for state reads and settle checks
+TELEMETRY_HISTORY        = 3000  # samples kept (~5 min)
+TELEMETRY_POLL_HZ        = 200   # how often the subscriber looks for a new state packet
+TELEMETRY_MAX_AGE_S      = 1.0   # state older than this counts as unavailable
+STATIONARY_WINDOW_S      = 0.3   # is_stationary() looks at this much history
+STATIONARY_VEL_TOL       = 1     # |vgx|,|vgy|,|vgz| at most this (state units, dm/s)
+TELEMETRY_VEL_CM_S       = 10    # cm/s per unit of vgx/vgy/vgz (the state stream reports dm/s)
+STATIONARY_YAW_TOL_DEG   = 1.0   # yaw spread within the window
+
+# Target-state estimate (Kalman filter over bearing/elevation/range) used while engaging
+ESTIMATE_MIN_UPDATES     = 3     # detections fused after a manoeuvre before the next one
+ESTIMATE_CENTER_NOISE_PX = 4.0   # bbox center noise (pixels, 1 sigma)
+ESTIMATE_WIDTH_NOISE_PX  = 2.0   # bbox width noise (pixels, 1 sigma); sets the range noise
+ESTIMATE_ANGLE_ACCEL_DEG = 20.0  # unmodelled bearing/elevation drift (deg/s^2)
+ESTIMATE_RANGE_ACCEL_M   = 0.3   # unmodelled range drift (m/s^2, hover wander)
+ESTIMATE_MOVE_NOISE      = 0.10  # commanded rotate/move error as a fraction of its size
+ESTIMATE_GATE_CHI2       = 16.0  # reject detections beyond this innovation distance (3 dof)
+
 # Optional recording (set path or None)
 _DEFAULT_VIDEO_DIR = Path(__file__).resolve().parent / "videos"
 _VIDEO_DIR_ENV     = os.environ.get("TELLO_VIDEO_DIR")
@@ -102,15 +179,27 @@ else:
     base_video_dir = _DEFAULT_VIDEO_DIR
 VIDEO_SAVE_PATH    = str((base_video_dir / "").resolve())
 VIDEO_CODEC        = "mp4v"
-VIDEO_FPS          = 60
+VIDEO_PASSTHROUGH  = False   # True: save the drone's raw H.264 (.mkv) + detections .jsonl instead of re-encoding
+VIDEO_FPS          = 60      # upper bound; the file uses the measured frame rate
+VIDEO_FPS_PROBE_SECS = 2.0   # measure the incoming frame rate this long before opening the file
+VIDEO_QUEUE_LEN    = 16      # frames buffered for the encoder thread
+VIDEO_QUEUE_POLICY = "drop_oldest"  # "drop_oldest" (never stall) or "block" (render waits for the encoder)
+# Event clips: pre-roll + engagement saved per target (independent of VIDEO_SAVE_PATH)
+CLIP_ENABLE        = False   # costs the ring below plus a render stage and a frame copy per inferred frame
+CLIP_DIR           = str(base_video_dir.resolve())
+CLIP_PREROLL_SECS  = 3.0     # seconds kept before the detection
+CLIP_BUFFER_MB     = 96      # memory cap for the pre-roll ring (3.25 s of 960x720 at ASYNC_FRAME_HZ=12 = 39 frames, ~77 MB)
 TELLO_FRAME_RGB    = True   # djitellopy delivers BGR frames; set True only if frames are already RGB
-ASYNC_FRAME_HZ     = 12      # background frame polling rate when stream is on
+ASYNC_FRAME_HZ     = 12      # model passes per second in flight (async loop); also sizes the clip pre-roll ring
+LATENCY_LOG_SECS   = 0.0     # also write the per-stage latency table to the AI log this often (0 = stdout at close only)
+FRAME_POOL_SIZE    = 4       # spare frame buffers the detector reuses instead of allocating per frame (0 = off)
 
 # Drift mitigation
 DRIFT_HEADING_TOL_DEG = 5    # correct heading if |actual-expected| exceeds this
 DRIFT_CORRECT_MAX_DEG = 10   # clamp correction magnitude per adjustment
 
 # Target specifications: real width (meters) and desired standoff distance (meters)
+# Optional "priority": lower is engaged first when several targets share a frame (default: listing order, then nearest)
 TARGET_SPECS = {
     "fire": {
         "real_width_m": 0.066,
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Long-lived detector service, so back-to-back missions skip the model load.
+``python beta_daemon.py serve`` loads the DETECT_BACKEND model once, warms
+it up and answers inference requests on a Unix socket (DETECT_DAEMON_SOCKET).
+With DETECT_DAEMON enabled, create_backend() hands FireDetector a
+DaemonBackend client instead of loading the model in-process; when no daemon
+is listening (or it serves a different model) it loads in-process as before.
+Once connected the client never falls back: a daemon lost mid-flight costs
+the frames until it reconnects, not a model load on the inference thread.
+
+Wire format, both directions: 4-byte big-endian header length, a JSON
+header, then ``header["nbytes"]`` raw bytes (the frame, or the (N, 6)
+float32 boxes of the reply).
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import beta_config as C
+
+PROTOCOL_VERSION = 1
+_HEADER_LEN = struct.Struct(">I")
+
+
+def _socket_path(path: Optional[str] = None) -> str:
+    return str(path or getattr(C, "DETECT_DAEMON_SOCKET", "/tmp/beta_detector.sock"))
+
+
+def _recv_exact(sock: socket.socket, nbytes: int) -> bytearray:
+    buf = bytearray(nbytes)
+    view = memoryview(buf)
+    got = 0
+    while got < nbytes:
+        n = sock.recv_into(view[got:], nbytes - got)
+        if n == 0:
+            raise ConnectionError("detector daemon connection closed")
+        got += n
+    return buf
+
+
+def send_msg(sock: socket.socket, header: Dict[str, Any], payload: Any = b"") -> None:
+    view = memoryview(payload).cast("B")  # frames go out without an extra copy
+    header = dict(header, nbytes=view.nbytes)
+    raw = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER_LEN.pack(len(raw)) + raw)
+    if view.nbytes:
+        sock.sendall(view)
+
+
+def recv_msg(sock: socket.socket) -> Tuple[Dict[str, Any], bytearray]:
+    (length,) = _HEADER_LEN.unpack(_recv_exact(sock, _HEADER_LEN.size))
+    header = json.loads(_recv_exact(sock, length).decode("utf-8"))
+    payload = _recv_exact(sock, int(header.get("nbytes", 0))) if header.get("nbytes") else bytearray()
+    return header, payload
+
+
+def model_identity(choice: str) -> Dict[str, str]:
+    """What a daemon must be serving for this process to use it."""
+    from beta_backends import model_path_for
+
+    return {"backend": choice, "model": str(Path(model_path_for(choice)).resolve())}
+
+
+# ---------------------------------------------------------------------- #
+# Client
+# ---------------------------------------------------------------------- #
+class DaemonBackend:
+    """
+    Backend that forwards each inference to the detector daemon. The
+    in-process fallback only happens at connect time (before takeoff); if
+    the daemon goes away mid-flight the failed frame yields no detections
+    and a background thread reconnects, so the inference thread never
+    blocks on a cold model load in the air.
+    """
+
+    def __init__(self, choice: str, path: Optional[str] = None, timeout: Optional[float] = None) -> None:
+        self.choice = choice
+        self.path = _socket_path(path)
+        self.timeout = float(timeout if timeout is not None else getattr(C, "DETECT_DAEMON_TIMEOUT_S", 5.0))
+        self.retry_s = max(0.1, float(getattr(C, "DETECT_DAEMON_RETRY_S", 1.0)))
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._reconnect_thread = None  # type: Optional[threading.Thread]
+        sock, hello = self._open()
+        self._sock = sock  # type: Optional[socket.socket]
+        self.names = {int(k): v for k, v in hello.get("names", {}).items()}
+        self.accepts_rgb = bool(hello.get("accepts_rgb", False))
+        self.dynamic_imgsz = bool(hello.get("dynamic_imgsz", False))
+        self.remote_calls = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    def _open(self) -> Tuple[socket.socket, Dict[str, Any]]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            send_msg(sock, dict(model_identity(self.choice), op="hello", version=PROTOCOL_VERSION))
+            hello, _ = recv_msg(sock)
+        except BaseException:
+            sock.close()
+            raise
+        if not hello.get("ok"):
+            sock.close()
+            raise RuntimeError(hello.get("error", "daemon refused the connection"))
+        return sock, hello
+
+    def _disconnect(self, exc: Exception) -> None:
+        """Drop the broken connection and start reconnecting (called with the lock held)."""
+        print(f"[DaemonBackend] Daemon unavailable ({exc}); skipping frames until it is back")
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+        self._sock = None
+        if not (self._reconnect_thread and self._reconnect_thread.is_alive()):
+            self._reconnect_thread = threading.Thread(target=self._reconnect_loop, name="daemon-reconnect",
+                                                      daemon=True)
+            self._reconnect_thread.start()
+
+    def _reconnect_loop(self) -> None:
+        while not self._closed.wait(self.retry_s):
+            try:
+                sock, _ = self._open()
+            except Exception:
+                continue
+            with self._lock:
+                if self._closed.is_set():
+                    sock.close()
+                    return
+                self._sock = sock
+                self.reconnects += 1
+            print(f"[DaemonBackend] Reconnected to daemon at {self.path}")
+            return
+
+    def __call__(self, frame: np.ndarray, conf: float, imgsz: Optional[int] = None, rgb: bool = False) -> List[Any]:
+        from beta_backends import BackendResult
+
+        with self._lock:
+            if self._sock is None:
+                self.dropped += 1
+                return []
+            image = np.ascontiguousarray(frame)
+            header = {"op": "infer", "shape": list(image.shape), "conf": float(conf),
+                      "imgsz": int(imgsz) if imgsz else None, "rgb": bool(rgb)}
+            try:
+                send_msg(self._sock, header, image)
+                reply, payload = recv_msg(self._sock)
+            except (OSError, ConnectionError, ValueError) as exc:
+                self._disconnect(exc)
+                self.dropped += 1
+                return []
+            if not reply.get("ok"):
+                raise RuntimeError("detector daemon: {}".format(reply.get("error")))
+            self.remote_calls += 1
+        boxes = np.frombuffer(payload, dtype=np.float32).reshape(-1, 6)
+        return [BackendResult(frame, boxes, self.names, rgb=rgb)]
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except Exception:
+                pass
+
+
+def connect(choice: str, path: Optional[str] = None) -> Optional[DaemonBackend]:
+    """A client for a daemon serving ``choice``'s model, or None (not running / other model)."""
+    sock_path = _socket_path(path)
+    if not os.path.exists(sock_path):
+        return None
+    try:
+        client = DaemonBackend(choice, sock_path)
+    except Exception as exc:
+        print(f"[DaemonBackend] Not using daemon at {sock_path}: {exc}")
+        return None
+    print(f"[DaemonBackend] Using warm '{choice}' model from daemon at {sock_path}")
+    return client
+
+
+# ---------------------------------------------------------------------- #
+# Server
+# ---------------------------------------------------------------------- #
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server = self.server  # type: DetectorDaemon
+        sock = self.request
+        while True:
+            try:
+                header, payload = recv_msg(sock)
+            except (OSError, ConnectionError, ValueError):
+                return
+            op = header.get("op")
+            if op == "infer":
+                send_msg(sock, *server.infer(header, payload))
+            elif op == "hello":
+                send_msg(sock, server.hello(header))
+            elif op == "status":
+                send_msg(sock, server.status())
+            elif op == "stop":
+                send_msg(sock, {"ok": True})
+                threading.Thread(target=server.shutdown, daemon=True).start()
+                return
+            else:
+                send_msg(sock, {"ok": False, "error": "unknown op {!r}".format(op)})
+
+
+class DetectorDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Holds one loaded backend and serves it to any number of clients (one inference at a time)."""
+
+    daemon_threads = True
+
+    def __init__(self, choice: str, path: Optional[str] = None) -> None:
+        from beta_backends import create_backend
+
+        self.choice = choice
+        self.path = _socket_path(path)
+        self.identity = model_identity(choice)
+        start = time.perf_counter()
+        self.backend = create_backend(choice, use_daemon=False)
+        self._model_lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.warmup()
+        self.load_secs = time.perf_counter() - start
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale socket; status()/serve() checked nobody is listening
+        old_umask = os.umask(0o177)  # the socket is created 0600; no window with default permissions
+        try:
+            super().__init__(self.path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def warmup(self) -> None:
+        dummy = np.zeros((int(C.FRAME_H), int(C.FRAME_W), 3), dtype=np.uint8)
+        for _ in range(max(1, int(getattr(C, "WARMUP_RUNS", 2)))):
+            self.backend(dummy, C.DETECT_CONF)
+
+    def hello(self, header: Dict[str, Any]) -> Dict[str, Any]:
+        wanted = {k: header.get(k) for k in self.identity}
+        if header.get("version") != PROTOCOL_VERSION:
+            return {"ok": False, "error": "protocol {} != {}".format(header.get("version"), PROTOCOL_VERSION)}
+        if wanted != self.identity:
+            return {"ok": False, "error": "daemon serves {backend} {model}".format(**self.identity)}
+        names = {str(k): v for k, v in dict(self.backend.names).items()}
+        return {"ok": True, "names": names, "accepts_rgb": bool(getattr(self.backend, "accepts_rgb", False)),
+                "dynamic_imgsz": bool(getattr(self.backend, "dynamic_imgsz", False))}
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.identity, ok=True, pid=os.getpid(), requests=self.requests,
+                    uptime_s=round(time.time() - self.started, 1), load_s=round(self.load_secs, 2))
+
+    def infer(self, header: Dict[str, Any], payload: bytearray) -> Tuple[Dict[str, Any], bytes]:
+        from beta_detect import boxes_to_array
+
+        try:
+            frame = np.frombuffer(payload, dtype=np.uint8).reshape(header["shape"])
+            kwargs = {}  # type: Dict[str, Any]
+            if header.get("imgsz"):
+                kwargs["imgsz"] = int(header["imgsz"])
+            if header.get("rgb"):
+                kwargs["rgb"] = True  # the client only sends RGB when accepts_rgb said so
+            with self._model_lock:
+                results = self.backend(frame, float(header.get("conf", C.DETECT_CONF)), **kwargs)
+                self.requests += 1
+            arrays = [boxes_to_array(r.boxes) for r in results if getattr(r, "boxes", None) is not None]
+            boxes = np.concatenate(arrays) if arrays else np.zeros((0, 6), dtype=np.float32)
+            return {"ok": True}, np.ascontiguousarray(boxes, dtype=np.float32).tobytes()
+        except Exception as exc:
+            return {"ok": False, "error": str(exc)}, b""
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def request(op: str, path: Optional[str] = None, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+    """Send a control op (status / stop); None if no daemon answers."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(_socket_path(path))
+            send_msg(sock, {"op": op})
+            reply, _ = recv_msg(sock)
+            return reply
+    except (OSError, ConnectionError, ValueError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Keep the detection model loaded between missions.")
+    parser.add_argument("--socket", default=None, help="Unix socket path (default DETECT_DAEMON_SOCKET)")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+    p_serve = sub.add_parser("serve", help="load the model and serve it until stopped")
+    p_serve.add_argument("--backend", default=None, help="backend to load (default DETECT_BACKEND)")
+    sub.add_parser("status", help="show whether a daemon is running and what it serves")
+    sub.add_parser("stop", help="stop a running daemon")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        reply = request("status", args.socket)
+        if reply is None:
+            print(f"[X] No detector daemon at {_socket_path(args.socket)}")
+            return 1
+        print("[*] Daemon pid {pid}: {backend} {model}, {requests} requests, up {uptime_s}s "
+              "(model load {load_s}s)".format(**reply))
+        return 0
+    if args.command == "stop":
+        if request("stop", args.socket) is None:
+            print(f"[X] No detector daemon at {_socket_path(args.socket)}")
+            return 1
+        print("[*] Detector daemon stopping")
+        return 0
+
+    if request("status", args.socket) is not None:
+        print(f"[X] A detector daemon is already running at {_socket_path(args.socket)}")
+        return 1
+    choice = str(args.backend or getattr(C, "DETECT_BACKEND", "ultralytics")).lower()
+    try:
+        server = DetectorDaemon(choice, args.socket)
+    except FileNotFoundError as e:
+        print(f"[X] {e}")
+        return 2
+    print(f"[*] Serving '{choice}' (loaded + warm in {server.load_secs:.1f}s) on {server.path}; Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,23 +1,46 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Simplified fire detection helper compatible with Python 3.8.
-Only performs YOLO inference and optional frame display/recording.
+Fire detection pipeline (Python 3.8 compatible).
+FireDetector runs capture -> inference -> render stages over a
+SequencedFrameSource, with a LatestWinsQueue between stages and a
+FrameBufferPool for frame reuse. Around the model pass it adds scene
+gating, ROI crops and a TargetTracker that interpolates between passes;
+every published FireDetection feeds a DetectionDebouncer that confirms
+targets. DetectorLoader loads and warms the model in the background.
+Run as a script for a live preview from the Tello or a recording.
 """
+import argparse
+import asyncio
+import collections
+import math
 import threading
 import time
 from pathlib import Path
-from typing import Optional, Tuple, Callable
+from typing import Any, Dict, List, Optional, Tuple, Callable, Union
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
 import beta_config as C
+from beta_backends import create_backend
+from beta_latency import StageTimings
+from beta_record import ClipRecorder, DetectionSidecar, ReplayFrameSource, VideoEncoder
+
+
+# One row per accepted box in FireDetection.boxes (full-frame pixels, best first).
+DETECTION_DTYPE = np.dtype([("cls", np.int32), ("conf", np.float32), ("xyxy", np.float32, (4,))])
 
 
 class FireDetection:
-    """Container for a single-frame detection result."""
+    """
+    Container for a single-frame detection result.
+
+    The scalar fields describe the primary (highest-confidence) target, as
+    before. ``boxes`` holds every accepted box as a DETECTION_DTYPE array
+    and ``best_by_class`` the best FireDetection per label, so callers can
+    pick another target from the same frame (see best_for()).
+    """
 
     def __init__(
         self,
@@ -29,6 +52,10 @@ class FireDetection:
         bbox: Optional[Tuple[int, int, int, int]] = None,
         timestamp: Optional[float] = None,
         label: Optional[str] = None,
+        tracked: bool = False,
+        boxes: Optional[np.ndarray] = None,
+        best_by_class: Optional[Dict[str, "FireDetection"]] = None,
+        reused: bool = False,
     ) -> None:
         self.has_fire = bool(has_fire)
         self.dx = float(dx)
@@ -38,15 +65,572 @@ class FireDetection:
         self.bbox = bbox
         self.ts = float(time.time() if timestamp is None else timestamp)
         self.label = label
+        self.tracked = bool(tracked)  # True when interpolated by the tracker, not a YOLO pass
+        self.reused = bool(reused)  # True when replayed by the scene gate (see refreshed())
+        self.observed_ts = self.ts  # when a model pass or the tracker last looked; kept by refreshed()
+        self.seq = 0  # publish order, assigned by FireDetector
+        self.capture_ts = self.ts  # capture time of the source frame, set by FireDetector
+        self.boxes = boxes if boxes is not None else np.zeros((0,), dtype=DETECTION_DTYPE)
+        if best_by_class is None:
+            best_by_class = {label: self} if self.has_fire and label is not None else {}
+        self.best_by_class = best_by_class
+
+    @property
+    def labels(self) -> List[str]:
+        """Labels seen in this frame, best confidence first."""
+        return sorted(self.best_by_class, key=lambda name: -self.best_by_class[name].conf)
+
+    def best_for(self, label: Optional[str]) -> Optional["FireDetection"]:
+        """Best detection of ``label`` in this frame (the primary one for None or an unlabelled result)."""
+        if not self.has_fire:
+            return None
+        if label is None or self.label is None or label == self.label:
+            return self
+        return self.best_by_class.get(label)
+
+    def refreshed(self, timestamp: Optional[float] = None) -> "FireDetection":
+        """
+        Copy of this detection with a new timestamp (scene judged unchanged).
+        The copy is marked ``reused`` and keeps ``observed_ts``: it is no new
+        evidence, so it must not count as a hit or look fresher than it is.
+        """
+        det = FireDetection(
+            self.has_fire,
+            dx=self.dx,
+            dy=self.dy,
+            area_frac=self.area_frac,
+            conf=self.conf,
+            bbox=self.bbox,
+            timestamp=timestamp,
+            label=self.label,
+            tracked=self.tracked,
+            boxes=self.boxes,
+            reused=True,
+        )
+        det.observed_ts = self.observed_ts
+        for name, best in self.best_by_class.items():
+            if best is not self:
+                det.best_by_class[name] = best.refreshed(det.ts)
+        return det
+
+
+def detection_from_box(
+    x1: float,
+    y1: float,
+    x2: float,
+    y2: float,
+    conf: float,
+    label: Optional[str],
+    width: int,
+    height: int,
+    tracked: bool = False,
+) -> FireDetection:
+    """Build a FireDetection (offsets from frame center, area fraction) from a full-frame box."""
+    dx = (x1 + x2) * 0.5 - width / 2.0
+    dy = (y1 + y2) * 0.5 - height / 2.0
+    area = max(1.0, (x2 - x1) * (y2 - y1))
+    return FireDetection(
+        True,
+        dx=dx,
+        dy=dy,
+        area_frac=area / float(width * height),
+        conf=conf,
+        bbox=(int(x1), int(y1), int(x2), int(y2)),
+        label=label,
+        tracked=tracked,
+    )
+
+
+class TargetTracker:
+    """
+    Sparse optical-flow (pyramidal Lucas-Kanade) tracker seeded from the last
+    YOLO box. Moves the box by the median feature motion on every decoded
+    frame so the engagement loop gets centering data between YOLO passes.
+    """
+
+    def __init__(self, expect_rgb: bool) -> None:
+        self._to_gray = cv2.COLOR_RGB2GRAY if expect_rgb else cv2.COLOR_BGR2GRAY
+        self.scale = float(getattr(C, "TRACK_SCALE", 0.5))
+        self.min_points = int(getattr(C, "TRACK_MIN_POINTS", 6))
+        self.max_age = float(getattr(C, "TRACK_MAX_SECS", 1.0))
+        self._prev_gray = None  # type: Optional[np.ndarray]
+        self._points = None  # type: Optional[np.ndarray]
+        self._box = None  # type: Optional[np.ndarray]
+        self._seed = None  # type: Optional[FireDetection]
+
+    @property
+    def active(self) -> bool:
+        return self._points is not None
+
+    def reset(self) -> None:
+        self._prev_gray = None
+        self._points = None
+        self._box = None
+        self._seed = None
+
+    def _gray(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, self._to_gray)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def reseed(self, frame: np.ndarray, det: FireDetection) -> bool:
+        """Restart tracking from a fresh YOLO detection; stop if there is none."""
+        if not det.has_fire or det.bbox is None or det.tracked:
+            self.reset()
+            return False
+        gray = self._gray(frame)
+        box = np.asarray(det.bbox, dtype=np.float32) * self.scale
+        x1, y1, x2, y2 = [int(v) for v in box]
+        mask = np.zeros_like(gray)
+        mask[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = 255
+        points = cv2.goodFeaturesToTrack(gray, maxCorners=40, qualityLevel=0.01, minDistance=3, mask=mask)
+        if points is None or len(points) < self.min_points:
+            self.reset()
+            return False
+        self._prev_gray = gray
+        self._points = points
+        self._box = box
+        self._seed = det
+        return True
+
+    def update(self, frame: np.ndarray, ts: Optional[float] = None) -> Optional[FireDetection]:
+        """Advance the box to ``frame``; None when tracking is inactive, stale or lost."""
+        if self._points is None or self._seed is None:
+            return None
+        now = time.time() if ts is None else ts
+        if now - self._seed.ts > self.max_age:
+            self.reset()
+            return None
+        gray = self._gray(frame)
+        new_pts, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, self._points, None,
+                                                      winSize=(15, 15), maxLevel=2)
+        if new_pts is None:
+            self.reset()
+            return None
+        # Forward-backward check drops points that drifted onto the background.
+        back_pts, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, new_pts, None,
+                                                            winSize=(15, 15), maxLevel=2)
+        fb_err = np.linalg.norm((self._points - back_pts).reshape(-1, 2), axis=1)
+        good = (status.reshape(-1) == 1) & (back_status.reshape(-1) == 1) & (fb_err < 1.0)
+        if int(good.sum()) < self.min_points:
+            self.reset()
+            return None
+        old = self._points.reshape(-1, 2)[good]
+        new = new_pts.reshape(-1, 2)[good]
+        shift = np.median(new - old, axis=0)
+        old_spread = np.linalg.norm(old - old.mean(axis=0), axis=1)
+        new_spread = np.linalg.norm(new - new.mean(axis=0), axis=1)
+        valid = old_spread > 1e-3
+        zoom = float(np.median(new_spread[valid] / old_spread[valid])) if valid.any() else 1.0
+
+        cx = (self._box[0] + self._box[2]) * 0.5 + shift[0]
+        cy = (self._box[1] + self._box[3]) * 0.5 + shift[1]
+        half_w = (self._box[2] - self._box[0]) * 0.5 * zoom
+        half_h = (self._box[3] - self._box[1]) * 0.5 * zoom
+        self._box = np.array([cx - half_w, cy - half_h, cx + half_w, cy + half_h], dtype=np.float32)
+        self._points = new.reshape(-1, 1, 2)
+        self._prev_gray = gray
+
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = [float(v) for v in self._box / self.scale]
+        x1, x2 = max(0.0, x1), min(float(width), x2)
+        y1, y2 = max(0.0, y1), min(float(height), y2)
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            self.reset()
+            return None
+        return detection_from_box(x1, y1, x2, y2, self._seed.conf, self._seed.label, width, height, tracked=True)
+
+
+def build_class_mask(names: Any, classes: Optional[set]) -> Optional[np.ndarray]:
+    """
+    Boolean lookup indexed by class id, True for ids whose name is whitelisted.
+    Returns None when every class is accepted.
+    """
+    if not classes:
+        return None
+    items = names.items() if isinstance(names, dict) else enumerate(names or [])
+    pairs = [(int(cls_id), str(name).lower()) for cls_id, name in items]
+    size = max([cls_id for cls_id, _ in pairs] + [-1]) + 1
+    mask = np.zeros(max(1, size), dtype=bool)
+    for cls_id, name in pairs:
+        if cls_id >= 0 and name in classes:
+            mask[cls_id] = True
+    return mask
+
+
+def boxes_to_array(boxes: Any) -> np.ndarray:
+    """Copy a result's boxes to host once as an (N, 6) array of x1, y1, x2, y2, conf, cls."""
+    data = getattr(boxes, "data", boxes)
+    if hasattr(data, "cpu"):
+        data = data.cpu().numpy()
+    data = np.asarray(data, dtype=np.float32)
+    if data.ndim != 2 or data.shape[0] == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+    return data
+
+
+def _class_keep(data: np.ndarray, class_mask: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Row mask of whitelisted boxes (None when every class is accepted)."""
+    if class_mask is None:
+        return None
+    cls_ids = data[:, 5].astype(np.int64)
+    keep = np.zeros(cls_ids.shape[0], dtype=bool)
+    known = (cls_ids >= 0) & (cls_ids < class_mask.shape[0])
+    keep[known] = class_mask[cls_ids[known]]
+    return keep
+
+
+def select_best_box(data: np.ndarray, class_mask: Optional[np.ndarray]) -> Optional[int]:
+    """Row index of the highest-confidence whitelisted box in ``data``, or None."""
+    if data.shape[0] == 0:
+        return None
+    conf = data[:, 4]
+    keep = _class_keep(data, class_mask)
+    if keep is None:
+        return int(np.argmax(conf))
+    if not keep.any():
+        return None
+    return int(np.argmax(np.where(keep, conf, -np.inf)))
+
+
+def to_detection_set(
+    data: np.ndarray, class_mask: Optional[np.ndarray], offset: Tuple[int, int] = (0, 0)
+) -> np.ndarray:
+    """
+    Whitelisted rows of an (N, 6) box array as a DETECTION_DTYPE array sorted
+    by confidence (best first), shifted by ``offset`` (ROI origin) into
+    full-frame pixels.
+    """
+    keep = _class_keep(data, class_mask)
+    if keep is not None:
+        data = data[keep]
+    out = np.empty((data.shape[0],), dtype=DETECTION_DTYPE)
+    if data.shape[0] == 0:
+        return out
+    data = data[np.argsort(-data[:, 4], kind="stable")]
+    out["cls"] = data[:, 5].astype(np.int32)
+    out["conf"] = data[:, 4]
+    out["xyxy"] = data[:, :4]
+    out["xyxy"][:, [0, 2]] += offset[0]
+    out["xyxy"][:, [1, 3]] += offset[1]
+    return out
+
+
+class DetectionDebouncer:
+    """
+    Confirms a target only after it persists, so one spurious frame cannot
+    start an engagement. The last CONFIRM_WINDOW YOLO results sit in a
+    preallocated ring (timestamp, hit). A target is confirmed once at least
+    CONFIRM_HITS of them are recent hits, the hits have spanned
+    FIRE_PERSIST_MS and the confidence EMA of those hits is at least
+    CONFIRM_MIN_CONF. The EMA averages hits only and is seeded from the
+    first hit of each episode, so misses never drag it below a target's
+    own confidence. It then stays confirmed until no hit for FIRE_LOST_MS.
+    Tracked (interpolated) detections move the target but never count as
+    hits; scene-gate replays (``reused``) are ignored altogether. Only a
+    real model pass adds to the ring and the confidence EMA.
+    """
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        hits: Optional[int] = None,
+        persist_ms: Optional[float] = None,
+        lost_ms: Optional[float] = None,
+        ema_alpha: Optional[float] = None,
+        min_conf: Optional[float] = None,
+    ) -> None:
+        self.window = max(1, int(window if window is not None else getattr(C, "CONFIRM_WINDOW", 5)))
+        self.hits_needed = max(1, min(self.window, int(hits if hits is not None else getattr(C, "CONFIRM_HITS", 3))))
+        self.persist_s = float(persist_ms if persist_ms is not None else getattr(C, "FIRE_PERSIST_MS", 200)) / 1000.0
+        self.lost_s = float(lost_ms if lost_ms is not None else getattr(C, "FIRE_LOST_MS", 2000)) / 1000.0
+        self.ema_alpha = float(ema_alpha if ema_alpha is not None else getattr(C, "CONFIRM_CONF_EMA", 0.5))
+        if min_conf is None:
+            # A floor above DETECT_CONF would reject targets the model already reports.
+            min_conf = min(getattr(C, "CONFIRM_MIN_CONF", 0.0), getattr(C, "DETECT_CONF", 1.0))
+        self.min_conf = float(min_conf)
+        self._ts = np.zeros((self.window,), dtype=np.float64)
+        self._hit = np.zeros((self.window,), dtype=bool)
+        self.reset()
+
+    def reset(self) -> None:
+        self._hit[:] = False
+        self._head = 0
+        self.conf_ema = 0.0
+        self._episode_start = None  # type: Optional[float]
+        self._last_hit_ts = None  # type: Optional[float]
+        self._last_hit = None  # type: Optional[FireDetection]
+        self.confirmed = False
+        self.confirmations = 0
+
+    def _lost(self, now: float) -> bool:
+        return self._last_hit_ts is None or now - self._last_hit_ts > self.lost_s
+
+    def update(self, det: FireDetection) -> bool:
+        """Feed one published detection; returns True while the target is confirmed."""
+        now = det.ts
+        if det.tracked or det.reused:
+            if det.tracked and det.has_fire and self.confirmed:
+                self._last_hit = det  # fresher position, same evidence
+            return self.is_confirmed(now)
+        if det.has_fire and self._lost(now):
+            self._episode_start = now  # first hit after a loss starts a new episode
+            self.conf_ema = det.conf
+        elif det.has_fire:
+            self.conf_ema += self.ema_alpha * (det.conf - self.conf_ema)
+        self._ts[self._head] = now
+        self._hit[self._head] = det.has_fire
+        self._head = (self._head + 1) % self.window
+        if det.has_fire:
+            self._last_hit_ts = now
+            self._last_hit = det
+        if not self.confirmed and det.has_fire:
+            persisted = now - (self._episode_start if self._episode_start is not None else now)
+            recent = int(np.count_nonzero(self._hit & (now - self._ts <= self.lost_s)))
+            # Tolerance: pts in whole ms make e.g. 0.7 - 0.5 come out just short of 0.2 s.
+            if (recent >= self.hits_needed and persisted >= self.persist_s - 1e-6
+                    and self.conf_ema >= self.min_conf):
+                self.confirmed = True
+                self.confirmations += 1
+        return self.is_confirmed(now)
+
+    def is_confirmed(self, now: Optional[float] = None) -> bool:
+        if self.confirmed and self._lost(time.time() if now is None else now):
+            self.confirmed = False
+            self._hit[:] = False
+            self.conf_ema = 0.0
+        return self.confirmed
+
+    def confirmed_detection(self, now: Optional[float] = None) -> Optional[FireDetection]:
+        """Latest hit of the confirmed target, or None."""
+        return self._last_hit if self.is_confirmed(now) else None
+
+
+class LatestWinsQueue:
+    """
+    Bounded hand-off between pipeline stages; a full queue drops its oldest
+    item. ``on_drop`` is called for every dropped or cleared item.
+    """
+
+    def __init__(self, maxsize: int = 1, on_drop: Optional[Callable[[Any], None]] = None) -> None:
+        self._maxsize = max(1, int(maxsize))
+        self._items = collections.deque()  # type: collections.deque
+        self._cond = threading.Condition()
+        self._on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item: Any) -> None:
+        dropped = []
+        with self._cond:
+            while len(self._items) >= self._maxsize:
+                dropped.append(self._items.popleft())
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+        if self._on_drop is not None:
+            for old in dropped:
+                self._on_drop(old)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Pop the oldest pending item, or None if nothing arrives within ``timeout``."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def clear(self) -> None:
+        with self._cond:
+            dropped = list(self._items)
+            self._items.clear()
+            self._cond.notify_all()
+        if self._on_drop is not None:
+            for old in dropped:
+                self._on_drop(old)
+
+
+class FrameBufferPool:
+    """
+    Reusable frame-sized arrays. acquire() hands out a spare buffer of the
+    requested shape and only allocates when none is free; the last stage
+    holding a buffer gives it back with release(). At most ``max_free``
+    spares are kept (0 disables reuse).
+    """
+
+    def __init__(self, max_free: int = 4) -> None:
+        self.max_free = max(0, int(max_free))
+        self._free = []  # type: List[np.ndarray]
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.reused = 0
+
+    def acquire(self, shape: Tuple[int, ...], dtype: Any = np.uint8) -> np.ndarray:
+        shape = tuple(int(v) for v in shape)
+        with self._lock:
+            for i, buf in enumerate(self._free):
+                if buf.shape == shape and buf.dtype == dtype:
+                    self.reused += 1
+                    return self._free.pop(i)
+            self.allocations += 1
+            self.allocated_bytes += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return np.empty(shape, dtype=dtype)  # allocated outside the lock; only the counters need it
+
+    def release(self, buf: Optional[np.ndarray]) -> None:
+        if buf is None:
+            return
+        with self._lock:
+            if len(self._free) < self.max_free and not any(b is buf for b in self._free):
+                self._free.append(buf)
+
+
+class FramePacket:
+    """Decoded frame stamped with a monotonic sequence number and capture time."""
+
+    __slots__ = ("seq", "ts", "frame")
+
+    def __init__(self, seq: int, ts: float, frame: np.ndarray) -> None:
+        self.seq = int(seq)
+        self.ts = float(ts)
+        self.frame = frame
+
+
+class SequencedFrameSource:
+    """
+    Wraps a frame supplier (callable or djitellopy BackgroundFrameRead) and stamps
+    every genuinely new frame with a sequence number and capture time.
+
+    djitellopy replaces its frame array on every decode, so a change of object
+    identity marks a new frame. A light watcher thread polls the supplier and
+    wakes consumers blocked in wait_for_frame(). The instance is itself callable
+    and returns the latest frame, so it can stand in for a plain frame supplier.
+    """
+
+    def __init__(
+        self,
+        source: Union[Callable[[], Optional[np.ndarray]], Any],
+        poll_interval: float = 0.005,
+    ) -> None:
+        if callable(source):
+            self._supplier = source  # type: Callable[[], Optional[np.ndarray]]
+        else:
+            self._supplier = lambda src=source: src.frame
+        self._poll_interval = max(0.001, float(poll_interval))
+        self._cond = threading.Condition()
+        self._latest = None  # type: Optional[FramePacket]
+        self._last_obj = None  # type: Optional[np.ndarray]
+        self._seq = 0
+        self.duplicates_skipped = 0
+        self.timings = None  # type: Optional[StageTimings]
+        self._thread = None  # type: Optional[threading.Thread]
+        self._stop = threading.Event()
+
+    @property
+    def seq(self) -> int:
+        with self._cond:
+            return self._seq
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="frame-source", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def poll(self) -> Optional[FramePacket]:
+        """Fetch from the supplier once; stamp and publish the frame if it is new."""
+        t_fetch = time.perf_counter()
+        try:
+            frame = self._supplier()
+        except Exception:
+            frame = None
+        if frame is None:
+            return None
+        with self._cond:
+            if frame is self._last_obj:
+                self.duplicates_skipped += 1
+                return None
+            if self.timings is not None:
+                self.timings.record("fetch", time.perf_counter() - t_fetch)
+            self._last_obj = frame
+            self._seq += 1
+            packet = FramePacket(self._seq, time.time(), frame)
+            self._latest = packet
+            self._cond.notify_all()
+        return packet
+
+    def latest(self) -> Optional[FramePacket]:
+        with self._cond:
+            return self._latest
+
+    def wait_for_frame(self, after_seq: int = 0, timeout: Optional[float] = None) -> Optional[FramePacket]:
+        """Block until a frame newer than ``after_seq`` is available (None on timeout/stop)."""
+        if not (self._thread and self._thread.is_alive()):
+            self.start()
+        deadline = None if timeout is None else time.time() + max(0.0, timeout)
+        with self._cond:
+            while self._latest is None or self._latest.seq <= after_seq:
+                if self._stop.is_set():
+                    return None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._latest
+
+    def __call__(self) -> Optional[np.ndarray]:
+        packet = self.latest()
+        if packet is None:
+            packet = self.poll()
+        return packet.frame if packet is not None else None
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            self.poll()
+            time.sleep(self._poll_interval)
+
+
+# Report order for FireDetector.timings; capture -> inference -> render -> decision.
+LATENCY_STAGES = (
+    "decode", "fetch", "queue_wait", "convert", "gate", "forward", "postprocess", "track",
+    "glass_to_publish", "plot", "display", "record", "glass_to_decision",
+)
 
 
 class FireDetector:
     """
-    YOLO-based detector with optional live preview/recording.
+    YOLO-based detector (ultralytics, ONNX Runtime or OpenCV DNN backend)
+    with optional live preview/recording.
     No extra decorations are drawn; annotated frames come directly from YOLO.
+
+    Work is split into three stages joined by latest-wins hand-offs:
+    capture (SequencedFrameSource) -> inference (infer / async loop) ->
+    render (plot, preview window and recording on their own thread).
+    A detection is published as soon as inference finishes, so a slow
+    preview or encoder never delays the next inference.
+
+    Every stage records its duration into ``timings`` (p50/p95/p99 printed
+    at close). ``glass_to_publish`` runs from the frame's capture stamp to
+    the published detection; ``glass_to_decision`` from capture to the
+    moment a caller acts on it (see note_decision()).
     """
 
-    def __init__(self, enable_model: bool = True, show_video: Optional[bool] = None) -> None:
+    def __init__(
+        self,
+        enable_model: bool = True,
+        show_video: Optional[bool] = None,
+        backend: Optional[Union[str, Any]] = None,
+    ) -> None:
         self.enable_model = bool(enable_model)
         self.show_video = C.SHOW_VIDEO if show_video is None else bool(show_video)
         self._expect_rgb = bool(getattr(C, "TELLO_FRAME_RGB", False))
@@ -54,91 +638,79 @@ class FireDetector:
 
         self.model = None
         if self.enable_model:
-            model_path = Path(C.YOLO_MODEL_PATH)
-            if not model_path.exists():
-                raise FileNotFoundError("YOLO model not found at {}".format(model_path))
-            self.model = YOLO(str(model_path), task="detect")
+            # Backend chosen by DETECT_BACKEND (or a ready backend object); all return boxes in the same layout.
+            self.model = create_backend(backend) if backend is None or isinstance(backend, str) else backend
+        # RGB frames go to the model as-is when the backend can take them (no conversion on the hot path).
+        self._rgb_to_model = self._expect_rgb and bool(getattr(self.model, "accepts_rgb", False))
+        # A crop only saves work if the backend can shrink its input to match (see set_roi_mode()).
+        self._roi_capable = bool(getattr(self.model, "dynamic_imgsz", False))
+        self._buffers = FrameBufferPool(int(getattr(C, "FRAME_POOL_SIZE", 4)))
 
         self.classes = {str(label).lower() for label in C.DETECT_CLASSES} if C.DETECT_CLASSES else None
+        self._class_mask = build_class_mask(self.model.names, self.classes) if self.model is not None else None
         self.last_seen_ts = 0.0
 
-        self._video_writer = None
-        self._video_path = None  # type: Optional[Path]
+        self._encoder = None  # type: Optional[VideoEncoder]
         self._video_writer_failed = False
-        self._video_log_once = False
+        self._sidecar = None  # type: Optional[DetectionSidecar]
+        self._clip_recorder = None  # type: Optional[ClipRecorder]
         self._last_detection = FireDetection(False)
         self._lock = threading.Lock()
+        self._det_cond = threading.Condition(self._lock)
+        self._det_seq = 0
+        self._debouncer = DetectionDebouncer()
 
         self._async_thread = None  # type: Optional[threading.Thread]
         self._async_stop = threading.Event()
         self._frame_supplier = None  # type: Optional[Callable[[], Optional[np.ndarray]]]
+        self._frame_source = None  # type: Optional[SequencedFrameSource]
+        self._owns_frame_source = False
         self._poll_interval = 0.05
+        self._last_frame_seq = 0
+        self.frames_inferred = 0
+        self.frames_dropped = 0
+        self.frames_tracked = 0
+        self._tracker = TargetTracker(self._expect_rgb) if getattr(C, "TRACK_ENABLE", False) else None
+
+        self._render_queue = LatestWinsQueue(maxsize=1, on_drop=self._release_render_item)
+        self._render_thread = None  # type: Optional[threading.Thread]
+        self._render_stop = threading.Event()
+
+        self._gate_enabled = bool(getattr(C, "GATE_ENABLE", False))
+        self._gate_thumb = None  # type: Optional[np.ndarray]
+        self._gate_det = None  # type: Optional[FireDetection]
+        self._gate_ts = 0.0
+        self.inferences_saved = 0
+
+        self._roi_mode = False
+        self._focus_label = None  # type: Optional[str]
+        self._roi_since_full = 0
+        self.roi_passes = 0
+        self.full_passes = 0
+
+        self.timings = StageTimings(LATENCY_STAGES)
+        self._latency_sink = None  # type: Optional[Callable[[str], None]]
+        self._latency_interval = 0.0
+        self._latency_last = 0.0
 
     # ------------------------------------------------------------------ #
     # Internal helpers
     # ------------------------------------------------------------------ #
-    def _next_video_path(self) -> Path:
-        """Resolve VIDEO_SAVE_PATH into an actual file target."""
-        raw_str = str(C.VIDEO_SAVE_PATH).strip()
-        raw_path = Path(raw_str).expanduser()
-        is_dir_hint = raw_str.endswith(("/", "\\")) or raw_path.exists() and raw_path.is_dir()
-
-        if not raw_path.suffix and not raw_path.exists():
-            # No extension provided; treat as directory for auto-naming.
-            is_dir_hint = True
-
-        if is_dir_hint:
-            base_dir = raw_path
-            base_dir.mkdir(parents=True, exist_ok=True)
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"capture_{timestamp}.mp4"
-            return base_dir / filename
-
-        target = raw_path
-        target.parent.mkdir(parents=True, exist_ok=True)
-        return target
-
-    def _ensure_vwriter(self, frame_shape) -> None:
-        if not C.VIDEO_SAVE_PATH:
-            return
-        if self._video_writer is not None or self._video_writer_failed:
-            return
-        try:
-            target_path = self._next_video_path()
-        except Exception as exc:
-            if not self._video_log_once:
-                print(f"[FireDetector] Unable to prepare video path: {exc}")
-                self._video_log_once = True
-            self._video_writer_failed = True
-            return
-
-        height, width = frame_shape[:2]
-        try:
-            fourcc = cv2.VideoWriter_fourcc(*C.VIDEO_CODEC)
-        except Exception as exc:
-            if not self._video_log_once:
-                print(f"[FireDetector] Invalid VIDEO_CODEC '{C.VIDEO_CODEC}': {exc}")
-                self._video_log_once = True
-            self._video_writer_failed = True
-            return
-
-        writer = cv2.VideoWriter(str(target_path), fourcc, C.VIDEO_FPS, (width, height), True)
-        if not writer or not writer.isOpened():
-            if writer:
-                writer.release()
-            if not self._video_log_once:
-                print(f"[FireDetector] OpenCV could not open '{target_path}' "
-                      f"(codec={C.VIDEO_CODEC}, size={width}x{height}). Recording disabled.")
-                self._video_log_once = True
+    def _ensure_encoder(self) -> Optional[VideoEncoder]:
+        if not C.VIDEO_SAVE_PATH or self._video_writer_failed or getattr(C, "VIDEO_PASSTHROUGH", False):
+            return None
+        if self._encoder is None:
+            self._encoder = VideoEncoder()
+        if self._encoder.failed:
             self._video_writer_failed = True
-            return
-
-        self._video_writer = writer
-        self._video_path = target_path
-        print(f"[FireDetector] Recording video to {target_path}")
+            return None
+        return self._encoder
 
-    def _display_frame(self, frame_bgr: np.ndarray) -> None:
+    def _display_frame(self, frame_bgr: np.ndarray, ts: Optional[float] = None) -> bool:
+        """Show and record a frame; True if a recorder kept a reference to it."""
+        retained = False
         if self.show_video:
+            t_display = time.perf_counter()
             cv2.imshow(self.window_name, frame_bgr)
             key = cv2.waitKey(1) & 0xFF
             if key in (27, ord("x"), ord("q")):
@@ -147,89 +719,354 @@ class FireDetector:
                     cv2.destroyWindow(self.window_name)
                 except Exception:
                     pass
-        if C.VIDEO_SAVE_PATH:
-            self._ensure_vwriter(frame_bgr.shape)
-            if self._video_writer is not None:
-                self._video_writer.write(frame_bgr)
+            self.timings.record("display", time.perf_counter() - t_display)
+        t_record = time.perf_counter()
+        encoder = self._ensure_encoder()
+        if encoder is not None:
+            encoder.submit(frame_bgr, ts)
+            retained = True
+        if self._clip_recorder is not None:
+            retained = self._clip_recorder.push(frame_bgr, ts) or retained
+        if encoder is not None or self._clip_recorder is not None:
+            self.timings.record("record", time.perf_counter() - t_record)
+        return retained
+
+    def _render_enabled(self) -> bool:
+        if self.show_video or self._clip_recorder is not None:
+            return True
+        if getattr(C, "VIDEO_PASSTHROUGH", False):
+            return False  # raw stream is recorded upstream; nothing to re-encode here
+        return bool(C.VIDEO_SAVE_PATH) and not self._video_writer_failed
+
+    def _submit_render(
+        self,
+        frame: np.ndarray,
+        is_rgb: bool,
+        pooled: bool,
+        result: Any = None,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+    ) -> None:
+        """
+        Queue a frame (plus the raw YOLO result to plot) for the render stage.
+        ``pooled`` frames belong to the buffer pool and are released by the
+        render stage; other frames are the caller's and are never drawn on.
+        """
+        if not self._render_enabled():
+            if pooled:
+                self._buffers.release(frame)
+            return
+        if not (self._render_thread and self._render_thread.is_alive()):
+            self._render_stop.clear()
+            self._render_thread = threading.Thread(target=self._render_loop, name="fire-render", daemon=True)
+            self._render_thread.start()
+        self._render_queue.put((frame, is_rgb, pooled, result, roi, time.time()))
+
+    def _release_render_item(self, item: tuple) -> None:
+        if item[2]:
+            self._buffers.release(item[0])
+
+    def _render_loop(self) -> None:
+        while not self._render_stop.is_set():
+            item = self._render_queue.get(timeout=0.2)
+            if item is None:
+                continue
+            frame, is_rgb, pooled, result, roi, ts = item
+            annotated = None
+            if result is not None:
+                t_plot = time.perf_counter()
+                try:
+                    annotated = result.plot()  # returns a new annotated frame (BGR)
+                    if not isinstance(annotated, np.ndarray):
+                        annotated = None
+                except Exception:
+                    annotated = None
+                self.timings.record("plot", time.perf_counter() - t_plot)
+            out = frame
+            out_pooled = False
+            if annotated is None or roi is not None:
+                if is_rgb or (roi is not None and not pooled):
+                    # Private BGR copy to draw on; the caller's frame stays untouched.
+                    out = self._buffers.acquire(frame.shape, frame.dtype)
+                    out_pooled = True
+                    if is_rgb:
+                        cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=out)
+                    else:
+                        np.copyto(out, frame)
+                if annotated is not None:
+                    # ROI results are plotted on the crop; paste back into the full frame.
+                    x1, y1, x2, y2 = roi
+                    out[y1:y2, x1:x2] = annotated
+                if roi is not None:
+                    cv2.rectangle(out, roi[:2], roi[2:], (255, 255, 0), 1)
+            else:
+                out = annotated
+            try:
+                retained = self._display_frame(out, ts)
+            except Exception:
+                retained = True  # unknown; never recycle a frame a recorder may still hold
+            if pooled and not (retained and out is frame):
+                self._buffers.release(frame)
+            if out_pooled and not retained:
+                self._buffers.release(out)
+
+    def _stop_render(self) -> None:
+        self._render_stop.set()
+        self._render_queue.clear()
+        if self._render_thread:
+            self._render_thread.join(timeout=1.0)
+            self._render_thread = None
+
+    def _label(self, cls_id: int) -> str:
+        return str(self.model.names.get(int(cls_id), str(int(cls_id)))).lower()
+
+    def _detection_from_set(self, found: np.ndarray, width: int, height: int) -> FireDetection:
+        """Primary target (row 0) carrying the whole set and the best box per label."""
+        _, first = np.unique(found["cls"], return_index=True)
+        best_by_class = {}  # type: Dict[str, FireDetection]
+        primary = None  # type: Optional[FireDetection]
+        for idx in sorted(int(i) for i in first):
+            label = self._label(found["cls"][idx])
+            if label in best_by_class:
+                continue  # two class ids sharing a name; the first is the better one
+            x1, y1, x2, y2 = (float(v) for v in found["xyxy"][idx])
+            det = detection_from_box(x1, y1, x2, y2, float(found["conf"][idx]), label, width, height)
+            best_by_class[label] = det
+            if primary is None:
+                primary = det
+        primary.boxes = found
+        primary.best_by_class = best_by_class
+        return primary
+
+    def _run_model(self, image: np.ndarray, is_rgb: bool, imgsz: Optional[int] = None) -> Any:
+        kwargs = {}  # type: Dict[str, Any]
+        if imgsz:
+            kwargs["imgsz"] = imgsz
+        if is_rgb:
+            kwargs["rgb"] = True  # only reached when the backend declares accepts_rgb
+        return self.model(image, C.DETECT_CONF, **kwargs)
+
+    def warmup(self, runs: int = 2) -> float:
+        """
+        Dummy inferences at FRAME_W x FRAME_H (and one ROI-sized pass) so lazy
+        CUDA/cuDNN setup happens before takeoff, not on the first real frame.
+        Returns the seconds spent.
+        """
+        if self.model is None:
+            return 0.0
+        start = time.perf_counter()
+        dummy = np.zeros((int(C.FRAME_H), int(C.FRAME_W), 3), dtype=np.uint8)
+        for _ in range(max(1, int(runs))):
+            self._run_model(dummy, self._rgb_to_model)
+        if getattr(C, "ROI_ENABLE", False) and self._roi_capable:
+            side = max(160, int(getattr(C, "ROI_MIN_PX", 320)))
+            crop = np.ascontiguousarray(dummy[:side, :side])
+            self._run_model(crop, self._rgb_to_model, min(side, int(getattr(C, "DETECT_IMGSZ", 640))))
+        return time.perf_counter() - start
+
+    def _scene_thumb(self, frame: np.ndarray, is_rgb: bool = False) -> np.ndarray:
+        width = max(8, int(getattr(C, "GATE_THUMB_W", 64)))
+        height = max(6, int(round(width * frame.shape[0] / float(frame.shape[1]))))
+        small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY if is_rgb else cv2.COLOR_BGR2GRAY)
 
-    def _update_last(self, det: FireDetection) -> None:
+    def _reuse_if_static(self, thumb: Optional[np.ndarray]) -> Optional[FireDetection]:
+        """Previous YOLO result with a fresh timestamp if the scene has not changed."""
+        if thumb is None or self._gate_thumb is None or self._gate_det is None:
+            return None
+        if time.time() - self._gate_ts >= float(getattr(C, "GATE_REFRESH_SECS", 1.0)):
+            return None  # forced refresh keeps a static-looking scene from hiding a new target
+        if thumb.shape != self._gate_thumb.shape:
+            return None
+        # Count changed thumbnail pixels rather than the mean so a small new target still counts.
+        diff = cv2.absdiff(thumb, self._gate_thumb)
+        changed = float(np.count_nonzero(diff > int(getattr(C, "GATE_PIXEL_DELTA", 12)))) / diff.size
+        if changed > float(getattr(C, "GATE_CHANGED_FRAC", 0.001)):
+            return None
+        return self._gate_det.refreshed()
+
+    def _next_roi(self, width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Crop window around the last detection while ROI mode is on, or None
+        for a full-frame pass (no lock, target lost, or periodic refresh).
+        """
+        if not self._roi_mode:
+            return None
+        full_every = int(getattr(C, "ROI_FULL_EVERY", 0))
         with self._lock:
+            last = self._last_detection.best_for(self._focus_label)
+        if last is None or last.bbox is None or (full_every > 0 and self._roi_since_full >= full_every):
+            return None
+        x1, y1, x2, y2 = last.bbox
+        side = max(float(getattr(C, "ROI_MIN_PX", 320)), float(getattr(C, "ROI_EXPAND", 2.5)) * max(x2 - x1, y2 - y1))
+        side_w, side_h = int(min(width, side)), int(min(height, side))
+        if side_w * side_h >= 0.6 * width * height:
+            return None  # crop would save little; run the full frame instead
+        cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+        rx1 = int(max(0, min(width - side_w, cx - side_w // 2)))
+        ry1 = int(max(0, min(height - side_h, cy - side_h // 2)))
+        return rx1, ry1, rx1 + side_w, ry1 + side_h
+
+    def _update_last(self, det: FireDetection, capture_ts: Optional[float] = None) -> None:
+        if capture_ts is not None:
+            det.capture_ts = capture_ts
+        with self._det_cond:
+            self._det_seq += 1
+            det.seq = self._det_seq
+            for other in det.best_by_class.values():
+                other.seq, other.capture_ts = det.seq, det.capture_ts
             self._last_detection = det
+            self._debouncer.update(det)
+            self._det_cond.notify_all()
+        self.timings.record("glass_to_publish", time.time() - det.capture_ts)
+
+    def _maybe_log_latency(self) -> None:
+        if self._latency_sink is None or self._latency_interval <= 0:
+            return
+        now = time.time()
+        if now - self._latency_last < self._latency_interval:
+            return
+        self._latency_last = now
+        for line in self.timings.report_lines("Detector latency (since start)"):
+            try:
+                self._latency_sink(line)
+            except Exception:
+                pass
 
     # ------------------------------------------------------------------ #
     # Public API
     # ------------------------------------------------------------------ #
-    def infer(self, frame: Optional[np.ndarray]) -> FireDetection:
-        """Run detection on a single frame."""
+    def infer(self, frame: Optional[np.ndarray], capture_ts: Optional[float] = None) -> FireDetection:
+        """
+        Run detection on a single frame (``capture_ts``: when it was captured, default now).
+        The frame is read in place, not copied (decoders hand out a new array per
+        frame), so callers must not modify it afterwards.
+        """
+        if capture_ts is None:
+            capture_ts = time.time()
         if frame is None:
             detection = FireDetection(False)
-            self._update_last(detection)
+            self._update_last(detection, capture_ts)
             return detection
 
-        if self._expect_rgb:
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        else:
-            frame_bgr = frame.copy()
-
-        annotated_bgr = frame_bgr
         detection = FireDetection(False)
 
         if not self.enable_model or self.model is None:
-            self._display_frame(frame_bgr.copy())
-            self._update_last(detection)
+            self._update_last(detection, capture_ts)
+            self._submit_render(frame, self._expect_rgb, False)
             return detection
 
-        results = self.model(frame_bgr, conf=C.DETECT_CONF, verbose=False)
-        best = None
-        height, width = frame_bgr.shape[:2]
-        center_x, center_y = width / 2.0, height / 2.0
+        image, is_rgb, pooled = frame, self._expect_rgb, False
+        if is_rgb and not self._rgb_to_model:
+            # BGR-only backend: convert into a reused buffer instead of a fresh frame.
+            t_stage = time.perf_counter()
+            image = self._buffers.acquire(frame.shape, frame.dtype)
+            cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=image)
+            is_rgb, pooled = False, True
+            self.timings.record("convert", time.perf_counter() - t_stage)
 
+        if self._gate_enabled:
+            t_stage = time.perf_counter()
+            thumb = self._scene_thumb(image, is_rgb)
+            reused = self._reuse_if_static(thumb)
+            self.timings.record("gate", time.perf_counter() - t_stage)
+        else:
+            thumb = reused = None
+        if reused is not None:
+            self.inferences_saved += 1
+            self._update_last(reused, capture_ts)
+            self._submit_render(image, is_rgb, pooled)
+            return reused
+
+        height, width = image.shape[:2]
+
+        roi = self._next_roi(width, height)
+        t_stage = time.perf_counter()
+        if roi is None:
+            self._roi_since_full = 0
+            self.full_passes += 1
+            results = self._run_model(image, is_rgb)
+        else:
+            self._roi_since_full += 1
+            self.roi_passes += 1
+            rx1, ry1, rx2, ry2 = roi
+            crop = np.ascontiguousarray(image[ry1:ry2, rx1:rx2])
+            # Shrink the network input with the crop so the ROI pass is actually cheaper.
+            imgsz = max(160, int(math.ceil(max(rx2 - rx1, ry2 - ry1) / 32.0)) * 32)
+            results = self._run_model(crop, is_rgb, min(imgsz, int(getattr(C, "DETECT_IMGSZ", 640))))
+        self.timings.record("forward", time.perf_counter() - t_stage)
+
+        t_stage = time.perf_counter()
+        offset = (roi[0], roi[1]) if roi is not None else (0, 0)
+        sets = []
         for result in results:
             boxes = getattr(result, "boxes", None)
-            if boxes is None:
-                continue
-            for box in boxes:
-                cls_id = int(box.cls[0]) if box.cls is not None else -1
-                name = self.model.names.get(cls_id, str(cls_id))
-                name_norm = str(name).lower()
-                if self.classes and name_norm not in self.classes:
-                    continue
-                conf = float(box.conf[0]) if box.conf is not None else 0.0
-                coords = box.xyxy[0].tolist()
-                if best is None or conf > best[2]:
-                    best = (coords, name_norm, conf)
-
-        if best is not None:
-            x1, y1, x2, y2 = best[0]
-            box_center_x = (x1 + x2) * 0.5
-            box_center_y = (y1 + y2) * 0.5
-            dx = box_center_x - center_x
-            dy = box_center_y - center_y
-            area = max(1.0, (x2 - x1) * (y2 - y1))
-            area_frac = area / float(width * height)
-            detection = FireDetection(
-                True,
-                dx=dx,
-                dy=dy,
-                area_frac=area_frac,
-                conf=best[2],
-                bbox=(int(x1), int(y1), int(x2), int(y2)),
-                label=best[1],
-            )
+            if boxes is not None:
+                sets.append(to_detection_set(boxes_to_array(boxes), self._class_mask, offset))
+        found = sets[0] if len(sets) == 1 else np.concatenate(sets) if sets else None
+        if found is not None and found.shape[0]:
+            if len(sets) > 1:
+                found = found[np.argsort(-found["conf"], kind="stable")]
+            detection = self._detection_from_set(found, width, height)
             self.last_seen_ts = time.time()
+        self.timings.record("postprocess", time.perf_counter() - t_stage)
 
-        if results:
-            try:
-                annotated = results[0].plot()  # returns annotated frame (BGR)
-                if isinstance(annotated, np.ndarray):
-                    annotated_bgr = annotated
-            except Exception:
-                annotated_bgr = frame_bgr
-
-        self._display_frame(annotated_bgr)
-        self._update_last(detection)
+        if thumb is not None:
+            self._gate_thumb = thumb
+            self._gate_det = detection
+            self._gate_ts = detection.ts
+        self._update_last(detection, capture_ts)
+        self._submit_render(image, is_rgb, pooled, results[0] if results else None, roi)
         return detection
 
+    def set_roi_mode(self, enabled: bool, label: Optional[str] = None) -> None:
+        """
+        Infer on a crop around the last target (engagement) instead of the full
+        frame. ``label`` keeps the crop and the tracker on that class even when
+        another one is the primary detection. Backends with a fixed input size
+        (no ``dynamic_imgsz``) stay on full frames: the crop would be scaled
+        back up to the same network input and cost an extra copy.
+        """
+        self._roi_mode = bool(enabled) and bool(getattr(C, "ROI_ENABLE", False)) and self._roi_capable
+        self._focus_label = label if enabled else None
+        self._roi_since_full = 0
+
+    def attach_sidecar(self, sidecar: Optional[DetectionSidecar]) -> None:
+        """Log every async detection (by frame capture time) next to a passthrough recording."""
+        self._sidecar = sidecar
+
+    def attach_clip_recorder(self, recorder: Optional[ClipRecorder]) -> None:
+        """Feed rendered frames into an event-clip recorder (pre-roll ring buffer)."""
+        self._clip_recorder = recorder
+        if recorder is not None:
+            recorder.set_rate(self.infer_hz)
+
+    def note_decision(self, det: Optional[FireDetection]) -> None:
+        """Record glass-to-decision latency when a caller acts on ``det``."""
+        if det is not None:
+            self.timings.record("glass_to_decision", time.time() - det.capture_ts)
+
+    def set_latency_log(self, sink: Optional[Callable[[str], None]], interval_s: float = 0.0) -> None:
+        """Stream the latency table to ``sink`` (e.g. the AI log) every ``interval_s`` seconds; 0 disables."""
+        self._latency_sink = sink
+        self._latency_interval = max(0.0, float(interval_s))
+        self._latency_last = time.time()
+
+    def latency_report(self) -> List[str]:
+        return self.timings.report_lines("[FireDetector] Stage latency")
+
+    @property
+    def class_names(self) -> Dict[int, str]:
+        """Class id -> name for the ``cls`` column of FireDetection.boxes."""
+        if self.model is None:
+            return {}
+        names = self.model.names
+        return dict(names) if isinstance(names, dict) else dict(enumerate(names))
+
+    @property
+    def infer_hz(self) -> float:
+        """Most model passes per second the async loop runs (its poll interval); render sees no more."""
+        return 1.0 / self._poll_interval
+
     def get_latest_detection(self, max_age: Optional[float] = None) -> Optional[FireDetection]:
         with self._lock:
             det = self._last_detection
@@ -237,14 +1074,91 @@ class FireDetector:
             return None
         return det
 
+    def get_confirmed_detection(self, max_age: Optional[float] = None) -> Optional[FireDetection]:
+        """
+        Latest detection of a debounced target (see DetectionDebouncer), or
+        None while nothing is confirmed. Use this to decide whether to engage.
+        ``max_age`` is measured from the last real observation, so gate
+        replays (``reused``) do not keep an old result young.
+        """
+        with self._lock:
+            det = self._debouncer.confirmed_detection()
+        if det is None or (max_age is not None and (time.time() - det.observed_ts) > max_age):
+            return None
+        return det
+
+    def reset_confirmation(self) -> None:
+        """Forget the confirmed target (e.g. after engaging it); it must persist again."""
+        with self._lock:
+            self._debouncer.reset()
+
+    @property
+    def detection_seq(self) -> int:
+        """Sequence number of the most recently published detection."""
+        with self._lock:
+            return self._det_seq
+
+    def wait_for_detection(
+        self,
+        after_seq: Optional[int] = None,
+        timeout: Optional[float] = None,
+        predicate: Optional[Callable[[FireDetection], bool]] = None,
+        include_reused: bool = False,
+    ) -> Optional[FireDetection]:
+        """
+        Block until a detection newer than ``after_seq`` (default: the current
+        one) is published and satisfies ``predicate``. Returns None on timeout.
+        Gate replays (``reused``) are skipped unless ``include_reused``.
+        """
+        deadline = None if timeout is None else time.time() + max(0.0, timeout)
+        with self._det_cond:
+            seen = self._det_seq if after_seq is None else int(after_seq)
+            while True:
+                det = self._last_detection
+                if self._det_seq > seen:
+                    seen = self._det_seq
+                    if (include_reused or not det.reused) and (predicate is None or predicate(det)):
+                        return det
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._det_cond.wait(remaining)
+
+    async def wait_for_detection_async(
+        self,
+        after_seq: Optional[int] = None,
+        timeout: Optional[float] = None,
+        predicate: Optional[Callable[[FireDetection], bool]] = None,
+        include_reused: bool = False,
+    ) -> Optional[FireDetection]:
+        """Awaitable wait_for_detection() (runs the blocking wait in the default executor)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.wait_for_detection, after_seq, timeout, predicate, include_reused)
+
     def start_async(self, frame_supplier: Callable[[], Optional[np.ndarray]], poll_interval: Optional[float] = None) -> None:
         if frame_supplier is None:
             return
         if self._async_thread and self._async_thread.is_alive():
             return
+        if frame_supplier is not self._frame_supplier or self._frame_source is None:
+            if self._owns_frame_source and self._frame_source is not None:
+                self._frame_source.stop()
+            if isinstance(frame_supplier, SequencedFrameSource):
+                self._frame_source = frame_supplier
+                self._owns_frame_source = False
+            else:
+                self._frame_source = SequencedFrameSource(frame_supplier)
+                self._owns_frame_source = True
+            if self._frame_source.timings is None:
+                self._frame_source.timings = self.timings
+            self._last_frame_seq = 0
         self._frame_supplier = frame_supplier
+        self._frame_source.start()
         if poll_interval is not None:
             self._poll_interval = max(0.02, min(poll_interval, 0.5))
+        if self._clip_recorder is not None:
+            self._clip_recorder.set_rate(self.infer_hz)
         self._async_stop.clear()
         self._async_thread = threading.Thread(target=self._async_loop, name="fire-detector", daemon=True)
         self._async_thread.start()
@@ -264,16 +1178,46 @@ class FireDetector:
 
     def stop_async(self) -> None:
         self.pause_async()
+        if self._owns_frame_source and self._frame_source is not None:
+            self._frame_source.stop()
+        self._frame_source = None
+        self._owns_frame_source = False
         self._frame_supplier = None
 
-    def close(self) -> None:
+    def get_async_stats(self) -> Dict[str, int]:
+        """Counters for the background loop: inferred, dropped and duplicate frames."""
+        source = self._frame_source
+        return {
+            "frames_inferred": self.frames_inferred,
+            "frames_dropped": self.frames_dropped,
+            "frames_tracked": self.frames_tracked,
+            "duplicates_skipped": source.duplicates_skipped if source is not None else 0,
+            "last_frame_seq": self._last_frame_seq,
+            "render_dropped": self._render_queue.dropped,
+            "inferences_saved": self.inferences_saved,
+            "video_dropped": self._encoder.frames_dropped if self._encoder is not None else 0,
+            "roi_passes": self.roi_passes,
+            "full_passes": self.full_passes,
+        }
+
+    def close(self, report: bool = True) -> None:
+        """Stop all stages, flush recordings and release the backend; ``report`` prints the stage latency table."""
         self.stop_async()
-        if self._video_writer is not None:
-            try:
-                self._video_writer.release()
-            except Exception:
-                pass
-            self._video_writer = None
+        self._stop_render()
+        if self._encoder is not None:
+            self._encoder.close()
+            stats = self._encoder.stats()
+            if stats["submitted"]:
+                print("[FireDetector] Video {path}: {written} frames at {fps} fps "
+                      "({dropped} dropped, {duplicated} repeated)".format(**stats))
+            self._encoder = None
+        close_backend = getattr(self.model, "close", None)
+        if callable(close_backend):
+            close_backend()  # e.g. DaemonBackend: socket and reconnect thread
+        for line in self.latency_report() if report else []:
+            print(line)
+            if self._latency_sink is not None:
+                self._latency_sink(line)
         if self.show_video:
             try:
                 cv2.destroyWindow(self.window_name)
@@ -284,24 +1228,149 @@ class FireDetector:
     # Background polling
     # ------------------------------------------------------------------ #
     def _async_loop(self) -> None:
-        while not self._async_stop.is_set():
-            frame = None
-            if self._frame_supplier is not None:
-                try:
-                    frame = self._frame_supplier()
-                except Exception:
-                    frame = None
-            if frame is not None:
-                try:
-                    self.infer(frame)
-                except Exception:
-                    pass
-            time.sleep(self._poll_interval)
+        source = self._frame_source
+        last_infer = 0.0
+        while not self._async_stop.is_set() and source is not None:
+            packet = source.wait_for_frame(self._last_frame_seq, timeout=0.5)
+            if packet is None:
+                self._async_stop.wait(self._poll_interval)
+                continue
+            if self._last_frame_seq and packet.seq > self._last_frame_seq + 1:
+                self.frames_dropped += packet.seq - self._last_frame_seq - 1
+            self._last_frame_seq = packet.seq
+            self.timings.record("queue_wait", time.time() - packet.ts)
+            self._maybe_log_latency()
+            # poll_interval caps the YOLO rate; frames in between only go through the tracker.
+            if time.time() - last_infer < self._poll_interval:
+                if self._tracker is not None and self._tracker.active:
+                    t_track = time.perf_counter()
+                    try:
+                        tracked = self._tracker.update(packet.frame)
+                    except Exception:
+                        tracked = None
+                    self.timings.record("track", time.perf_counter() - t_track)
+                    if tracked is not None:
+                        self._update_last(tracked, packet.ts)
+                        self.frames_tracked += 1
+                        if self._sidecar is not None:
+                            self._sidecar.write(tracked, packet.ts, packet.seq)
+                        continue
+                self.frames_dropped += 1  # neither inferred nor tracked
+                continue
+            last_infer = time.time()
+            try:
+                det = self.infer(packet.frame, packet.ts)
+                self.frames_inferred += 1
+                if self._tracker is not None:
+                    self._tracker.reseed(packet.frame, det.best_for(self._focus_label) or det)
+                if self._sidecar is not None:
+                    self._sidecar.write(det, packet.ts, packet.seq)
+            except Exception:
+                pass
+
+
+class DetectorLoader:
+    """
+    Builds and warms up a FireDetector on a background thread, so the model
+    load overlaps connecting to the drone. ``result()`` blocks until it is
+    ready; ``marks`` holds (label, wall time) pairs for the startup timeline.
+    An abandoned load (``cancel()``, or ``result()`` timing out) closes the
+    detector as soon as it finishes, so a late model never leaks threads.
+    """
+
+    def __init__(self, **detector_kwargs: Any) -> None:
+        self._kwargs = detector_kwargs
+        self._ready = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+        self.detector = None  # type: Optional[FireDetector]
+        self.error = None  # type: Optional[BaseException]
+        self.marks = []  # type: List[Tuple[str, float]]
+        self.cancelled = False
+        self._lock = threading.Lock()
 
+    def start(self) -> "DetectorLoader":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="DetectorLoader", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            self.marks.append(("model load start", time.time()))
+            detector = FireDetector(**self._kwargs)
+            self.marks.append(("model loaded", time.time()))
+            if not self.cancelled:
+                detector.warmup(int(getattr(C, "WARMUP_RUNS", 2)))
+                self.marks.append(("model warm", time.time()))
+            with self._lock:
+                if not self.cancelled:
+                    self.detector = detector
+                    detector = None
+            if detector is not None:
+                detector.close(report=False)  # nobody is waiting for it any more
+                self.marks.append(("late model closed", time.time()))
+        except BaseException as exc:  # surfaced to the caller through result()
+            self.error = exc
+            self.marks.append(("model failed", time.time()))
+        finally:
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def cancel(self) -> None:
+        """Give up on the detector: close it now if it is ready, or when it finishes loading."""
+        with self._lock:
+            self.cancelled = True
+            detector, self.detector = self.detector, None
+        if detector is not None:
+            detector.close(report=False)
+
+    def result(self, timeout: Optional[float] = None) -> Optional[FireDetector]:
+        """
+        The warmed-up detector; None on timeout, which cancels the load (see
+        cancel()). Re-raises a load failure.
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            self.cancel()
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.detector
 
-def main() -> int:
+
+def _replay_preview(source: str, pace: float) -> int:
+    """Preview a recording through the async detector (no drone)."""
+    replay = ReplayFrameSource(Path(source), pace=pace)
+    detector = FireDetector(enable_model=True, show_video=True)
+    try:
+        replay.start()
+        detector.start_async(replay)
+        while not replay.wait(0.2) and detector.show_video:
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        replay.stop()
+        detector.close()
+        cv2.destroyAllWindows()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Standalone preview similar to the sample code."""
-    drone = Tello()  # type: ignore
+    parser = argparse.ArgumentParser(description="Live YOLO preview from the Tello, or from a recording.")
+    parser.add_argument("--replay", default=None, help="video file or frame directory to play instead of the drone")
+    parser.add_argument("--pace", type=float, default=1.0, help="replay speed (1 = real time, 0 = as fast as possible)")
+    args = parser.parse_args(argv)
+    if args.replay:
+        return _replay_preview(args.replay, args.pace)
+
+    from djitellopy import Tello  # avoid dependency for replay / library use
+
+    drone = Tello()
     drone.connect()
     print("Battery:", drone.get_battery())
     drone.streamon()
@@ -324,6 +1393,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    from djitellopy import Tello  # avoid dependency
-
     raise SystemExit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Target-state estimation for engagements.
+A small Kalman filter tracks where the target sits relative to the drone
+(bearing, elevation, forward range and their rates) from every detection,
+and shifts that state by each commanded rotate/move, so the approach can
+act on a smoothed, predicted estimate instead of one frame's bounding box.
+"""
+import math
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+import beta_config as C
+
+# State layout: positions then their rates (per second).
+BEARING, ELEVATION, RANGE, BEARING_RATE, ELEVATION_RATE, RANGE_RATE = range(6)
+
+
+class TargetState(NamedTuple):
+    bearing_deg: float      # + = target to the right (yaw clockwise to center)
+    elevation_deg: float    # + = target above the camera axis
+    range_m: float          # forward distance along the camera axis
+    range_rate_mps: float   # + = target drifting away
+    bearing_sd: float
+    elevation_sd: float
+    range_sd: float
+    updates: int            # detections fused since the last commanded manoeuvre
+
+
+class TargetEstimator:
+    """
+    Constant-velocity Kalman filter over [bearing, elevation, range] and
+    their rates. Measurements come from a detection's dx/dy (pinhole angles)
+    and bbox width against ``real_width_m``; commanded yaw and moves are
+    applied as known control input with noise proportional to their size.
+    Measurements far outside the predicted covariance are rejected, unless
+    several arrive in a row (then the filter restarts on them).
+    """
+
+    def __init__(self, real_width_m: float) -> None:
+        self.real_width_m = float(real_width_m)
+        self.focal_x = (C.FRAME_W / 2.0) / math.tan(math.radians(C.H_FOV_DEG / 2.0))
+        self.focal_y = (C.FRAME_H / 2.0) / math.tan(math.radians(C.V_FOV_DEG / 2.0))
+        self.center_noise_px = float(getattr(C, "ESTIMATE_CENTER_NOISE_PX", 4.0))
+        self.width_noise_px = float(getattr(C, "ESTIMATE_WIDTH_NOISE_PX", 2.0))
+        self.angle_accel = float(getattr(C, "ESTIMATE_ANGLE_ACCEL_DEG", 20.0))
+        self.range_accel = float(getattr(C, "ESTIMATE_RANGE_ACCEL_M", 0.3))
+        self.move_noise = float(getattr(C, "ESTIMATE_MOVE_NOISE", 0.10))
+        self.gate = float(getattr(C, "ESTIMATE_GATE_CHI2", 16.0))
+        self.x = np.zeros((6,), dtype=np.float64)
+        self.P = np.eye(6, dtype=np.float64)
+        self.ts = 0.0
+        self.initialized = False
+        self.updates = 0
+        self.fused = 0
+        self.rejected = 0
+        self._rejected_run = 0
+
+    # ------------------------------------------------------------------ #
+    # Measurements
+    # ------------------------------------------------------------------ #
+    def _measure(self, det):
+        """(z, R) from one detection, or None if it carries no usable box."""
+        if det is None or not det.has_fire or det.bbox is None or self.real_width_m <= 0:
+            return None
+        x1, y1, x2, y2 = det.bbox
+        width_px = float(max(1, x2 - x1))
+        range_m = self.real_width_m * self.focal_x / width_px
+        bearing = math.degrees(math.atan2(det.dx, self.focal_x))
+        elevation = math.degrees(math.atan2(-det.dy, self.focal_y))
+        width_sd = self.width_noise_px
+        if x1 <= 1 or x2 >= C.FRAME_W - 1:
+            width_sd *= 5.0  # box clipped by the frame edge: width (and range) is unreliable
+        bearing_sd = math.degrees(self.center_noise_px / self.focal_x)
+        elevation_sd = math.degrees(self.center_noise_px / self.focal_y)
+        range_sd = range_m * width_sd / width_px
+        z = np.array([bearing, elevation, range_m], dtype=np.float64)
+        R = np.diag([bearing_sd ** 2, elevation_sd ** 2, range_sd ** 2])
+        return z, R
+
+    def _reset_to(self, z: np.ndarray, R: np.ndarray, ts: float) -> None:
+        self.x[:] = 0.0
+        self.x[:3] = z
+        self.P = np.zeros((6, 6), dtype=np.float64)
+        self.P[:3, :3] = R
+        self.P[3, 3] = self.P[4, 4] = (self.angle_accel * 0.5) ** 2
+        self.P[5, 5] = (self.range_accel * 0.5) ** 2
+        self.ts = ts
+        self.initialized = True
+        self.updates = 1
+        self.fused += 1
+        self._rejected_run = 0
+
+    def update(self, det, ts: Optional[float] = None) -> bool:
+        """Fuse one detection (stamped at its capture time); False if it was unusable or gated out."""
+        meas = self._measure(det)
+        if meas is None:
+            return False
+        z, R = meas
+        if ts is None:
+            ts = getattr(det, "capture_ts", None) or det.ts
+        if not self.initialized:
+            self._reset_to(z, R, ts)
+            return True
+        self._predict(ts)
+        innovation = z - self.x[:3]
+        S = self.P[:3, :3] + R
+        S_inv = np.linalg.inv(S)
+        if float(innovation @ S_inv @ innovation) > self.gate:
+            self.rejected += 1
+            self._rejected_run += 1
+            if self._rejected_run >= 3:
+                self._reset_to(z, R, ts)  # consistently elsewhere: trust the detections
+                return True
+            return False
+        K = self.P[:, :3] @ S_inv
+        self.x += K @ innovation
+        self.P = (np.eye(6) - K @ np.eye(3, 6)) @ self.P
+        self.P = 0.5 * (self.P + self.P.T)
+        self.updates += 1
+        self.fused += 1
+        self._rejected_run = 0
+        return True
+
+    # ------------------------------------------------------------------ #
+    # Prediction and control
+    # ------------------------------------------------------------------ #
+    def _propagate(self, dt: float):
+        F = np.eye(6)
+        F[:3, 3:] = np.eye(3) * dt
+        Q = np.zeros((6, 6))
+        for pos, accel in ((BEARING, self.angle_accel), (ELEVATION, self.angle_accel), (RANGE, self.range_accel)):
+            q = accel ** 2
+            vel = pos + 3
+            Q[pos, pos] = q * dt ** 3 / 3.0
+            Q[pos, vel] = Q[vel, pos] = q * dt ** 2 / 2.0
+            Q[vel, vel] = q * dt
+        return F @ self.x, F @ self.P @ F.T + Q
+
+    def _predict(self, ts: float) -> None:
+        dt = ts - self.ts
+        if dt <= 0:
+            return
+        self.x, self.P = self._propagate(dt)
+        self.ts = ts
+
+    def state(self, ts: Optional[float] = None) -> Optional[TargetState]:
+        """Predicted state at ``ts`` (default: now) without changing the filter."""
+        if not self.initialized:
+            return None
+        x, P = self._propagate(max(0.0, (time.time() if ts is None else ts) - self.ts))
+        sd = np.sqrt(np.maximum(np.diag(P), 0.0))
+        return TargetState(
+            float(x[BEARING]), float(x[ELEVATION]), float(x[RANGE]), float(x[RANGE_RATE]),
+            float(sd[BEARING]), float(sd[ELEVATION]), float(sd[RANGE]), self.updates,
+        )
+
+    def _apply(self, forward_m: float, yaw_deg: float, up_m: float, ts: Optional[float]) -> None:
+        if not self.initialized:
+            return
+        self._predict(time.time() if ts is None else ts)
+        rng = max(1e-3, self.x[RANGE])
+        # Target position in the body frame, then moved by the manoeuvre.
+        fwd = rng
+        right = rng * math.tan(math.radians(self.x[BEARING]))
+        up = rng * math.tan(math.radians(self.x[ELEVATION]))
+        if yaw_deg:
+            a = math.radians(yaw_deg)
+            fwd, right = fwd * math.cos(a) + right * math.sin(a), -fwd * math.sin(a) + right * math.cos(a)
+        fwd = max(1e-3, fwd - forward_m)
+        up -= up_m
+        self.x[RANGE] = fwd
+        self.x[BEARING] = math.degrees(math.atan2(right, fwd))
+        self.x[ELEVATION] = math.degrees(math.atan2(up, fwd))
+        # The SDK executes moves to within roughly ESTIMATE_MOVE_NOISE of the command.
+        self.P[RANGE, RANGE] += (self.move_noise * abs(forward_m)) ** 2
+        self.P[BEARING, BEARING] += (self.move_noise * abs(yaw_deg)) ** 2
+        self.P[ELEVATION, ELEVATION] += math.degrees(self.move_noise * abs(up_m) / fwd) ** 2
+        self.updates = 0
+
+    def apply_yaw(self, yaw_deg: float, ts: Optional[float] = None) -> None:
+        """Commanded rotation (+ = clockwise), applied once the command returned."""
+        self._apply(0.0, float(yaw_deg), 0.0, ts)
+
+    def apply_move(self, forward_m: float = 0.0, up_m: float = 0.0, ts: Optional[float] = None) -> None:
+        """Commanded translation in metres (+forward / +up), applied once the command returned."""
+        self._apply(float(forward_m), 0.0, float(up_m), ts)
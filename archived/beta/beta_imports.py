@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deferred imports for the heavy dependencies (djitellopy, cv2, ultralytics/torch,
+onnxruntime, av, and the beta modules built on them).
+Entry points import these where they are first needed, so ``--help``, plan
+resolution and dry runs start instantly. Each deferred import is timed, so the
+mission log can show where startup time went.
+"""
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict, List
+
+IMPORT_TIMES = {}  # type: Dict[str, float]
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """``importlib.import_module`` that records how long the first import of ``name`` took."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        IMPORT_TIMES.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def import_report() -> List[str]:
+    """'name 0.42s' per deferred import, in the order they happened."""
+    with _lock:
+        return ["{} {:.2f}s".format(name, secs) for name, secs in IMPORT_TIMES.items()]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-stage latency histograms for the detection path.
+Samples land in log-spaced buckets (HDR-style: fixed ~1% relative error,
+constant-time record, fixed memory), so percentiles stay cheap to keep
+for a whole flight and can be dumped or logged at any point.
+"""
+import math
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram covering 1 us .. ``max_secs``."""
+
+    def __init__(self, max_secs: float = 60.0, precision: float = 0.01) -> None:
+        self._log_base = math.log1p(max(1e-4, float(precision)))
+        self._counts = np.zeros(int(math.log(max(1.0, max_secs * 1e6)) / self._log_base) + 2, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, secs: float) -> None:
+        us = max(1.0, float(secs) * 1e6)
+        idx = min(len(self._counts) - 1, int(math.log(us) / self._log_base))
+        self._counts[idx] += 1
+        self.count += 1
+        self.total += float(secs)
+        if secs > self.max:
+            self.max = float(secs)
+
+    def percentile(self, pct: float) -> float:
+        """Upper edge (seconds) of the bucket holding the ``pct`` percentile."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * min(100.0, max(0.0, pct)) / 100.0)))
+        idx = int(np.searchsorted(np.cumsum(self._counts), rank))
+        return min(self.max, math.exp((idx + 1) * self._log_base) / 1e6)
+
+    def reset(self) -> None:
+        self._counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Count plus mean/p50/p95/p99/max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": 1000.0 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1000.0 * self.percentile(50),
+            "p95_ms": 1000.0 * self.percentile(95),
+            "p99_ms": 1000.0 * self.percentile(99),
+            "max_ms": 1000.0 * self.max,
+        }
+
+
+class StageTimings:
+    """
+    Named LatencyHistograms shared by the capture, inference and render
+    threads. ``order`` fixes how known stages are listed in reports.
+    """
+
+    def __init__(self, order: Iterable[str] = ()) -> None:
+        self._order = list(order)
+        self._hists = {}  # type: Dict[str, LatencyHistogram]
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, secs: float) -> None:
+        with self._lock:
+            hist = self._hists.get(stage)
+            if hist is None:
+                hist = self._hists[stage] = LatencyHistogram()
+            hist.record(secs)
+
+    def reset(self) -> None:
+        with self._lock:
+            for hist in self._hists.values():
+                hist.reset()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            known = [s for s in self._order if s in self._hists]
+            stages = known + sorted(s for s in self._hists if s not in self._order)
+            return {s: self._hists[s].summary() for s in stages if self._hists[s].count}
+
+    def report_lines(self, title: Optional[str] = None) -> List[str]:
+        """Human-readable table (one line per stage) for stdout or the AI log."""
+        summary = self.summary()
+        if not summary:
+            return []
+        lines = [title] if title else []
+        lines.append("{:<18} {:>7} {:>9} {:>9} {:>9} {:>9}".format("stage", "n", "p50 ms", "p95 ms", "p99 ms", "max ms"))
+        for stage, s in summary.items():
+            lines.append("{:<18} {:>7d} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                stage, int(s["count"]), s["p50_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"]))
+        return lines
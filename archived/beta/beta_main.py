@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import logging
 import math
 import os
@@ -11,21 +12,33 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
-
-from djitellopy import Tello
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 import beta_config as C
-from beta_detect import FireDetector, FireDetection
-from beta_plan import PLAN_DIR, find_latest_beta_waypoint_json, load_plan
+from beta_compile import (
+    FLIGHT_MODES, Command, body_path, command_count, compile_go_plan, compile_plan, estimate_seconds,
+    forward_steps_by_segment, go_speed, path_length,
+)
+from beta_imports import import_report, lazy_import
+from beta_plan import PLAN_DIR, find_latest_beta_waypoint_json, load_plan, load_plan_points, points_from_segments
+
+if TYPE_CHECKING:  # djitellopy, cv2 and the model stack are imported in main() (see beta_imports)
+    from djitellopy import Tello
+    from beta_detect import FireDetector, FireDetection, SequencedFrameSource
+    from beta_estimate import TargetState
+    from beta_record import ClipRecorder, H264StreamReader
+    from beta_telemetry import TelemetrySubscriber
 
 LOGGER: Optional[logging.Logger] = None
 AI_LOGGER: Optional[logging.Logger] = None
+AI_LOG_PATH: Optional[str] = None
+TELEMETRY: Optional[TelemetrySubscriber] = None  # state-stream history, running while a mission is connected
+SETTLE_STATS = {"waits": 0, "bound_s": 0.0, "waited_s": 0.0}  # settle() totals for the mission summary
 
 
 def init_logging(log_path: Optional[str]) -> None:
     """Configure mission and AI loggers."""
-    global LOGGER, AI_LOGGER
+    global LOGGER, AI_LOGGER, AI_LOG_PATH
 
     LOGGER = logging.getLogger("flight")
     LOGGER.setLevel(logging.INFO)
@@ -67,6 +80,7 @@ def init_logging(log_path: Optional[str]) -> None:
         os.makedirs("logs", exist_ok=True)
         ai_path = os.path.join("logs", f"flight_ai_{timestamp}.log")
 
+    AI_LOG_PATH = ai_path
     AI_LOGGER = logging.getLogger("flight.ai")
     AI_LOGGER.setLevel(logging.INFO)
     AI_LOGGER.handlers.clear()
@@ -108,6 +122,12 @@ def set_detector_status(detector: Optional[FireDetector], message: str) -> None:
             pass
 
 
+def _is_tello(obj: Any) -> bool:
+    """isinstance(obj, Tello) without importing djitellopy (no Tello exists before it is imported)."""
+    module = sys.modules.get("djitellopy")
+    return module is not None and isinstance(obj, module.Tello)
+
+
 def _is_imu_error(exc: Exception) -> bool:
     msg = str(exc).lower()
     return "no valid imu" in msg or "not joystick" in msg
@@ -132,21 +152,25 @@ def _needs_command_recover(exc: Exception) -> bool:
     )
 
 
+def _state_value(t: Tello, field: str) -> Optional[float]:
+    """Latest state-stream value: from the telemetry ring when it runs, else djitellopy's last state."""
+    if TELEMETRY is not None:
+        return TELEMETRY.latest(field, max_age=float(getattr(C, "TELEMETRY_MAX_AGE_S", 1.0)))
+    state = t.get_current_state()
+    if not state or state.get(field) is None:
+        return None
+    return float(state[field])
+
+
 def _state_height_cm(t: Tello) -> Optional[float]:
     try:
-        state = t.get_current_state()
-        if not state:
-            return None
-        h = state.get("h")
-        if h is None:
-            return None
-        return float(h)
+        return _state_value(t, "h")
     except Exception:
         return None
 
 
 def _capture_command_snapshot(t: Optional[Tello], label: str) -> Optional[Dict[str, Optional[float]]]:
-    if not isinstance(t, Tello):
+    if not _is_tello(t):
         return None
     if label in ("takeoff", "land", "move_up", "move_down"):
         return {"h": _state_height_cm(t)}
@@ -159,7 +183,7 @@ def _command_effect_seen(
     before: Optional[Dict[str, Optional[float]]],
     args,
 ) -> bool:
-    if not isinstance(t, Tello) or before is None:
+    if not _is_tello(t) or before is None:
         return False
     tol = float(getattr(C, "COMMAND_SUCCESS_TOL_CM", 10.0))
     after = _capture_command_snapshot(t, label)
@@ -196,7 +220,12 @@ def _command_pad_seconds(label: str, args) -> float:
     dist_cm = 0.0
     if args:
         try:
-            dist_cm = float(args[0])
+            if label in ("go", "curve"):
+                # Relative x y z points then speed: pad by the length of the path through them.
+                pts = [(0.0, 0.0, 0.0)] + [tuple(float(v) for v in args[i:i + 3]) for i in range(0, len(args) - 1, 3)]
+                dist_cm = sum(math.dist(a, b) for a, b in zip(pts, pts[1:]))
+            else:
+                dist_cm = float(args[0])
         except Exception:
             dist_cm = 0.0
     return max(0.0, base + per_cm * abs(dist_cm))
@@ -229,7 +258,7 @@ def try_cmd(fn, *args, retries=C.RETRIES, sleep=C.RETRY_SLEEP, label: str = "cmd
         timeout_override_applied = False
         original_timeout = None
         pad_seconds = _command_pad_seconds(label, args)
-        if pad_seconds > 0 and isinstance(t_obj, Tello):
+        if pad_seconds > 0 and _is_tello(t_obj):
             try:
                 original_timeout = t_obj.RESPONSE_TIMEOUT
                 t_obj.RESPONSE_TIMEOUT = original_timeout + pad_seconds
@@ -243,7 +272,7 @@ def try_cmd(fn, *args, retries=C.RETRIES, sleep=C.RETRY_SLEEP, label: str = "cmd
             attempts += 1
             imu_err = _is_imu_error(exc)
             timeout_err = _is_timeout_error(exc)
-            if timeout_override_applied and isinstance(t_obj, Tello):
+            if timeout_override_applied and _is_tello(t_obj):
                 t_obj.RESPONSE_TIMEOUT = original_timeout
                 timeout_override_applied = False
             if timeout_err and _command_effect_seen(t_obj, label, snapshot, args):
@@ -251,7 +280,7 @@ def try_cmd(fn, *args, retries=C.RETRIES, sleep=C.RETRY_SLEEP, label: str = "cmd
                 return None
             if _needs_command_recover(exc):
                 t_obj = getattr(fn, "__self__", None)
-                if isinstance(t_obj, Tello) and ensure_command_mode(t_obj):
+                if _is_tello(t_obj) and ensure_command_mode(t_obj):
                     log_w("{} retrying after command-mode recovery ({}/{})".format(label, attempts, max_attempts - 1))
                     time.sleep(sleep)
                     if attempts < max_attempts:
@@ -267,10 +296,28 @@ def try_cmd(fn, *args, retries=C.RETRIES, sleep=C.RETRY_SLEEP, label: str = "cmd
                 log_e("{} failed after {} tries: {}".format(label, max_attempts, exc))
                 raise
         finally:
-            if timeout_override_applied and isinstance(t_obj, Tello):
+            if timeout_override_applied and _is_tello(t_obj):
                 t_obj.RESPONSE_TIMEOUT = original_timeout
 
 
+def settle(upper_bound_s: float) -> None:
+    """
+    Wait after a command until telemetry shows the drone settled (velocity
+    ~0, yaw steady), at most ``upper_bound_s`` - the fixed sleep this replaces.
+    Without telemetry it simply sleeps the full bound.
+    """
+    if upper_bound_s <= 0:
+        return
+    start = time.time()
+    if TELEMETRY is None:
+        time.sleep(upper_bound_s)
+    else:
+        TELEMETRY.buffer.wait_until_stationary(upper_bound_s)
+    SETTLE_STATS["waits"] += 1
+    SETTLE_STATS["bound_s"] += upper_bound_s
+    SETTLE_STATS["waited_s"] += time.time() - start
+
+
 def _normalize_yaw(deg: float) -> float:
     while deg > 180.0:
         deg -= 360.0
@@ -281,13 +328,7 @@ def _normalize_yaw(deg: float) -> float:
 
 def get_current_yaw(t: Tello) -> Optional[float]:
     try:
-        state = t.get_current_state()
-        if not state:
-            return None
-        yaw = state.get("yaw")
-        if yaw is None:
-            return None
-        return float(yaw)
+        return _state_value(t, "yaw")
     except Exception as exc:
         log_w("get_current_state error: {}".format(exc))
         return None
@@ -311,6 +352,17 @@ def correct_heading_if_needed(t: Tello, expected_yaw: float) -> float:
     return _normalize_yaw(updated) if updated is not None else _normalize_yaw(expected_yaw - correction)
 
 
+def restore_heading(t: Tello, hold_yaw: float) -> None:
+    """Rotate back onto ``hold_yaw`` (go mode flies body-frame vectors, so the nose must not move)."""
+    actual = get_current_yaw(t)
+    if actual is None:
+        return
+    diff = _normalize_yaw(actual - hold_yaw)
+    if abs(diff) >= max(1, getattr(C, "MIN_TURN_DEG", 0)):
+        log_i("Restoring heading {:.1f}deg ({:+.1f}deg)".format(hold_yaw, -diff))
+        rotate_signed_deg(t, -diff)
+
+
 def fallback_rc_descent(t: Tello) -> None:
     log_w("Attempting RC descent fallback.")
     try:
@@ -355,7 +407,7 @@ def rotate_signed_deg(t: Tello, ang_deg: float) -> None:
         t.send_rc_control(0, 0, 0, 0)
     except Exception:
         pass
-    time.sleep(C.TURN_SLEEP)
+    settle(C.TURN_SLEEP)
 
     chunk_idx = 0
     while remaining > 0:
@@ -377,7 +429,7 @@ def rotate_signed_deg(t: Tello, ang_deg: float) -> None:
             else:
                 raise
         remaining -= step
-        time.sleep(C.TURN_SLEEP)
+        settle(C.TURN_SLEEP)
 
 
 def rc_yaw_fallback(t: Tello, step_deg: int) -> bool:
@@ -460,6 +512,27 @@ def _pixels_to_strafe_cm(dx: float, distance_m: Optional[float]) -> int:
 
 
 
+def _pick_target(det: FireDetection) -> Optional[FireDetection]:
+    """
+    Target to engage from one detection: the label with the best TARGET_SPECS
+    priority (an explicit "priority" key, else listing order), nearest first
+    on ties. Labels without a spec fall back to the "fire" spec as before.
+    """
+    candidates = []
+    for rank, (label, spec) in enumerate(C.TARGET_SPECS.items()):
+        target = det.best_for(label)
+        if target is None:
+            continue
+        distance_m = _estimate_distance_m(target, spec)
+        priority = float(spec.get("priority", rank))
+        candidates.append((priority, distance_m if distance_m is not None else float("inf"), target))
+    if candidates:
+        return min(candidates, key=lambda c: (c[0], c[1]))[2]
+    if det.has_fire and "fire" in C.TARGET_SPECS:
+        return det
+    return None
+
+
 def engage_target(
     t: Tello,
     detector: FireDetector,
@@ -480,56 +553,66 @@ def engage_target(
     distance_tol_m = C.APPROACH_DISTANCE_TOL_CM / 100.0
     log_ai("Engaging target '{}' (conf={:.2f})".format(label, initial_det.conf))
 
-    def pump_preview() -> None:
-        if detector is None or not getattr(detector, "show_video", False) or frame_supplier is None:
-            return
-        try:
-            frame = frame_supplier()
-        except Exception:
-            frame = None
-        if frame is not None:
-            try:
-                detector.infer(frame)
-            except Exception:
-                pass
+    def target_of(det: Optional[FireDetection]) -> Optional[FireDetection]:
+        """This engagement's target within a detection (another class may be the primary one)."""
+        return det.best_for(label) if det is not None else None
 
-    def fetch_detection(max_wait_s: float = 0.6, require_target: bool = True) -> Optional[FireDetection]:
-        deadline = time.time() + max(0.0, max_wait_s)
-        det_local: Optional[FireDetection] = None
-        while True:
-            pump_preview()
+    def is_target(det: Optional[FireDetection]) -> bool:
+        return target_of(det) is not None
+
+    def fetch_detection(
+        max_wait_s: float = 0.6, require_target: bool = True, after_seq: Optional[int] = None
+    ) -> Optional[FireDetection]:
+        """Wait (without polling) for the detector to publish a detection newer than after_seq."""
+        if after_seq is None:
             det_local = detector.get_latest_detection(max_age=0.5)
-            if det_local and det_local.has_fire and (det_local.label == label or det_local.label is None):
+            if is_target(det_local):
                 return det_local
-            if not require_target:
-                return det_local
-            if time.time() >= deadline:
-                return None
-            time.sleep(0.05)
+        return detector.wait_for_detection(
+            after_seq=after_seq,
+            timeout=max(0.0, max_wait_s),
+            predicate=is_target if require_target else None,
+        )
 
     initial_yaw = get_current_yaw(t)
     total_forward_cm = 0
 
-    plan_det = initial_det if initial_det.has_fire and (initial_det.label == label or initial_det.label is None) else None
+    plan_det = target_of(initial_det)
     if plan_det is None or plan_det.bbox is None:
-        plan_det = fetch_detection(max_wait_s=1.0, require_target=True)
+        plan_det = target_of(fetch_detection(max_wait_s=1.0, require_target=True))
     if plan_det is None or not plan_det.has_fire or plan_det.bbox is None:
         log_ai("Unable to confirm target for planning; aborting engagement")
         return
 
-    def yaw_to_center(det: FireDetection) -> None:
-        dx = det.dx
-        yaw_step = int(round(_pixels_to_yaw_deg(dx)))
-        if abs(yaw_step) >= max(1, int(getattr(C, "MIN_TURN_DEG", 1))):
-            log_ai("Yaw to center target by {:+d} deg".format(yaw_step))
-            set_detector_status(detector, "Yaw {:+d} deg".format(yaw_step))
-            if yaw_step > 0:
-                try_cmd(t.rotate_clockwise, yaw_step, label="rotate_cw")
-            else:
-                try_cmd(t.rotate_counter_clockwise, -yaw_step, label="rotate_ccw")
-            time.sleep(C.TURN_SLEEP)
+    from beta_estimate import TargetEstimator
 
-    yaw_to_center(plan_det)
+    # Filtered bearing/range fed by every detection; commanded moves shift it as control input.
+    estimator = TargetEstimator(float(spec.get("real_width_m", 0.0) or 0.0))
+    min_updates = max(1, int(getattr(C, "ESTIMATE_MIN_UPDATES", 3)))
+
+    def yaw_to_center(state: Optional[TargetState], det: FireDetection) -> bool:
+        bearing = state.bearing_deg if state is not None else _pixels_to_yaw_deg(det.dx)
+        yaw_step = int(round(bearing))
+        # Turn only when the offset is clearly more than the estimate's own noise.
+        threshold = max(1, int(getattr(C, "MIN_TURN_DEG", 1)))
+        if state is not None:
+            threshold = max(threshold, 2.0 * state.bearing_sd)
+        if abs(yaw_step) < threshold:
+            return False
+        log_ai("Yaw to center target by {:+d} deg".format(yaw_step))
+        set_detector_status(detector, "Yaw {:+d} deg".format(yaw_step))
+        if yaw_step > 0:
+            try_cmd(t.rotate_clockwise, yaw_step, label="rotate_cw")
+        else:
+            try_cmd(t.rotate_counter_clockwise, -yaw_step, label="rotate_ccw")
+        settle(C.TURN_SLEEP)
+        estimator.apply_yaw(yaw_step)
+        return True
+
+    detector.note_decision(plan_det)
+    estimator.update(plan_det)
+    yaw_to_center(estimator.state(), plan_det)
+    det_cursor = detector.detection_seq  # only act on detections published after the last manoeuvre
 
     distance_tol_cm = int(round(distance_tol_m * 100.0))
     approach_success = False
@@ -539,24 +622,42 @@ def engage_target(
     last_seen = time.time()
     last_det = plan_det
     remaining_forward_cm = 0
-    initial_distance = _estimate_distance_m(plan_det, spec)
-    if initial_distance is not None:
-        remaining_forward_cm = max(0, int(round(max(0.0, initial_distance - desired_distance_m) * 100.0)))
+    initial_state = estimator.state()
+    if initial_state is not None:
+        remaining_forward_cm = max(0, int(round(max(0.0, initial_state.range_m - desired_distance_m) * 100.0)))
 
     while time.time() - start_time < float(getattr(C, "APPROACH_TIMEOUT_S", 30)):
-        det = fetch_detection(max_wait_s=0.5, require_target=False)
+        det = fetch_detection(max_wait_s=0.5, require_target=False, after_seq=det_cursor)
         now = time.time()
-        if det and det.has_fire and (det.label == label or det.label is None):
-            last_det = det
+        if det is not None:
+            det_cursor = det.seq
+        target = target_of(det)
+        if target is not None:
+            detector.note_decision(target)
+            last_det = target
             last_seen = now
-            yaw_to_center(det)
-            distance_m = _estimate_distance_m(det, spec)
-            if distance_m is None:
+            estimator.update(target)
+            state = estimator.state()
+            if state is None:
+                # No usable width for a range; keep centering on the raw detection.
+                if yaw_to_center(None, target):
+                    det_cursor = detector.detection_seq
                 continue
+            if state.updates < min_updates:
+                continue  # let a few detections settle the estimate after the last manoeuvre
+            if yaw_to_center(state, target):
+                det_cursor = detector.detection_seq
+                state = estimator.state()  # predicted through the turn; no need to wait for a frame
+            distance_m = state.range_m
             delta_m = distance_m - desired_distance_m
             remaining_forward_cm = max(0, int(round(max(0.0, delta_m) * 100.0)))
-            if abs(delta_m) <= distance_tol_m:
-                log_ai("Reached stand-off distance at {:.2f} m".format(distance_m))
+            # One-sided on purpose: closer than the stand-off, any step below would still be
+            # a MIN_MOVE_CM move *forward*, so stop here instead of closing in further.
+            if delta_m <= distance_tol_m:
+                if delta_m < -distance_tol_m:
+                    log_w("Already inside stand-off distance ({:.2f} m < {:.2f} m); not moving closer".format(
+                        distance_m, desired_distance_m))
+                log_ai("Reached stand-off distance at {:.2f} m (+/- {:.2f} m)".format(distance_m, state.range_sd))
                 approach_success = True
                 target_visible_on_finish = True
                 break
@@ -564,16 +665,21 @@ def engage_target(
             step_limit = int(getattr(C, "FORWARD_APPROACH_STEP_CM", 30))
             if step_limit > 0:
                 step_cm = max(C.MIN_MOVE_CM, min(step_cm, step_limit))
-            log_ai("Forward {} cm towards target (distance {:.2f} m)".format(step_cm, distance_m))
+            log_ai("Forward {} cm towards target (distance {:.2f} +/- {:.2f} m, {} detections)".format(
+                step_cm, distance_m, state.range_sd, state.updates))
             set_detector_status(detector, "Forward {} cm".format(step_cm))
             try_cmd(t.move_forward, step_cm, label="move_forward")
             total_forward_cm += step_cm
-            time.sleep(C.MOVE_SLEEP)
+            settle(C.MOVE_SLEEP)
+            estimator.apply_move(forward_m=step_cm / 100.0)
+            det_cursor = detector.detection_seq
             continue
         else:
             if now - last_seen <= lost_grace:
-                pump_preview()
                 continue
+            state = estimator.state()
+            if state is not None:
+                remaining_forward_cm = max(0, int(round((state.range_m - desired_distance_m) * 100.0)))
             if remaining_forward_cm > distance_tol_cm:
                 step_limit = int(getattr(C, "FORWARD_APPROACH_STEP_CM", 30))
                 step_cm = max(C.MIN_MOVE_CM, remaining_forward_cm if step_limit <= 0 else min(remaining_forward_cm, step_limit))
@@ -582,7 +688,9 @@ def engage_target(
                 try_cmd(t.move_forward, step_cm, label="move_forward")
                 total_forward_cm += step_cm
                 remaining_forward_cm = max(0, remaining_forward_cm - step_cm)
-                time.sleep(C.MOVE_SLEEP)
+                settle(C.MOVE_SLEEP)
+                estimator.apply_move(forward_m=step_cm / 100.0)
+                det_cursor = detector.detection_seq
                 if remaining_forward_cm <= distance_tol_cm:
                     approach_success = True
                     target_visible_on_finish = False
@@ -590,8 +698,9 @@ def engage_target(
                 continue
             log_ai("Target lost during approach")
             break
-        pump_preview()
 
+    log_ai("Target estimate: {} detections fused, {} rejected as outliers".format(
+        estimator.fused, estimator.rejected))
     final_visible = target_visible_on_finish or (last_det is not None and (time.time() - last_seen) <= lost_grace)
     if approach_success and final_visible:
         log_ai("Holding on target until lost")
@@ -600,8 +709,8 @@ def engage_target(
         last_visible = last_seen
         last_keepalive = time.time()
         while True:
-            pump_preview()
-            time.sleep(0.2)
+            # Wakes on each new target detection; times out to re-check the grace period.
+            det = detector.wait_for_detection(timeout=0.2, predicate=is_target)
             now = time.time()
             if now - last_keepalive > 8.0:
                 try:
@@ -609,8 +718,7 @@ def engage_target(
                 except Exception:
                     pass
                 last_keepalive = now
-            det = fetch_detection(max_wait_s=0.2, require_target=False)
-            if det and det.has_fire and (det.label == label or det.label is None):
+            if det is not None:
                 last_visible = now
                 continue
             if now - last_visible > hold_grace:
@@ -625,7 +733,7 @@ def engage_target(
         log_ai("Moving back {} cm to resume route".format(total_forward_cm))
         set_detector_status(detector, "Retreat {} cm".format(total_forward_cm))
         try_cmd(t.move_back, total_forward_cm, label="move_back")
-        time.sleep(C.MOVE_SLEEP)
+        settle(C.MOVE_SLEEP)
 
     if initial_yaw is not None:
         current_yaw = get_current_yaw(t)
@@ -639,13 +747,256 @@ def engage_target(
 
     set_detector_status(detector, "Returning to route")
 
-def main(json_path: str, show_video: bool) -> int:
+
+def _clip_name(index: int, label: str) -> str:
+    """Clip file stem tied to the AI log, e.g. flight_ai_20251029_170846_clip01_fire_170912."""
+    base = os.path.splitext(os.path.basename(AI_LOG_PATH))[0] if AI_LOG_PATH else "flight_ai"
+    return "{}_clip{:02d}_{}_{}".format(base, index, label, datetime.now().strftime("%H%M%S"))
+
+
+def engage_if_confirmed(
+    t: Tello,
+    detector: FireDetector,
+    frame_supplier: Optional[Callable[[], Optional[Any]]],
+    clip_recorder: Optional[ClipRecorder],
+    before_engage: Optional[Callable[[], None]] = None,
+) -> bool:
+    """
+    Engage the confirmed target, if there is one; True if an engagement ran.
+    ``before_engage`` runs first (e.g. to stop continuous RC flight).
+    """
+    det_snapshot = detector.get_confirmed_detection(max_age=0.5)
+    target = _pick_target(det_snapshot) if det_snapshot is not None else None
+    if target is None:
+        return False
+    if before_engage is not None:
+        before_engage()
+    label_detected = (target.label or "fire").lower()
+    log_i("Target '{}' detected; engaging".format(label_detected))
+    log_ai("Detected '{}' conf={:.2f} (in frame: {})".format(
+        label_detected, target.conf, ", ".join(det_snapshot.labels) or label_detected))
+    if clip_recorder is not None:
+        clip_path = clip_recorder.start_clip(_clip_name(clip_recorder.clips_started + 1, label_detected))
+        if clip_path is not None:
+            log_ai("Recording clip {}".format(clip_path.name))
+    detector.set_roi_mode(True, target.label)
+    try:
+        engage_target(t, detector, frame_supplier, target)
+    finally:
+        detector.set_roi_mode(False)
+        detector.reset_confirmation()
+        if clip_recorder is not None:
+            clip_recorder.stop_clip()
+    return True
+
+
+def fly_go_program(
+    t: Tello,
+    program: List[Command],
+    speed_cm_s: int,
+    detector: Optional[FireDetector],
+    frame_supplier: Optional[Callable[[], Optional[Any]]],
+    clip_recorder: Optional[ClipRecorder],
+) -> bool:
+    """
+    Execute a compile_go_plan() program: go/curve vectors in the takeoff
+    body frame, so the heading is held (drift-corrected, and restored after
+    an engagement) instead of turned. Returns True if the mission aborted.
+    """
+    hold_yaw = get_current_yaw(t)
+    hold_yaw = _normalize_yaw(hold_yaw) if hold_yaw is not None else 0.0
+    seg = -1
+    for cmd in program:
+        if cmd.seg != seg:
+            seg = cmd.seg
+            battery = TELEMETRY.battery()
+            if battery is None:
+                log_w("No recent telemetry; battery level unknown")
+            elif battery <= C.LOW_BATT_RTH:
+                log_e("Low battery {}% - stop mission".format(battery))
+                return True
+            if seg > 0 and C.PAUSE_PER_SEG > 0:
+                time.sleep(C.PAUSE_PER_SEG)
+        log_i("[{}] {} {}".format(cmd.seg, cmd.op, " ".join(str(v) for v in cmd.args)))
+        try:
+            if cmd.op == "curve":
+                try_cmd(t.curve_xyz_speed, *cmd.args, go_speed(speed_cm_s, curve=True), label="curve")
+            else:
+                try_cmd(t.go_xyz_speed, *cmd.args, go_speed(speed_cm_s), label="go")
+        except Exception as exc:
+            log_w("{} failed; skipping to the next command: {}".format(cmd.op, exc))
+            continue
+        settle(C.MOVE_SLEEP)
+        hold_yaw = correct_heading_if_needed(t, hold_yaw)
+        if detector and engage_if_confirmed(t, detector, frame_supplier, clip_recorder):
+            restore_heading(t, hold_yaw)
+    return False
+
+
+def _rc_hover(t: Tello, watchdog: Any) -> None:
+    watchdog.disarm()
+    t.send_rc_control(0, 0, 0, 0)
+    settle(C.MOVE_SLEEP)
+
+
+def fly_rc_path(
+    t: Tello,
+    path: List[Tuple[float, float]],
+    speed_cm_s: int,
+    detector: Optional[FireDetector],
+    frame_supplier: Optional[Callable[[], Optional[Any]]],
+    clip_recorder: Optional[ClipRecorder],
+) -> bool:
+    """
+    Fly ``path`` (takeoff body frame, cm) continuously: every 1/RC_RATE_HZ
+    send an RC velocity toward the pure-pursuit carrot, dead-reckoning the
+    position from telemetry. A confirmed target brakes the drone on the tick
+    it shows up and is engaged; stale telemetry hovers, and lands the mission
+    after RC_STALL_ABORT_S, as does taking RC_TIMEOUT_FACTOR times the
+    expected flight time. Returns True if the mission aborted.
+    """
+    rc = lazy_import("beta_rc")
+    buffer = TELEMETRY.buffer
+    hold_yaw = get_current_yaw(t)
+    hold_yaw = _normalize_yaw(hold_yaw) if hold_yaw is not None else 0.0
+    reckoner = rc.DeadReckoner(buffer, hold_yaw)
+    follower = rc.PathFollower(path)
+    watchdog = rc.RCWatchdog(t).start()
+    hover = functools.partial(_rc_hover, t, watchdog)
+    period = 1.0 / max(1.0, float(getattr(C, "RC_RATE_HZ", 20)))
+    stale_s = float(getattr(C, "RC_TELEMETRY_STALE_S", 0.5))
+    stall_abort_s = float(getattr(C, "RC_STALL_ABORT_S", 3.0))
+    brake_gain = float(getattr(C, "RC_BRAKE_GAIN", 1.0))
+    budget_s = max(10.0, float(getattr(C, "RC_TIMEOUT_FACTOR", 3.0)) * path_length(path) / max(1, speed_cm_s))
+    deadline = time.time() + budget_s
+    ticks = overruns = 0
+    leg = -1
+    stale_since = None  # type: Optional[float]
+    aborted = False
+    next_tick = time.time()
+    try:
+        while True:
+            now = time.time()
+            ticks += 1
+            if now - buffer.last_ts > stale_s:
+                if stale_since is None:
+                    stale_since = now
+                    log_w("Telemetry stalled; hovering")
+                t.send_rc_control(0, 0, 0, 0)
+                watchdog.feed()
+                if now - stale_since > stall_abort_s:
+                    log_e("No telemetry for {:.1f}s - stop mission".format(now - stale_since))
+                    aborted = True
+                    break
+            else:
+                if stale_since is not None:
+                    log_i("Telemetry back after {:.1f}s".format(now - stale_since))
+                    stale_since = None
+                pos = reckoner.update()
+                carrot, left_cm, done = follower.step(pos)
+                if done:
+                    break
+                if now > deadline:
+                    log_e("RC flight still {:.0f} cm from the end after {:.0f}s - stop mission".format(left_cm, budget_s))
+                    aborted = True
+                    break
+                if follower.leg != leg:
+                    leg = follower.leg
+                    battery = TELEMETRY.battery()
+                    if battery is not None and battery <= C.LOW_BATT_RTH:
+                        log_e("Low battery {}% - stop mission".format(battery))
+                        aborted = True
+                        break
+                    log_i("[{}] rc leg to ({:.0f}, {:.0f}) cm, at ({:.0f}, {:.0f})".format(
+                        leg, path[leg + 1][0], path[leg + 1][1], pos[0], pos[1]))
+                aim = (carrot[0] - pos[0], carrot[1] - pos[1])
+                aim_cm = math.hypot(*aim) or 1.0
+                speed = min(float(speed_cm_s), max(10.0, brake_gain * left_cm))
+                yaw = TELEMETRY.latest("yaw", max_age=stale_s)
+                yaw_offset = _normalize_yaw(yaw - hold_yaw) if yaw is not None else 0.0
+                t.send_rc_control(*rc.rc_command((aim[0] / aim_cm * speed, aim[1] / aim_cm * speed), yaw_offset))
+                watchdog.feed()
+                if detector and engage_if_confirmed(t, detector, frame_supplier, clip_recorder, before_engage=hover):
+                    restore_heading(t, hold_yaw)
+                    deadline += time.time() - now  # engagements don't count against the flight budget
+                    next_tick = time.time()
+            next_tick += period
+            delay = next_tick - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                overruns += 1
+                next_tick = time.time()
+    finally:
+        watchdog.stop()
+        try:
+            t.send_rc_control(0, 0, 0, 0)
+        except Exception:
+            pass
+        end = path[-1]
+        log_i("RC flight: {} ticks ({} overruns), {} watchdog stops, ended at ({:.0f}, {:.0f}) cm vs ({:.0f}, {:.0f})".format(
+            ticks, overruns, watchdog.trips, reckoner.x, reckoner.y, end[0] + 0.0, end[1] + 0.0))
+    settle(C.MOVE_SLEEP)
+    return aborted
+
+
+def _log_startup_timeline(marks: List[Tuple[str, float]]) -> None:
+    """One log line per startup step, relative to the first mark."""
+    if not marks:
+        return
+    marks = sorted(marks, key=lambda m: m[1])
+    t0 = marks[0][1]
+    log_i("Startup timeline:")
+    for label, ts in marks:
+        log_i("    {:>6.2f}s  {}".format(ts - t0, label))
+
+
+def _shutdown(t: Tello, detector: Optional[FireDetector], frame_source: Optional[SequencedFrameSource],
+              stream_reader: Optional[H264StreamReader], stream_active: bool) -> None:
+    """Stop detection, video and telemetry and release the drone (after landing or a failed takeoff)."""
+    global TELEMETRY
+    if detector:
+        stats = detector.get_async_stats()
+        log_i("Detector frames: inferred {frames_inferred}, tracked {frames_tracked}, dropped {frames_dropped}, "
+              "duplicates skipped {duplicates_skipped}, inferences saved {inferences_saved}".format(**stats))
+        detector.close()
+    if frame_source is not None:
+        frame_source.stop()
+    if stream_reader is not None:
+        stream_reader.stop()
+        log_i("Raw stream: {} packets saved to {}".format(stream_reader.packets_written, stream_reader.record_path))
+    if stream_active:
+        try:
+            t.streamoff()
+        except Exception:
+            pass
+    if TELEMETRY is not None:
+        log_i("Telemetry: {} state samples ({:.1f} Hz at the end)".format(
+            TELEMETRY.buffer.count, TELEMETRY.buffer.rate_hz()))
+        TELEMETRY.stop()
+        TELEMETRY = None
+    log_i("Settle waits: {} after commands, {:.1f}s of {:.1f}s fixed sleeps -> {:.1f}s dead time saved".format(
+        SETTLE_STATS["waits"], SETTLE_STATS["waited_s"], SETTLE_STATS["bound_s"],
+        max(0.0, SETTLE_STATS["bound_s"] - SETTLE_STATS["waited_s"])))
+    t.end()
+
+
+def main(json_path: str, show_video: bool, flight_mode: Optional[str] = None) -> int:
+    global TELEMETRY
     segs, meta = load_plan(json_path)
     alt_cm = int(meta.get("height_cm", C.ALT_CM))
     speed_cm_s = int(meta.get("speed_cm_s", C.SPEED_CM_S))
-    log_i("Altitude {} cm, speed {} cm/s".format(alt_cm, speed_cm_s))
+    flight_mode = flight_mode or getattr(C, "FLIGHT_MODE", "waypoint")
+    log_i("Altitude {} cm, speed {} cm/s, {} mode".format(alt_cm, speed_cm_s, flight_mode))
 
-    t = Tello()
+    timeline = [("start", time.time())]  # type: List[Tuple[str, float]]
+    detect = lazy_import("beta_detect")
+    record = lazy_import("beta_record")
+    timeline.append(("detector modules imported", time.time()))
+    # Load and warm up the model while the drone connects and starts streaming.
+    loader = detect.DetectorLoader(enable_model=True, show_video=show_video).start()
+
+    t = lazy_import("djitellopy").Tello()
     try:
         timeout_override = float(getattr(C, "RESPONSE_TIMEOUT_S", t.RESPONSE_TIMEOUT))
         if timeout_override > 0:
@@ -664,8 +1015,7 @@ def main(json_path: str, show_video: bool) -> int:
         try:
             log_i("Connecting (attempt {}/{})...".format(attempt, C.CONNECT_RETRIES))
             t.connect()
-            battery = t.get_battery()
-            log_i("Battery {}%".format(battery))
+            timeline.append(("connected", time.time()))
             ok = True
             break
         except Exception as exc:
@@ -673,41 +1023,117 @@ def main(json_path: str, show_video: bool) -> int:
             time.sleep(C.CONNECT_BACKOFF)
     if not ok:
         log_e("Unable to connect. Check TELLO Wi-Fi / power / close other Tello apps.")
+        loader.cancel()  # the model may still be loading; close it when it finishes
         return 3
 
+    # connect() returns once the state stream is up; from here on state reads come from the ring.
+    SETTLE_STATS.update(waits=0, bound_s=0.0, waited_s=0.0)
+    TELEMETRY = lazy_import("beta_telemetry").TelemetrySubscriber(t).start()
+    TELEMETRY.buffer.wait_for_sample(0, timeout=1.0)
+    battery = TELEMETRY.battery()
+    if battery is None:
+        log_w("No telemetry yet; asking for the battery level")
+        try:
+            battery = t.get_battery()
+        except Exception as exc:
+            log_w("get_battery error: {}".format(exc))
+    timeline.append(("battery checked", time.time()))
+    log_i("Battery {}%".format(battery))
+
+    try:
+        t.set_speed(speed_cm_s)
+        timeline.append(("speed set", time.time()))
+    except Exception as exc:
+        log_w("set_speed error: {}".format(exc))
+
     expected_yaw = get_current_yaw(t)
     expected_yaw = _normalize_yaw(expected_yaw) if expected_yaw is not None else 0.0
 
     frame_supplier: Optional[Callable[[], Optional[Any]]] = None
+    frame_source: Optional[SequencedFrameSource] = None
+    stream_reader: Optional[H264StreamReader] = None
+    clip_recorder: Optional[ClipRecorder] = None
     detector: Optional[FireDetector] = None
     stream_active = False
 
     try:
         t.streamon()
         stream_active = True
-        frame_read = t.get_frame_read(with_queue=False, max_queue_len=0)
-
-        def _supply_frame(fr=frame_read):
-            return fr.frame
-
-        frame_supplier = _supply_frame
-        detector = FireDetector(enable_model=True, show_video=show_video)
-        detector.start_async(frame_supplier)
+        timeline.append(("stream on", time.time()))
+        if getattr(C, "VIDEO_PASSTHROUGH", False) and C.VIDEO_SAVE_PATH:
+            # Own the UDP stream so the raw H.264 can be saved without re-encoding.
+            address = t.get_udp_video_address() if hasattr(t, "get_udp_video_address") else "udp://@0.0.0.0:11111"
+            stream_reader = record.H264StreamReader(address, record.next_video_path(suffix=".mkv"))
+            stream_reader.start()
+            frame_read = stream_reader
+        else:
+            frame_read = t.get_frame_read(with_queue=False, max_queue_len=0)
+
+        # Stamp decoded frames so the detector only infers genuinely new ones.
+        frame_source = detect.SequencedFrameSource(frame_read)
+        frame_source.start()
+        frame_supplier = frame_source
+        # Takeoff waits here until the model is loaded and warm.
+        ready_timeout = float(getattr(C, "MODEL_READY_TIMEOUT_S", 120.0))
+        if not loader.ready:
+            log_i("Waiting for the detection model (up to {:.0f}s)...".format(ready_timeout))
+        detector = loader.result(timeout=ready_timeout)
+        timeline.append(("model ready", time.time()))
+        if detector is None:
+            raise RuntimeError("model not ready after {:.0f}s".format(ready_timeout))
+        if stream_reader is not None:
+            detector.attach_sidecar(stream_reader.sidecar)
+            stream_reader.timings = detector.timings
+        if float(getattr(C, "LATENCY_LOG_SECS", 0.0)) > 0:
+            detector.set_latency_log(log_ai, float(C.LATENCY_LOG_SECS))
+        if getattr(C, "CLIP_ENABLE", False):
+            clip_recorder = record.ClipRecorder()
+            detector.attach_clip_recorder(clip_recorder)
+        detector.start_async(frame_source, poll_interval=1.0 / float(C.ASYNC_FRAME_HZ))
     except Exception as exc:
-        log_w("streamon error - disabling detection/preview: {}".format(exc))
+        log_w("streamon/model error - disabling detection/preview: {}".format(exc))
+        if detector is None:
+            loader.cancel()  # a model that finishes loading later is closed, not leaked
+        if frame_source is not None:
+            frame_source.stop()
+        if stream_reader is not None:
+            stream_reader.stop()
+        frame_source = None
+        stream_reader = None
         frame_supplier = None
+        if detector is not None:
+            detector.close(report=False)
         detector = None
 
-    try:
-        t.set_speed(speed_cm_s)
-    except Exception as exc:
-        log_w("set_speed error: {}".format(exc))
-
+    points = load_plan_points(json_path) or points_from_segments(segs)
+    rc_path = body_path(points, segs)
+    if flight_mode == "go":
+        program, dropped_cm = compile_go_plan(points, segs, speed_cm_s=speed_cm_s, detection_active=detector is not None)
+    else:
+        program, dropped_cm = compile_plan(segs, speed_cm_s=speed_cm_s, detection_active=detector is not None)
+    naive, _ = compile_plan(segs, policy="fixed")
+    if flight_mode == "rc":
+        log_i("RC path: {} legs, {:.0f} cm (est {:.0f}s), was {} SDK commands with {} cm steps (est {:.0f}s)".format(
+            len(rc_path) - 1, path_length(rc_path), path_length(rc_path) / max(1, speed_cm_s),
+            command_count(naive), C.FORWARD_STEP_CM, estimate_seconds(naive, speed_cm_s)))
+        dropped_cm = 0
+    else:
+        log_i("Compiled program: {} SDK commands (est {:.0f}s), was {} with {} cm steps (est {:.0f}s)".format(
+            command_count(program), estimate_seconds(program, speed_cm_s),
+            command_count(naive), C.FORWARD_STEP_CM, estimate_seconds(naive, speed_cm_s)))
+    if dropped_cm:
+        log_w("{} cm of the route falls below MIN_MOVE_CM and will not be flown".format(dropped_cm))
+    forward_steps = forward_steps_by_segment(program)
+
+    timeline.extend(loader.marks)
+    timeline.append(("takeoff", time.time()))
+    _log_startup_timeline(timeline)
+    log_i("Deferred imports: {}".format(", ".join(import_report()) or "none"))
     log_i("Takeoff.")
     try:
         try_cmd(t.takeoff, label="takeoff")
     except Exception:
-        t.end()
+        _shutdown(t, detector, frame_source, stream_reader, stream_active)
         return 5
     time.sleep(0.5)
 
@@ -732,56 +1158,52 @@ def main(json_path: str, show_video: bool) -> int:
                 log_w("move_up({}) failed; continuing without additional climb: {}".format(step, exc))
                 break
             remaining -= step
-            time.sleep(C.MOVE_SLEEP)
+            settle(C.MOVE_SLEEP)
 
     aborted = False
     try:
-        for idx, (turn_deg, dist_cm) in enumerate(segs):
-            try:
-                battery = t.get_battery()
-                if battery is not None and battery <= C.LOW_BATT_RTH:
+        if flight_mode == "go":
+            aborted = fly_go_program(t, program, speed_cm_s, detector, frame_supplier, clip_recorder)
+        elif flight_mode == "rc":
+            aborted = fly_rc_path(t, rc_path, speed_cm_s, detector, frame_supplier, clip_recorder)
+        else:
+            for idx, (turn_deg, dist_cm) in enumerate(segs):
+                battery = TELEMETRY.battery()
+                if battery is None:
+                    log_w("No recent telemetry; battery level unknown")
+                elif battery <= C.LOW_BATT_RTH:
                     log_e("Low battery {}% - stop mission".format(battery))
                     aborted = True
                     break
-            except Exception as exc:
-                log_w("get_battery error: {}".format(exc))
-
-            if turn_deg:
-                log_i("[{}] turn {:+d} deg".format(idx, turn_deg))
-                rotate_signed_deg(t, turn_deg)
-                expected_yaw = _normalize_yaw(expected_yaw + turn_deg)
-                yaw_after = get_current_yaw(t)
-                if yaw_after is not None:
-                    expected_yaw = _normalize_yaw(yaw_after)
-
-            remaining = int(round(dist_cm))
-            log_i("[{}] forward total {} cm".format(idx, remaining))
-            while remaining >= C.MIN_MOVE_CM and not aborted:
-                step = min(C.FORWARD_STEP_CM, remaining, C.MAX_MOVE_CM)
-                try:
-                    try_cmd(t.move_forward, step, label="move_forward")
-                except Exception as exc:
-                    log_w("move_forward({}) failed; skipping remaining distance: {}".format(step, exc))
-                    break
-                remaining -= step
-                time.sleep(C.MOVE_SLEEP)
-                expected_yaw = correct_heading_if_needed(t, expected_yaw)
-
-                if detector:
-                    det_snapshot = detector.get_latest_detection(max_age=0.3)
-                    if det_snapshot and det_snapshot.has_fire:
-                        label_detected = (det_snapshot.label or "fire").lower()
-                        if label_detected not in C.TARGET_SPECS and "fire" not in C.TARGET_SPECS:
-                            continue
-                        log_i("Target '{}' detected; engaging".format(label_detected))
-                        log_ai("Detected '{}' conf={:.2f}".format(label_detected, det_snapshot.conf))
-                        engage_target(t, detector, frame_supplier, det_snapshot)
+
+                if turn_deg:
+                    log_i("[{}] turn {:+d} deg".format(idx, turn_deg))
+                    rotate_signed_deg(t, turn_deg)
+                    expected_yaw = _normalize_yaw(expected_yaw + turn_deg)
+                    yaw_after = get_current_yaw(t)
+                    if yaw_after is not None:
+                        expected_yaw = _normalize_yaw(yaw_after)
+
+                steps = forward_steps.get(idx, [])
+                log_i("[{}] forward total {} cm in {} move(s)".format(idx, sum(steps), len(steps)))
+                for step in steps:
+                    if aborted:
+                        break
+                    try:
+                        try_cmd(t.move_forward, step, label="move_forward")
+                    except Exception as exc:
+                        log_w("move_forward({}) failed; skipping remaining distance: {}".format(step, exc))
+                        break
+                    settle(C.MOVE_SLEEP)
+                    expected_yaw = correct_heading_if_needed(t, expected_yaw)
+
+                    if detector and engage_if_confirmed(t, detector, frame_supplier, clip_recorder):
                         yaw_after = get_current_yaw(t)
                         if yaw_after is not None:
                             expected_yaw = _normalize_yaw(yaw_after)
 
-            if C.PAUSE_PER_SEG > 0:
-                time.sleep(C.PAUSE_PER_SEG)
+                if C.PAUSE_PER_SEG > 0:
+                    time.sleep(C.PAUSE_PER_SEG)
 
         if not aborted:
             log_i("Mission complete. Landing.")
@@ -791,14 +1213,7 @@ def main(json_path: str, show_video: bool) -> int:
         log_e("Runtime error: {} - landing".format(exc))
     finally:
         safe_land(t)
-        if detector:
-            detector.close()
-        if stream_active:
-            try:
-                t.streamoff()
-            except Exception:
-                pass
-        t.end()
+        _shutdown(t, detector, frame_source, stream_reader, stream_active)
         log_i("Done.")
     return 0
 
@@ -844,6 +1259,13 @@ def cli() -> int:
         action="store_true",
         help="Show live preview window.",
     )
+    parser.add_argument(
+        "--mode",
+        choices=FLIGHT_MODES,
+        default=None,
+        help="Flight mode: rotate + forward legs, heading-held go/curve vectors, or continuous RC flight "
+             "(default: FLIGHT_MODE).",
+    )
 
     args = parser.parse_args()
     plan_path = _resolve_plan_path(args)
@@ -854,7 +1276,7 @@ def cli() -> int:
         log_path = os.path.join("logs", f"flight_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
     init_logging(log_path)
 
-    return main(str(plan_path), args.show_video)
+    return main(str(plan_path), args.show_video, args.mode)
 
 
 if __name__ == "__main__":
@@ -99,6 +99,33 @@ def load_plan(json_path: Union[str, Path]) -> Tuple[List[Tuple[int, int]], dict]
     return segs, meta
 
 
+def load_plan_points(json_path: Union[str, Path]) -> Optional[List[Tuple[float, float]]]:
+    """
+    The plan's 'pos' polyline in cm (planner canvas axes, scaled by
+    meta.cm_per_px), or None if the JSON carries no positions.
+    """
+    path = Path(json_path)
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    pos = data.get("pos", None)
+    if not pos or len(pos) < 2:
+        return None
+    scale = float(data.get("meta", {}).get("cm_per_px", 3.0))
+    return [(float(p[0]) * scale, float(p[1]) * scale) for p in pos]
+
+
+def points_from_segments(segs: Sequence[Tuple[int, int]]) -> List[Tuple[float, float]]:
+    """Rebuild a polyline (cm) from [(turn_signed_deg, dist_cm), ...], starting at heading 0."""
+    x, y, heading = 0.0, 0.0, 0.0
+    pts = [(x, y)]
+    for turn_deg, dist_cm in segs:
+        heading += math.radians(turn_deg)
+        x += dist_cm * math.cos(heading)
+        y += dist_cm * math.sin(heading)
+        pts.append((x, y))
+    return pts
+
+
 def find_latest_beta_waypoint_json() -> Optional[Path]:
     """
     Find the most recently modified beta_waypoint JSON in the plans directory.
@@ -112,4 +139,4 @@ def find_latest_beta_waypoint_json() -> Optional[Path]:
     return max(cands, key=lambda p: p.stat().st_mtime)
 
 
-__all__ = ["PLAN_DIR", "load_plan", "find_latest_beta_waypoint_json"]
+__all__ = ["PLAN_DIR", "load_plan", "load_plan_points", "points_from_segments", "find_latest_beta_waypoint_json"]
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Continuous RC-velocity flight (FLIGHT_MODE = "rc").
+Instead of blocking SDK moves, beta_main runs a fixed-rate loop that sends
+send_rc_control() velocities toward a pure-pursuit carrot on the plan's
+body-frame path (beta_compile.body_path). Position is dead-reckoned from
+the telemetry ring's velocities, and a watchdog thread zeros the sticks
+whenever the loop stops ticking.
+
+Axis conventions: the path uses +x forward / +y left (as the go mode).
+The state stream reports vgx forward and vgy right in the body frame
+(TELEMETRY_VEL_CM_S per unit), and its yaw grows clockwise, like rc yaw.
+"""
+import math
+import threading
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+import beta_config as C
+from beta_telemetry import TelemetryBuffer
+
+Vec = Tuple[float, float]
+
+
+def _wrap_deg(deg: float) -> float:
+    return (deg + 180.0) % 360.0 - 180.0
+
+
+class DeadReckoner:
+    """
+    Integrates telemetry velocities (trapezoidal, per state sample) into a
+    position in the hold-heading frame. It reads the buffer's history, so
+    motion between calls - an engagement, say - is accounted for as well.
+    """
+
+    def __init__(self, buffer: TelemetryBuffer, hold_yaw: float, since: Optional[float] = None) -> None:
+        self.buffer = buffer
+        self.hold_yaw = float(hold_yaw)
+        self.scale = float(getattr(C, "TELEMETRY_VEL_CM_S", 10.0))
+        self.max_gap = 0.5  # longer gaps between samples are not integrated across (s)
+        self.x = 0.0
+        self.y = 0.0
+        self.samples = 0
+        self._last_ts = buffer.last_ts if since is None else float(since)
+        self._last_vel = None  # type: Optional[Vec]
+
+    @property
+    def position(self) -> Vec:
+        return (self.x, self.y)
+
+    def update(self) -> Vec:
+        now = time.time()
+        secs = max(0.0, now - self._last_ts) + 1e-3
+        ts, vgx = self.buffer.window("vgx", secs, now)
+        _, vgy = self.buffer.window("vgy", secs, now)
+        _, yaw = self.buffer.window("yaw", secs, now)
+        for i in range(len(ts)):
+            if ts[i] <= self._last_ts or math.isnan(vgx[i]) or math.isnan(vgy[i]):
+                continue
+            offset = math.radians(_wrap_deg(yaw[i] - self.hold_yaw)) if not math.isnan(yaw[i]) else 0.0
+            fwd, right = vgx[i] * self.scale, vgy[i] * self.scale
+            # Body velocity into the hold frame (clockwise yaw offset turns "forward" toward -y).
+            vel = (fwd * math.cos(offset) - right * math.sin(offset),
+                   -fwd * math.sin(offset) - right * math.cos(offset))
+            dt = ts[i] - self._last_ts
+            if self._last_vel is not None and dt <= self.max_gap:
+                self.x += 0.5 * (vel[0] + self._last_vel[0]) * dt
+                self.y += 0.5 * (vel[1] + self._last_vel[1]) * dt
+            self._last_ts = float(ts[i])
+            self._last_vel = vel
+            self.samples += 1
+        return self.position
+
+
+class PathFollower:
+    """
+    Pure pursuit along a polyline: project the position onto the current
+    leg, aim at a point RC_LOOKAHEAD_CM further along the path, and slow
+    down over the last stretch. Legs only advance, so parallel sweep lines
+    can't capture the projection.
+    """
+
+    def __init__(self, path: Sequence[Vec], lookahead_cm: Optional[float] = None, arrive_cm: Optional[float] = None) -> None:
+        self.path = [tuple(map(float, p)) for p in path]  # type: List[Vec]
+        self.lookahead = float(lookahead_cm if lookahead_cm is not None else getattr(C, "RC_LOOKAHEAD_CM", 40))
+        self.arrive = float(arrive_cm if arrive_cm is not None else getattr(C, "RC_ARRIVE_CM", 15))
+        self.lengths = [math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(self.path, self.path[1:])]
+        self.starts = [sum(self.lengths[:i]) for i in range(len(self.lengths))]
+        self.total = sum(self.lengths)
+        self.leg = 0
+
+    def _along(self, pos: Vec, leg: int) -> float:
+        (ax, ay), (bx, by) = self.path[leg], self.path[leg + 1]
+        length = self.lengths[leg]
+        if length <= 0:
+            return 0.0
+        return ((pos[0] - ax) * (bx - ax) + (pos[1] - ay) * (by - ay)) / length
+
+    def point_at(self, s: float) -> Vec:
+        """The path point ``s`` cm from the start (clamped to the ends)."""
+        for leg in range(len(self.lengths)):
+            if s <= self.starts[leg] + self.lengths[leg] or leg == len(self.lengths) - 1:
+                frac = 0.0 if self.lengths[leg] <= 0 else max(0.0, min(1.0, (s - self.starts[leg]) / self.lengths[leg]))
+                (ax, ay), (bx, by) = self.path[leg], self.path[leg + 1]
+                return (ax + (bx - ax) * frac, ay + (by - ay) * frac)
+        return self.path[-1]
+
+    def step(self, pos: Vec) -> Tuple[Vec, float, bool]:
+        """(carrot, cm left along the path, done) for the current position."""
+        if not self.lengths:
+            return self.path[0], 0.0, True
+        while self.leg < len(self.lengths) - 1 and self._along(pos, self.leg) >= self.lengths[self.leg] - self.arrive:
+            self.leg += 1
+        along = max(0.0, min(self.lengths[self.leg], self._along(pos, self.leg)))
+        s = self.starts[self.leg] + along
+        end = self.path[-1]
+        to_end = math.hypot(end[0] - pos[0], end[1] - pos[1])
+        done = self.leg == len(self.lengths) - 1 and to_end <= self.arrive
+        return self.point_at(s + self.lookahead), max(self.total - s, to_end), done
+
+
+def _stick(value: float, limit: float = 100.0) -> int:
+    return int(round(max(-limit, min(limit, value))))
+
+
+def rc_command(vel: Vec, yaw_offset_deg: float) -> Tuple[int, int, int, int]:
+    """
+    send_rc_control() values (left_right, forward_back, up_down, yaw) for a
+    hold-frame velocity in cm/s, compensating a yaw offset and steering it
+    back toward the held heading.
+    """
+    full_scale = float(getattr(C, "RC_FULL_SCALE_CM_S", 100.0))
+    offset = math.radians(yaw_offset_deg)
+    fwd = vel[0] * math.cos(offset) - vel[1] * math.sin(offset)
+    right = -vel[0] * math.sin(offset) - vel[1] * math.cos(offset)
+    yaw_max = abs(int(getattr(C, "RC_YAW_SPEED", 60))) or 60
+    yaw = -float(getattr(C, "RC_YAW_GAIN", 2.0)) * yaw_offset_deg
+    return _stick(right * 100.0 / full_scale), _stick(fwd * 100.0 / full_scale), 0, _stick(yaw, yaw_max)
+
+
+class RCWatchdog:
+    """
+    Zeros the sticks if the control loop stops feeding it for longer than
+    ``timeout_s`` (a blocked detector call, an exception, a GIL stall).
+    Disarmed until the next feed() after it fires.
+    """
+
+    def __init__(self, tello: Any, timeout_s: Optional[float] = None) -> None:
+        self.tello = tello
+        self.timeout = float(timeout_s if timeout_s is not None else getattr(C, "RC_WATCHDOG_S", 0.3))
+        self.trips = 0
+        self._last_feed = 0.0
+        self._armed = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def start(self) -> "RCWatchdog":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="RCWatchdog", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.disarm()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def feed(self) -> None:
+        with self._lock:
+            self._last_feed = time.time()
+            self._armed = True
+
+    def disarm(self) -> None:
+        with self._lock:
+            self._armed = False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.timeout / 4.0):
+            with self._lock:
+                stalled = self._armed and time.time() - self._last_feed > self.timeout
+                if stalled:
+                    self._armed = False
+            if stalled:
+                self.trips += 1
+                try:
+                    self.tello.send_rc_control(0, 0, 0, 0)
+                except Exception:
+                    pass
+
+
+__all__ = ["DeadReckoner", "PathFollower", "rc_command", "RCWatchdog"]
@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recording helpers for the beta detector.
+Encoding runs on its own thread behind a bounded queue so a slow encoder
+never stalls detection or the preview window. In passthrough mode the
+Tello's H.264 packets are remuxed untouched (no re-encode) and detections
+go to a JSONL sidecar; ``python beta_record.py render <file.mkv>`` draws
+them onto a copy offline when an annotated video is actually needed.
+ReplayFrameSource plays recordings back as a stand-in for the live stream.
+"""
+import argparse
+import collections
+import json
+import math
+import threading
+import time
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import cv2
+import numpy as np
+
+import beta_config as C
+from beta_latency import StageTimings
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def next_video_path(prefix: str = "capture", suffix: str = ".mp4") -> Path:
+    """Resolve VIDEO_SAVE_PATH into an actual file target."""
+    raw_str = str(C.VIDEO_SAVE_PATH).strip()
+    raw_path = Path(raw_str).expanduser()
+    is_dir_hint = raw_str.endswith(("/", "\\")) or raw_path.exists() and raw_path.is_dir()
+
+    if not raw_path.suffix and not raw_path.exists():
+        # No extension provided; treat as directory for auto-naming.
+        is_dir_hint = True
+
+    if is_dir_hint:
+        base_dir = raw_path
+        base_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"{prefix}_{timestamp}{suffix}"
+        return base_dir / filename
+
+    target = raw_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    return target
+
+
+class VideoEncoder:
+    """
+    cv2.VideoWriter on a dedicated thread fed through a bounded queue.
+
+    The first frames (up to VIDEO_FPS_PROBE_SECS or VIDEO_QUEUE_LEN frames) are
+    held back to measure the real frame rate; the file is then opened at that rate (capped at VIDEO_FPS) and
+    frames are placed by timestamp, repeating the previous frame across gaps,
+    so recordings play back at true speed even when the input rate varies.
+    """
+
+    def __init__(
+        self,
+        target_path: Optional[Path] = None,
+        queue_len: Optional[int] = None,
+        policy: Optional[str] = None,
+        log_prefix: str = "[FireDetector]",
+    ) -> None:
+        self.target_path = target_path
+        self.policy = str(policy or getattr(C, "VIDEO_QUEUE_POLICY", "drop_oldest")).lower()
+        self._maxlen = max(1, int(queue_len or getattr(C, "VIDEO_QUEUE_LEN", 16)))
+        self._queue = collections.deque()  # type: collections.deque
+        self._cond = threading.Condition()
+        self._closing = False
+        self._log_prefix = log_prefix
+        self.failed = False
+        self.fps = 0.0
+        self.frames_submitted = 0
+        self.frames_dropped = 0
+        self.frames_written = 0
+        self.frames_duplicated = 0
+        self._writer = None  # type: Optional[Any]
+        self._thread = threading.Thread(target=self._run, name="video-encoder", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------ #
+    # Producer side
+    # ------------------------------------------------------------------ #
+    def submit(self, frame_bgr: np.ndarray, ts: Optional[float] = None) -> bool:
+        """Queue a frame; returns False if it (or an older frame) had to be dropped."""
+        if self.failed or self._closing:
+            return False
+        stamp = time.time() if ts is None else float(ts)
+        with self._cond:
+            self.frames_submitted += 1
+            accepted = True
+            if len(self._queue) >= self._maxlen:
+                if self.policy == "block":
+                    self._cond.wait_for(lambda: len(self._queue) < self._maxlen or self._closing or self.failed)
+                    if self._closing or self.failed:
+                        self.frames_dropped += 1
+                        return False
+                else:
+                    self._queue.popleft()
+                    self.frames_dropped += 1
+                    accepted = False
+            self._queue.append((frame_bgr, stamp))
+            self._cond.notify_all()
+        return accepted
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending frames (up to ``timeout``) and release the file."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.target_path) if self.target_path else None,
+            "fps": round(self.fps, 2),
+            "submitted": self.frames_submitted,
+            "dropped": self.frames_dropped,
+            "written": self.frames_written,
+            "duplicated": self.frames_duplicated,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Encoder thread
+    # ------------------------------------------------------------------ #
+    def _log(self, msg: str) -> None:
+        print(f"{self._log_prefix} {msg}")
+
+    def _pop(self, timeout: float) -> Optional[tuple]:
+        with self._cond:
+            if not self._queue and not self._closing:
+                self._cond.wait(timeout)
+            if not self._queue:
+                return None
+            item = self._queue.popleft()
+            self._cond.notify_all()
+            return item
+
+    def _open(self, shape, fps: float) -> bool:
+        try:
+            if self.target_path is None:
+                self.target_path = next_video_path()
+        except Exception as exc:
+            self._log(f"Unable to prepare video path: {exc}")
+            return False
+        height, width = shape[:2]
+        try:
+            fourcc = cv2.VideoWriter_fourcc(*C.VIDEO_CODEC)
+        except Exception as exc:
+            self._log(f"Invalid VIDEO_CODEC '{C.VIDEO_CODEC}': {exc}")
+            return False
+        fps = round(fps, 2)  # keeps the container time base within codec limits (e.g. mpeg4)
+        writer = cv2.VideoWriter(str(self.target_path), fourcc, fps, (width, height), True)
+        if not writer or not writer.isOpened():
+            if writer:
+                writer.release()
+            self._log(f"OpenCV could not open '{self.target_path}' "
+                      f"(codec={C.VIDEO_CODEC}, size={width}x{height}). Recording disabled.")
+            return False
+        self._writer = writer
+        self.fps = fps
+        self._log(f"Recording video to {self.target_path} at {fps:.1f} fps")
+        return True
+
+    def _fail(self) -> None:
+        with self._cond:
+            self.failed = True
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        probe_secs = float(getattr(C, "VIDEO_FPS_PROBE_SECS", 2.0))
+        max_fps = float(getattr(C, "VIDEO_FPS", 30) or 30)
+        probe = []  # type: list
+        t0 = None  # type: Optional[float]
+        next_slot = 0
+        last_frame = None  # type: Optional[np.ndarray]
+        try:
+            while True:
+                item = self._pop(0.2)
+                if item is None:
+                    if self._closing:
+                        break
+                    continue
+                if self._writer is None:
+                    probe.append(item)
+                    span = item[1] - probe[0][1]
+                    # The probe is bounded by the queue length too, so it never holds more memory.
+                    if span < probe_secs and len(probe) < self._maxlen and not self._closing:
+                        continue
+                    fps = (len(probe) - 1) / span if span > 0 else max_fps
+                    if not self._open(probe[0][0].shape, max(1.0, min(max_fps, fps))):
+                        self._fail()
+                        return
+                    pending, probe = probe, []
+                else:
+                    pending = [item]
+                for frame, stamp in pending:
+                    if t0 is None:
+                        t0 = stamp
+                    slot = int(round((stamp - t0) * self.fps))
+                    if slot < next_slot:
+                        # Arrived within an already written slot; keep the earlier frame.
+                        with self._cond:
+                            self.frames_dropped += 1
+                        continue
+                    if last_frame is not None:
+                        # Hold the previous frame across the gap (long stalls are capped at 2 s).
+                        for _ in range(min(slot - next_slot, int(self.fps * 2))):
+                            self._writer.write(last_frame)
+                            self.frames_written += 1
+                            self.frames_duplicated += 1
+                    self._writer.write(frame)
+                    self.frames_written += 1
+                    last_frame = frame
+                    next_slot = slot + 1
+                if self._closing and not self._queue:
+                    break
+            if self._writer is None and probe:
+                # Stream shorter than the probe window: open with what was measured.
+                span = probe[-1][1] - probe[0][1]
+                fps = (len(probe) - 1) / span if span > 0 else max_fps
+                if self._open(probe[0][0].shape, max(1.0, min(max_fps, fps))):
+                    for frame, _ in probe:
+                        self._writer.write(frame)
+                        self.frames_written += 1
+        except Exception as exc:
+            self._log(f"Video encoder stopped: {exc}")
+            self._fail()
+        finally:
+            if self._writer is not None:
+                try:
+                    self._writer.release()
+                except Exception:
+                    pass
+                self._writer = None
+
+
+class DetectionSidecar:
+    """Append-only JSONL log of detections keyed by the recording's pts (ms)."""
+
+    def __init__(self, path: Path, t0: Optional[float] = None) -> None:
+        self.path = Path(path)
+        self.t0 = t0
+        self._lock = threading.Lock()
+        self._file = self.path.open("w", encoding="utf-8")
+
+    def write(self, det: Any, frame_ts: float, seq: Optional[int] = None) -> None:
+        if self.t0 is None:
+            return  # recording has not started yet, nothing to align with
+        entry = {
+            "pts_ms": int(round((frame_ts - self.t0) * 1000.0)),
+            "seq": seq,
+            "has_fire": bool(det.has_fire),
+            "bbox": list(det.bbox) if det.bbox is not None else None,
+            "conf": round(float(det.conf), 4),
+            "label": det.label,
+            "tracked": bool(getattr(det, "tracked", False)),
+            "reused": bool(getattr(det, "reused", False)),
+        }
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(json.dumps(entry) + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class H264StreamReader:
+    """
+    Replacement for djitellopy's BackgroundFrameRead that also remuxes the
+    raw H.264 packets into a container (no re-encode, near-zero CPU).
+
+    The Tello stream carries no timestamps, so packets are stamped with
+    wall-clock time since the first packet (1 ms time base). ``frame`` holds
+    the latest decoded frame, RGB or BGR to match TELLO_FRAME_RGB, so the
+    reader plugs straight into SequencedFrameSource.
+    """
+
+    def __init__(self, address: str, record_path: Optional[Path] = None) -> None:
+        self.address = address
+        self.record_path = Path(record_path) if record_path else None
+        if self.record_path is not None and self.record_path.suffix.lower() not in (".mkv", ".mp4"):
+            self.record_path = self.record_path.with_suffix(".mkv")
+        self.sidecar = None  # type: Optional[DetectionSidecar]
+        if self.record_path is not None:
+            self.sidecar = DetectionSidecar(self.record_path.with_suffix(".jsonl"))
+        self._pix_fmt = "rgb24" if getattr(C, "TELLO_FRAME_RGB", False) else "bgr24"
+        self._frame = None  # type: Optional[np.ndarray]
+        self._stop = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+        self.t0 = None  # type: Optional[float]
+        self.packets_written = 0
+        self.frames_decoded = 0
+        self.timings = None  # type: Optional[StageTimings]
+
+    @property
+    def frame(self) -> Optional[np.ndarray]:
+        return self._frame
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="h264-reader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self.sidecar is not None:
+            self.sidecar.close()
+
+    def _run(self) -> None:
+        import av  # already a djitellopy dependency
+
+        try:
+            container = av.open(self.address, timeout=(5, None))
+        except Exception as exc:
+            print(f"[H264StreamReader] Unable to open {self.address}: {exc}")
+            return
+        output = None
+        out_stream = None
+        time_base = Fraction(1, 1000)
+        try:
+            stream = container.streams.video[0]
+            if self.record_path is not None:
+                self.record_path.parent.mkdir(parents=True, exist_ok=True)
+                output = av.open(str(self.record_path), "w")
+                if hasattr(output, "add_stream_from_template"):
+                    out_stream = output.add_stream_from_template(stream)
+                else:
+                    out_stream = output.add_stream(template=stream)
+                out_stream.time_base = time_base
+                print(f"[H264StreamReader] Recording raw H.264 to {self.record_path}")
+            last_pts = -1
+            for packet in container.demux(stream):
+                if self._stop.is_set():
+                    break
+                if packet.size == 0:
+                    continue
+                now = time.time()
+                t_decode = time.perf_counter()
+                for frame in packet.decode():
+                    self._frame = frame.to_ndarray(format=self._pix_fmt)
+                    self.frames_decoded += 1
+                    if self.timings is not None:
+                        self.timings.record("decode", time.perf_counter() - t_decode)
+                    t_decode = time.perf_counter()
+                if output is None:
+                    continue
+                if self.t0 is None:
+                    self.t0 = now
+                    if self.sidecar is not None:
+                        self.sidecar.t0 = now
+                pts = max(last_pts + 1, int(round((now - self.t0) * 1000.0)))
+                last_pts = pts
+                packet.pts = packet.dts = pts
+                packet.time_base = time_base
+                packet.stream = out_stream
+                output.mux(packet)
+                self.packets_written += 1
+        except Exception as exc:
+            if not self._stop.is_set():
+                print(f"[H264StreamReader] Stream stopped: {exc}")
+        finally:
+            if output is not None:
+                try:
+                    output.close()
+                except Exception:
+                    pass
+            try:
+                container.close()
+            except Exception:
+                pass
+
+
+def iter_frames(source: Path, limit: int = 0, stride: int = 1) -> Iterator[np.ndarray]:
+    """Yield frames from a video file or an image directory in drone format (RGB if TELLO_FRAME_RGB)."""
+    count = 0
+    to_rgb = bool(getattr(C, "TELLO_FRAME_RGB", False))
+    if source.is_dir():
+        paths = sorted(p for p in source.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        frames = (cv2.imread(str(p)) for p in paths[::max(1, stride)])
+    else:
+        frames = _video_frames(source, stride)
+    for frame in frames:
+        if frame is None:
+            continue
+        yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if to_rgb else frame
+        count += 1
+        if limit and count >= limit:
+            break
+
+
+def _video_frames(path: Path, stride: int) -> Iterator[np.ndarray]:
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise FileNotFoundError("Unable to open video {}".format(path))
+    idx = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if idx % max(1, stride) == 0:
+                yield frame
+            idx += 1
+    finally:
+        cap.release()
+
+
+class ReplayFrameSource:
+    """
+    Plays a recording (video file or directory of frames) as if it were the
+    drone stream. ``frame`` holds the latest frame in drone format, so the
+    replay plugs into SequencedFrameSource / FireDetector.start_async just
+    like djitellopy's BackgroundFrameRead or H264StreamReader.
+
+    ``pace`` 1.0 plays at the recorded rate (``fps`` for image directories),
+    2.0 twice as fast and 0 as fast as frames decode; the detector then
+    drops whatever it cannot keep up with, as it would on the drone.
+    """
+
+    def __init__(self, source: Path, pace: float = 1.0, fps: Optional[float] = None,
+                 limit: int = 0, loop: bool = False) -> None:
+        self.source = Path(source)
+        if not self.source.exists():
+            raise FileNotFoundError("Replay source not found: {}".format(self.source))
+        self.pace = max(0.0, float(pace))
+        self.fps = float(fps) if fps else self._source_fps()
+        self.limit = int(limit)
+        self.loop = bool(loop)
+        self._frame = None  # type: Optional[np.ndarray]
+        self._stop = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+        self.finished = threading.Event()
+        self.frames_read = 0
+
+    def _source_fps(self) -> float:
+        if self.source.is_dir():
+            return 30.0
+        cap = cv2.VideoCapture(str(self.source))
+        try:
+            fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        finally:
+            cap.release()
+        return fps if 1.0 <= fps <= 240.0 else 30.0
+
+    @property
+    def frame(self) -> Optional[np.ndarray]:
+        return self._frame
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.finished.clear()
+        self._thread = threading.Thread(target=self._run, name="replay-source", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the recording has been played out (True) or ``timeout`` passes."""
+        return self.finished.wait(timeout)
+
+    def _run(self) -> None:
+        period = 1.0 / (self.fps * self.pace) if self.pace > 0 else 0.0
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                for frame in iter_frames(self.source, self.limit):
+                    if self._stop.is_set():
+                        break
+                    if period:
+                        delay = start + self.frames_read * period - time.perf_counter()
+                        if delay > 0:
+                            self._stop.wait(delay)
+                    self._frame = frame
+                    self.frames_read += 1
+                if not self.loop or self.frames_read == 0:
+                    break
+        except Exception as exc:
+            print(f"[ReplayFrameSource] Replay stopped: {exc}")
+        finally:
+            self.finished.set()
+
+
+class ClipRecorder:
+    """
+    Event clips with pre-roll: the last CLIP_PREROLL_SECS of rendered frames
+    sit in a ring buffer preallocated once, sized for that pre-roll at the
+    detector's inference rate (the render stage only sees inferred frames;
+    FireDetector passes its rate in with set_rate()) and capped by
+    CLIP_BUFFER_MB (a warning is printed when the cap cuts the pre-roll
+    short). start_clip()
+    writes that pre-roll plus every following frame to its own file until
+    stop_clip(). While a clip is open the ring is paused (the encoder still
+    reads its slots) and it refills once the clip file is closed.
+    """
+
+    def __init__(self, clip_dir: Optional[str] = None, preroll_secs: Optional[float] = None,
+                 budget_mb: Optional[float] = None, fps: Optional[float] = None) -> None:
+        self.clip_dir = Path(clip_dir or getattr(C, "CLIP_DIR", "videos")).expanduser()
+        self.preroll_secs = float(preroll_secs if preroll_secs is not None else getattr(C, "CLIP_PREROLL_SECS", 3.0))
+        self.budget_bytes = int(float(budget_mb if budget_mb is not None else getattr(C, "CLIP_BUFFER_MB", 200)) * 1024 * 1024)
+        self.fps = max(1.0, float(fps if fps is not None else getattr(C, "ASYNC_FRAME_HZ", 12)))
+        self._lock = threading.Lock()
+        self._ring = None  # type: Optional[np.ndarray]
+        self._stamps = None  # type: Optional[np.ndarray]
+        self._head = 0
+        self._count = 0
+        self._encoder = None  # type: Optional[VideoEncoder]
+        self._closing = False
+        self.clips_started = 0
+        self.clips_saved = 0
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._ring is None else self._ring.shape[0]
+
+    @property
+    def active(self) -> bool:
+        return self._encoder is not None
+
+    @property
+    def buffered_secs(self) -> float:
+        """Span of the pre-roll currently held in the ring."""
+        with self._lock:
+            if self._count < 2:
+                return 0.0
+            size = self._ring.shape[0]
+            newest = self._stamps[(self._head - 1) % size]
+            return float(newest - self._stamps[(self._head - self._count) % size])
+
+    def set_rate(self, fps: float) -> None:
+        """Size the ring for ``fps`` pushed frames per second (reallocated on the next push)."""
+        fps = max(1.0, float(fps))
+        with self._lock:
+            if fps == self.fps:
+                return
+            self.fps = fps
+            if self._encoder is None and not self._closing:
+                self._ring = self._stamps = None
+                self._head = self._count = 0
+
+    def _allocate(self, frame: np.ndarray) -> bool:
+        # Pre-roll plus a little slack for frame-rate jitter; never more than the budget holds.
+        wanted = int(math.ceil(self.preroll_secs * self.fps)) + int(math.ceil(0.25 * self.fps))
+        fits = self.budget_bytes // max(1, frame.nbytes)
+        slots = min(wanted, fits)
+        if slots < 1:
+            print(f"[ClipRecorder] CLIP_BUFFER_MB too small for one {frame.shape[1]}x{frame.shape[0]} frame; clips disabled")
+            return False
+        if fits < wanted:
+            print(f"[ClipRecorder] CLIP_BUFFER_MB holds {slots / self.fps:.1f}s of pre-roll, "
+                  f"not {self.preroll_secs:.1f}s (needs {wanted * frame.nbytes / 2.0 ** 20:.0f} MB)")
+        self._ring = np.empty((int(slots),) + frame.shape, dtype=frame.dtype)
+        self._stamps = np.zeros((int(slots),), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        return True
+
+    def push(self, frame_bgr: np.ndarray, ts: Optional[float] = None) -> bool:
+        """Buffer (copy) or record a frame; True if the clip encoder kept a reference to it."""
+        stamp = time.time() if ts is None else float(ts)
+        with self._lock:
+            if self._encoder is not None:
+                self._encoder.submit(frame_bgr, stamp)
+                return True
+            if self._closing:
+                return False
+            if self._ring is None or self._ring.shape[1:] != frame_bgr.shape:
+                if not self._allocate(frame_bgr):
+                    return False
+            np.copyto(self._ring[self._head], frame_bgr)
+            self._stamps[self._head] = stamp
+            self._head = (self._head + 1) % self._ring.shape[0]
+            self._count = min(self._count + 1, self._ring.shape[0])
+            return False
+
+    def start_clip(self, name: str) -> Optional[Path]:
+        """Open ``<CLIP_DIR>/<name>.mp4`` seeded with the buffered pre-roll."""
+        with self._lock:
+            if self._encoder is not None or self._closing:
+                return None
+            try:
+                self.clip_dir.mkdir(parents=True, exist_ok=True)
+            except Exception as exc:
+                print(f"[ClipRecorder] Unable to prepare clip dir: {exc}")
+                return None
+            path = self.clip_dir / (name + ".mp4")
+            self.clips_started += 1
+            size = self.capacity
+            self._encoder = VideoEncoder(path, queue_len=size + int(getattr(C, "VIDEO_QUEUE_LEN", 16)),
+                                         log_prefix="[ClipRecorder]")
+            if self._count:
+                newest = self._stamps[(self._head - 1) % size]
+                for i in range(self._count):
+                    slot = (self._head - self._count + i) % size
+                    if newest - self._stamps[slot] <= self.preroll_secs:
+                        self._encoder.submit(self._ring[slot], float(self._stamps[slot]))
+            return path
+
+    def stop_clip(self) -> None:
+        """Finish the clip in the background; the ring resumes once the file is closed."""
+        with self._lock:
+            encoder, self._encoder = self._encoder, None
+            if encoder is None:
+                return
+            self._closing = True
+
+        def _finish() -> None:
+            encoder.close()
+            with self._lock:
+                self._closing = False
+                self._count = 0
+                self.clips_saved += 1
+
+        threading.Thread(target=_finish, name="clip-close", daemon=True).start()
+
+
+def _load_sidecar(path: Path) -> Dict[int, Dict[str, Any]]:
+    entries = {}  # type: Dict[int, Dict[str, Any]]
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                entries[int(entry["pts_ms"])] = entry
+    return entries
+
+
+def _iter_recording(path: Path) -> Iterator[tuple]:
+    import av
+
+    with av.open(str(path)) as container:
+        stream = container.streams.video[0]
+        for frame in container.decode(stream):
+            pts_ms = int(round(float(frame.pts * stream.time_base) * 1000.0)) if frame.pts is not None else None
+            yield pts_ms, frame.to_ndarray(format="bgr24")
+
+
+def render_annotated(recording: Path, sidecar: Optional[Path] = None, output: Optional[Path] = None) -> Path:
+    """Draw the sidecar detections onto a passthrough recording (offline re-encode)."""
+    sidecar = sidecar or recording.with_suffix(".jsonl")
+    output = output or recording.with_name(recording.stem + "_annotated.mp4")
+    entries = _load_sidecar(sidecar)
+    keys = sorted(entries)
+    writer = None
+    current = None  # type: Optional[Dict[str, Any]]
+    idx = 0
+    stamps = []
+    frames = []
+    # Measure the real rate from the first packets so the output keeps true speed.
+    for pts_ms, frame in _iter_recording(recording):
+        if writer is None:
+            frames.append((pts_ms, frame))
+            stamps.append(pts_ms or 0)
+            if len(frames) < 30:
+                continue
+            span = (stamps[-1] - stamps[0]) / 1000.0
+            fps = (len(stamps) - 1) / span if span > 0 else 30.0
+            fps = round(max(1.0, min(float(getattr(C, "VIDEO_FPS", 30) or 30), fps)), 2)
+            height, width = frame.shape[:2]
+            writer = cv2.VideoWriter(str(output), cv2.VideoWriter_fourcc(*C.VIDEO_CODEC), fps, (width, height), True)
+            pending, frames = frames, []
+        else:
+            pending = [(pts_ms, frame)]
+        for pts, img in pending:
+            while pts is not None and idx < len(keys) and keys[idx] <= pts:
+                current = entries[keys[idx]]
+                idx += 1
+            if current and current.get("has_fire") and current.get("bbox"):
+                x1, y1, x2, y2 = current["bbox"]
+                colour = (0, 200, 255) if current.get("tracked") else (0, 0, 255)
+                cv2.rectangle(img, (x1, y1), (x2, y2), colour, 2)
+                cv2.putText(img, "{} {:.2f}".format(current.get("label"), current.get("conf", 0.0)),
+                            (x1, max(12, y1 - 6)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, colour, 1)
+            writer.write(img)
+    if writer is None and frames:
+        height, width = frames[0][1].shape[:2]
+        writer = cv2.VideoWriter(str(output), cv2.VideoWriter_fourcc(*C.VIDEO_CODEC), 30.0, (width, height), True)
+        for _, img in frames:
+            writer.write(img)
+    if writer is not None:
+        writer.release()
+    return output
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recording utilities.")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+    p_render = sub.add_parser("render", help="draw sidecar detections onto a passthrough recording")
+    p_render.add_argument("recording", help="passthrough .mkv/.mp4 file")
+    p_render.add_argument("--sidecar", default=None, help="detections JSONL (default: next to the recording)")
+    p_render.add_argument("--output", default=None, help="annotated output (default: <name>_annotated.mp4)")
+    args = parser.parse_args()
+
+    recording = Path(args.recording)
+    sidecar = Path(args.sidecar) if args.sidecar else None
+    for path in (recording, sidecar or recording.with_suffix(".jsonl")):
+        if not path.exists():
+            print(f"[X] Not found: {path}")
+            return 2
+    out = render_annotated(recording, sidecar, Path(args.output) if args.output else None)
+    print(f"[*] Annotated video written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telemetry history from the Tello state stream (UDP 8890, ~10 Hz).
+djitellopy already owns port 8890 and replaces the drone's state dict for
+every packet it parses, so TelemetrySubscriber watches for a new dict and
+appends it to a preallocated NumPy ring. Readers get the latest value in
+O(1), time-windowed slices ("yaw over the last 500 ms") and derived
+signals such as is_stationary(), all without an SDK round trip.
+"""
+import math
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+import beta_config as C
+
+TELEMETRY_FIELDS = ("yaw", "pitch", "roll", "h", "tof", "vgx", "vgy", "vgz", "bat", "baro")
+_COLUMN = {name: i + 1 for i, name in enumerate(TELEMETRY_FIELDS)}  # column 0 is the receive time
+
+
+class TelemetryBuffer:
+    """Fixed-size ring of (ts, *TELEMETRY_FIELDS) rows; one writer, any number of readers."""
+
+    def __init__(self, capacity: int = 3000) -> None:
+        self.capacity = max(2, int(capacity))
+        self._rows = np.full((self.capacity, 1 + len(TELEMETRY_FIELDS)), np.nan, dtype=np.float64)
+        self._head = 0  # next row to write
+        self.count = 0  # samples ever appended
+        self._cond = threading.Condition()
+
+    def append(self, state: Dict[str, Any], ts: Optional[float] = None) -> None:
+        with self._cond:
+            row = self._rows[self._head]
+            row[0] = time.time() if ts is None else ts
+            for name, col in _COLUMN.items():
+                try:
+                    row[col] = float(state[name])
+                except (KeyError, TypeError, ValueError):
+                    row[col] = np.nan
+            self._head = (self._head + 1) % self.capacity
+            self.count += 1
+            self._cond.notify_all()
+
+    def wait_for_sample(self, after_count: int, timeout: Optional[float] = None) -> bool:
+        """Block until more than ``after_count`` samples were appended."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.count > after_count, timeout)
+
+    def latest(self, field: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Newest value of ``field`` (None if missing, or older than ``max_age`` seconds)."""
+        with self._cond:
+            if self.count == 0:
+                return None
+            row = self._rows[self._head - 1]
+            ts, value = row[0], row[_COLUMN[field]]
+        if max_age is not None and time.time() - ts > max_age:
+            return None
+        return None if math.isnan(value) else float(value)
+
+    @property
+    def last_ts(self) -> float:
+        with self._cond:
+            return float(self._rows[self._head - 1, 0]) if self.count else 0.0
+
+    def window(self, field: str, secs: float, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) of ``field`` received in the last ``secs`` seconds, oldest first."""
+        since = (time.time() if now is None else now) - secs
+        with self._cond:
+            head, filled = self._head, min(self.count, self.capacity)
+            # The ring holds two time-ordered runs: [head:filled] (older) then [0:head] (newer).
+            parts = [self._rows[head:filled], self._rows[:head]] if filled == self.capacity else [self._rows[:head]]
+            chunks = []
+            for part in parts:
+                start = int(np.searchsorted(part[:, 0], since, side="left"))
+                if start < len(part):
+                    chunks.append(part[start:, [0, _COLUMN[field]]])
+            rows = np.concatenate(chunks) if chunks else np.zeros((0, 2))
+        return rows[:, 0], rows[:, 1]
+
+    def is_stationary(
+        self,
+        secs: Optional[float] = None,
+        vel_tol: Optional[float] = None,
+        yaw_tol_deg: Optional[float] = None,
+        min_samples: int = 2,
+        now: Optional[float] = None,
+    ) -> bool:
+        """True if the last ``secs`` of samples show ~zero velocity and a settled yaw."""
+        secs = float(secs if secs is not None else getattr(C, "STATIONARY_WINDOW_S", 0.3))
+        vel_tol = float(vel_tol if vel_tol is not None else getattr(C, "STATIONARY_VEL_TOL", 1.0))
+        yaw_tol = float(yaw_tol_deg if yaw_tol_deg is not None else getattr(C, "STATIONARY_YAW_TOL_DEG", 1.0))
+        ts, yaw = self.window("yaw", secs, now)
+        if len(ts) < min_samples:
+            return False
+        for field in ("vgx", "vgy", "vgz"):
+            _, vel = self.window(field, secs, now)
+            if np.any(np.abs(vel) > vel_tol):
+                return False
+        yaw = np.degrees(np.unwrap(np.radians(yaw)))
+        return float(yaw.max() - yaw.min()) <= yaw_tol
+
+    def wait_until_stationary(self, timeout: float, **kwargs: Any) -> bool:
+        """
+        Block until is_stationary(**kwargs) holds, re-checking on each new
+        sample; False once ``timeout`` seconds pass without settling.
+        """
+        deadline = time.time() + max(0.0, timeout)
+        seen = self.count
+        while not self.is_stationary(**kwargs):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            self.wait_for_sample(seen, remaining)
+            seen = self.count
+        return True
+
+    def rate_hz(self, secs: float = 2.0) -> float:
+        ts, _ = self.window("yaw", secs)
+        return (len(ts) - 1) / float(ts[-1] - ts[0]) if len(ts) > 1 and ts[-1] > ts[0] else 0.0
+
+
+class TelemetrySubscriber:
+    """
+    Background thread feeding a TelemetryBuffer from djitellopy's parsed
+    state. Each packet becomes a new dict, so polling for a new object is
+    cheap and records every packet at (nearly) its arrival time.
+    """
+
+    def __init__(self, tello: Any, capacity: Optional[int] = None, poll_hz: Optional[float] = None) -> None:
+        self.tello = tello
+        self.buffer = TelemetryBuffer(int(capacity or getattr(C, "TELEMETRY_HISTORY", 3000)))
+        self._poll = 1.0 / max(1.0, float(poll_hz or getattr(C, "TELEMETRY_POLL_HZ", 200)))
+        self._stop = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def start(self) -> "TelemetrySubscriber":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TelemetrySubscriber", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        last = None
+        while not self._stop.is_set():
+            try:
+                state = self.tello.get_current_state()
+            except Exception:
+                state = None
+            if state and state is not last:
+                last = state
+                self.buffer.append(state)
+            self._stop.wait(self._poll)
+
+    # Convenience pass-throughs so callers can treat the subscriber as the buffer.
+    def latest(self, field: str, max_age: Optional[float] = None) -> Optional[float]:
+        return self.buffer.latest(field, max_age)
+
+    def window(self, field: str, secs: float, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.buffer.window(field, secs, now)
+
+    def is_stationary(self, **kwargs: Any) -> bool:
+        return self.buffer.is_stationary(**kwargs)
+
+    def battery(self) -> Optional[int]:
+        value = self.buffer.latest("bat", max_age=5.0)  # changes slowly; a few missed packets are fine
+        return int(value) if value is not None else None
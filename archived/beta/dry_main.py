@@ -9,10 +9,14 @@ check plans on any machine.
 """
 import argparse
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 import beta_config as C
-from beta_plan import PLAN_DIR, find_latest_beta_waypoint_json, load_plan
+from beta_compile import (
+    FLIGHT_MODES, POLICIES, Command, body_path, command_count, compile_go_plan, compile_plan, estimate_seconds,
+    forward_steps_by_segment, path_length, policy_step_cm,
+)
+from beta_plan import PLAN_DIR, find_latest_beta_waypoint_json, load_plan, load_plan_points, points_from_segments
 
 
 def _format_seconds(seconds: Optional[float]) -> str:
@@ -29,49 +33,69 @@ def _format_seconds(seconds: Optional[float]) -> str:
     return f"{hours}h {minutes}m {secs:04.1f}s"
 
 
-def _count_forward_moves(dist_cm: int) -> Tuple[int, int]:
-    """
-    Return (move_command_count, leftover_cm) mimicking beta_main's loop.
-    """
-    remaining = int(round(dist_cm))
-    count = 0
-    while remaining >= C.MIN_MOVE_CM:
-        step = min(C.FORWARD_STEP_CM, remaining, C.MAX_MOVE_CM)
-        remaining -= step
-        count += 1
-    return count, remaining
+def _describe_steps(steps: List[int]) -> str:
+    """'60x11 + 44' style run-length summary of forward moves."""
+    if not steps:
+        return "-"
+    runs: List[List[int]] = []
+    for step in steps:
+        if runs and runs[-1][0] == step:
+            runs[-1][1] += 1
+        else:
+            runs.append([step, 1])
+    return " + ".join(f"{step}x{count}" if count > 1 else f"{step}" for step, count in runs)
+
+
+def _describe_vectors(cmds: List[Command]) -> str:
+    """'go (94,0) (95,0) + curve (49,50)' summary of body-frame commands (end points only)."""
+    if not cmds:
+        return "-"
+    parts: List[str] = []
+    for cmd in cmds:
+        x, y = cmd.args[-3], cmd.args[-2]
+        label = "" if parts and parts[-1].startswith(cmd.op) else cmd.op + " "
+        if label:
+            parts.append(f"{label}({x},{y})")
+        else:
+            parts[-1] += f" ({x},{y})"
+    return " + ".join(parts)
 
 
 def summarise_segments(
-    segs: List[Tuple[int, int]], speed_cm_s: int, pause_per_seg: float, min_turn_deg: int
-) -> Tuple[float, float, List[str]]:
-    total_cm = 0
-    total_time = 0.0
+    segs: List[Tuple[int, int]], naive: List[Command], compiled: List[Command], min_turn_deg: int
+) -> List[str]:
+    naive_steps = forward_steps_by_segment(naive)
+    compiled_steps = forward_steps_by_segment(compiled)
+    vectors: Dict[int, List[Command]] = {}
+    for cmd in compiled:
+        if cmd.op in ("go", "curve"):
+            vectors.setdefault(cmd.seg, []).append(cmd)
     lines: List[str] = []
     for idx, (turn_deg, dist_cm) in enumerate(segs):
-        skip_turn = abs(turn_deg) < min_turn_deg
-        moves, leftover = _count_forward_moves(dist_cm)
-        move_time = (dist_cm / speed_cm_s) if speed_cm_s > 0 else None
-        pause = pause_per_seg
-        # Base estimate: travel time + waits per move + optional pause + turn sleep
-        wait_time = moves * C.MOVE_SLEEP
-        seg_time = (move_time or 0.0) + wait_time + pause
-        if turn_deg:
-            seg_time += C.TURN_SLEEP
-        total_cm += max(0, dist_cm)
-        total_time += seg_time
-        travel = _format_seconds(move_time)
         turn_label = f"{turn_deg:+4d} deg"
-        if skip_turn and turn_deg != 0:
+        if abs(turn_deg) < min_turn_deg and turn_deg != 0:
             turn_label += " (skip<min)"
+        before = naive_steps.get(idx, [])
+        if vectors:
+            after_cmds = vectors.get(idx, [])
+            after = f"compiled {len(after_cmds):2d} cmds ({_describe_vectors(after_cmds)})"
+        else:
+            after_steps = compiled_steps.get(idx, [])
+            after = f"compiled {len(after_steps):2d} moves ({_describe_steps(after_steps)})"
         lines.append(
             f"[{idx:02}] turn {turn_label}, dist {dist_cm:4d} cm "
-            f"-> moves {moves:2d}, leftover {leftover:2d} cm, travel {travel}"
+            f"-> naive {len(before):2d} moves ({_describe_steps(before)}), {after}"
         )
-    return float(total_cm), total_time, lines
+    return lines
 
 
-def dry_run(plan_path: Path) -> int:
+def dry_run(
+    plan_path: Path,
+    policy: Optional[str] = None,
+    detection_active: bool = True,
+    flight_mode: Optional[str] = None,
+    curves: Optional[bool] = None,
+) -> int:
     segs, meta = load_plan(plan_path)
     alt_cm = int(meta.get("height_cm", C.ALT_CM))
     speed_cm_s = int(meta.get("speed_cm_s", C.SPEED_CM_S))
@@ -81,21 +105,62 @@ def dry_run(plan_path: Path) -> int:
     print(f"[*] Segments: {len(segs)}")
     print(
         f"[*] Config: altitude {alt_cm} cm, speed {speed_cm_s} cm/s, "
-        f"pause/segment {pause_per_seg}s, move_sleep {C.MOVE_SLEEP}s"
+        f"pause/segment {pause_per_seg}s, move_sleep {C.MOVE_SLEEP}s, "
+        f"command overhead {getattr(C, 'CMD_OVERHEAD_S', 2.0)}s"
+    )
+
+    policy = policy or getattr(C, "FORWARD_POLICY", "cadence")
+    effective = policy if detection_active or policy == "fixed" else "max"
+    step_cm = policy_step_cm(effective, speed_cm_s)
+    flight_mode = flight_mode or getattr(C, "FLIGHT_MODE", "waypoint")
+    if flight_mode == "go" and curves is None:
+        curves = bool(getattr(C, "GO_CURVES", False))
+    print(
+        f"[*] Flight mode: {flight_mode}{' with curves' if flight_mode == 'go' and curves else ''}, "
+        f"forward policy: {effective} (max step {step_cm} cm, detection {'on' if detection_active else 'off'})"
     )
 
     min_turn = max(0, int(meta.get("min_turn_deg", getattr(C, "MIN_TURN_DEG", 0))))
-    total_cm, total_time, lines = summarise_segments(segs, speed_cm_s, pause_per_seg, min_turn)
-    for ln in lines:
+    naive, naive_dropped = compile_plan(segs, policy="fixed", speed_cm_s=speed_cm_s)
+    if flight_mode == "go":
+        points = load_plan_points(plan_path) or points_from_segments(segs)
+        compiled, dropped = compile_go_plan(
+            points, segs, policy=policy, speed_cm_s=speed_cm_s, detection_active=detection_active, curves=curves
+        )
+    else:
+        compiled, dropped = compile_plan(segs, policy=policy, speed_cm_s=speed_cm_s, detection_active=detection_active)
+    for ln in summarise_segments(segs, naive, compiled, min_turn):
         print("    " + ln)
 
+    total_cm = sum(max(0, dist_cm) for _, dist_cm in segs)
+    pauses = pause_per_seg * len(segs)
     climb_cm = max(0, min(alt_cm - 20, C.MAX_MOVE_CM))
     climb_time = climb_cm / speed_cm_s if speed_cm_s > 0 else None
-    est_total = total_time + (climb_time or 0.0)
+    base_time = pauses + (climb_time or 0.0)
+    naive_time = base_time + estimate_seconds(naive, speed_cm_s)
+    compiled_time = base_time + estimate_seconds(compiled, speed_cm_s)
 
     print(f"[*] Total forward distance: {total_cm:.0f} cm")
     print(f"[*] Approx climb: {climb_cm} cm, est { _format_seconds(climb_time) }")
-    print(f"[*] Approx mission time (no AI events): { _format_seconds(est_total) }")
+    print(
+        f"[*] Naive program: {command_count(naive)} SDK commands, "
+        f"{naive_dropped} cm dropped, est { _format_seconds(naive_time) }"
+    )
+    rotations = sum(1 for cmd in compiled if cmd.op == "rotate")
+    if flight_mode == "rc":
+        path = body_path(load_plan_points(plan_path) or points_from_segments(segs), segs)
+        path_cm = path_length(path)
+        compiled_time = base_time + (path_cm / speed_cm_s if speed_cm_s > 0 else 0.0)
+        print(
+            f"[*] RC flight: {len(path) - 1} legs, {path_cm:.0f} cm continuous at {speed_cm_s} cm/s "
+            f"without stops, est { _format_seconds(compiled_time) }"
+        )
+    else:
+        print(
+            f"[*] Compiled program: {command_count(compiled)} SDK commands ({rotations} turns), "
+            f"{dropped} cm dropped, est { _format_seconds(compiled_time) }"
+        )
+    print(f"[*] Approx mission time (no AI events): { _format_seconds(compiled_time) }")
     print("    (Add extra buffer for AI interactions, retries, and safety.)")
     return 0
 
@@ -130,6 +195,29 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Ignore json_path and use the most recent beta_waypoint*.json in plans/.",
     )
+    parser.add_argument(
+        "--policy",
+        choices=POLICIES,
+        default=None,
+        help="Forward step policy for the compiled program (default: FORWARD_POLICY).",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=FLIGHT_MODES,
+        default=None,
+        help="Flight mode to compile for (default: FLIGHT_MODE).",
+    )
+    parser.add_argument(
+        "--curves",
+        action="store_true",
+        default=None,
+        help="Go mode: round corners with curve commands (default: GO_CURVES).",
+    )
+    parser.add_argument(
+        "--no-detect",
+        action="store_true",
+        help="Compile as if detection were off (legs fly as maximum legal moves).",
+    )
     return parser.parse_args()
 
 
@@ -137,7 +225,7 @@ def main() -> int:
     try:
         args = parse_args()
         plan_path = resolve_plan_path(args)
-        return dry_run(plan_path)
+        return dry_run(plan_path, args.policy, not args.no_detect, args.mode, args.curves)
     except FileNotFoundError as e:
         print(f"[X] {e}")
         return 2
@@ -10,6 +10,7 @@ PROFILES = {
     "preview": [PY, "beta_main.py", "--use-last", "--show-video"],
     "detect": [PY, "beta_detect.py"],
     "dry": [PY, "dry_main.py", "--use-last"],
+    "daemon": [PY, "beta_daemon.py", "serve"],
 }
 
 